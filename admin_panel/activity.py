@@ -0,0 +1,134 @@
+# admin_panel/activity.py
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from policy.models import Claim
+
+from .models import ActivityEvent
+
+# (icon, color) per claim status in the feed
+CLAIM_STATUS_STYLES = {
+    'SUBMITTED': ('fa-file-medical', 'bg-primary'),
+    'UNDER_REVIEW': ('fa-search', 'bg-info'),
+    'APPROVED': ('fa-check-circle', 'bg-success'),
+    'REJECTED': ('fa-times-circle', 'bg-danger'),
+}
+
+
+def claim_filed_event(claim_id, username):
+    return ActivityEvent(
+        verb='claim_filed', title='New Claim Filed',
+        description=f'Claim #{claim_id} was filed by {username}', object_ref=claim_id,
+        icon='fa-file-medical', color='bg-primary',
+    )
+
+
+def claim_status_event(claim_id, status, label):
+    icon, color = CLAIM_STATUS_STYLES.get(status, ('fa-exchange-alt', 'bg-secondary'))
+    return ActivityEvent(
+        verb='claim_status', title=f'Claim {label}',
+        description=(f'Claim #{claim_id} was {label.lower()}' if status in Claim.DECIDED_STATUSES
+                     else f'Claim #{claim_id} moved to {label}'),
+        object_ref=claim_id,
+        icon=icon, color=color,
+    )
+
+
+def ticket_opened_event(ticket_id, username):
+    return ActivityEvent(
+        verb='ticket_opened', title='New Support Ticket',
+        description=f'Ticket #{ticket_id} submitted by {username}', object_ref=ticket_id,
+        icon='fa-headset', color='bg-warning',
+    )
+
+
+def user_registered_event(username):
+    return ActivityEvent(
+        verb='user_registered', title='New User Registered',
+        description=f'{username} registered for insurance', object_ref=username,
+        icon='fa-user-plus', color='bg-info',
+    )
+
+
+def policy_added_event(policy_id, name):
+    return ActivityEvent(
+        verb='policy_added', title='New Policy Added',
+        description=f'{name} was added to the policy catalogue', object_ref=policy_id,
+        icon='fa-file-contract', color='bg-primary',
+    )
+
+
+def policy_purchased_event(policy_id, name, username):
+    return ActivityEvent(
+        verb='policy_purchased', title='Policy Purchased',
+        description=f'{username} applied for {name}', object_ref=policy_id,
+        icon='fa-shield-alt', color='bg-success',
+    )
+
+
+def record_events(events):
+    """Append events in one INSERT; the log is never updated in place."""
+    events = list(events)
+    if events:
+        ActivityEvent.objects.bulk_create(events)
+    return events
+
+
+def activity_page(before=None, after=None, limit=None):
+    """
+    One page of the feed, newest first, as (events, next_before).
+
+    `before` pages back through older events: pass the returned next_before,
+    which is None once the log is exhausted. `after` fetches only events newer
+    than a known id, oldest first, so a client can poll for what it has not seen.
+    Both are single range scans on the primary key.
+    """
+    limit = limit or settings.ACTIVITY_FEED_PAGE_SIZE
+    if after is not None:
+        return list(ActivityEvent.objects.filter(id__gt=after).order_by('id')[:limit]), None
+
+    events = ActivityEvent.objects.order_by('-id')
+    if before is not None:
+        events = events.filter(id__lt=before)
+    # One extra row tells us whether an older page exists
+    rows = list(events[:limit + 1])
+    next_before = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_before
+
+
+def serialize_event(event):
+    return {
+        'id': event.id,
+        'verb': event.verb,
+        'title': event.title,
+        'description': event.description,
+        'object_ref': event.object_ref,
+        'icon': event.icon,
+        'color': event.color,
+        'time': event.created_at.isoformat(),
+    }
+
+
+def prune_activity(cutoff, archive=None, batch_size=1000):
+    """
+    Delete events older than `cutoff`, oldest first, in id-range batches.
+    Each batch is written to `archive` (a text file object) as JSON lines
+    before it is deleted. Returns the number of events removed.
+    """
+    removed = 0
+    while True:
+        batch = list(ActivityEvent.objects.filter(created_at__lt=cutoff).order_by('id')[:batch_size])
+        if not batch:
+            return removed
+        if archive is not None:
+            archive.writelines(json.dumps(serialize_event(event)) + '\n' for event in batch)
+        ActivityEvent.objects.filter(id__gte=batch[0].id, id__lte=batch[-1].id, created_at__lt=cutoff).delete()
+        removed += len(batch)
+
+
+def retention_cutoff(days=None):
+    days = settings.ACTIVITY_RETENTION_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
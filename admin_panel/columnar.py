@@ -0,0 +1,423 @@
+# admin_panel/columnar.py
+import array
+import json
+import re
+import struct
+import sys
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from feedback_support.models import Feedback
+from network_provider.models import NetworkProvider
+from policy.models import Claim, UserPolicy
+
+from .exports import iterate
+from .models import ExportCursor
+
+# pyarrow is optional: without it only the standard-library format below is offered
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+    pa = None
+
+# Analytics extracts, one row per record, read in modification order. Columns
+# are (name, values_list lookup, type); `updated` is the modification time
+# incremental exports are keyed on.
+DATASETS = {
+    'claims': {
+        'model': Claim,
+        'updated': 'updated_at',
+        'columns': [
+            ('id', 'id', 'int64'),
+            ('claim_id', 'claim_id', 'string'),
+            ('user_policy_id', 'user_policy_id', 'int64'),
+            ('user_id', 'user_policy__user_id', 'int64'),
+            ('policy_id', 'user_policy__policy__policy_id', 'string'),
+            ('provider_id', 'provider__provider_id', 'string'),
+            ('claim_amount', 'claim_amount', 'decimal'),
+            ('status', 'status', 'string'),
+            ('filed_date', 'filed_date', 'timestamp'),
+            ('decided_at', 'decided_at', 'timestamp'),
+            ('updated_at', 'updated_at', 'timestamp'),
+        ],
+    },
+    'user_policies': {
+        'model': UserPolicy,
+        'updated': 'updated_at',
+        'columns': [
+            ('id', 'id', 'int64'),
+            ('user_id', 'user_id', 'int64'),
+            ('policy_id', 'policy__policy_id', 'string'),
+            ('policy_name', 'policy__name', 'string'),
+            ('premium', 'policy__premium', 'decimal'),
+            ('status', 'status', 'string'),
+            ('application_date', 'application_date', 'timestamp'),
+            ('activation_date', 'activation_date', 'timestamp'),
+            ('start_date', 'start_date', 'date'),
+            ('end_date', 'end_date', 'date'),
+            ('updated_at', 'updated_at', 'timestamp'),
+        ],
+    },
+    'tickets': {
+        'model': Feedback,
+        'updated': 'updated_on',
+        'columns': [
+            ('id', 'id', 'int64'),
+            ('ticket_id', 'ticket_id', 'string'),
+            ('category', 'category', 'string'),
+            ('status', 'status', 'string'),
+            ('policy_name', 'policy_name__name', 'string'),
+            ('provider_name', 'network_provider__name', 'string'),
+            ('created_by_id', 'created_by_id', 'int64'),
+            ('created_on', 'created_on', 'timestamp'),
+            ('updated_on', 'updated_on', 'timestamp'),
+        ],
+    },
+    'providers': {
+        'model': NetworkProvider,
+        'updated': 'updated_at',
+        'columns': [
+            ('id', 'id', 'int64'),
+            ('provider_id', 'provider_id', 'string'),
+            ('hospital_name', 'hospital_name', 'string'),
+            ('location', 'location', 'string'),
+            ('type', 'type', 'string'),
+            ('network_type', 'network_type', 'string'),
+            ('coverage_limit', 'coverage_limit', 'string'),
+            ('status', 'status', 'string'),
+            ('created_at', 'created_at', 'timestamp'),
+            ('updated_at', 'updated_at', 'timestamp'),
+        ],
+    },
+}
+
+# Amounts are exported exactly, as decimals with two places
+DECIMAL_SCALE = 2
+
+
+class ExportError(Exception):
+    pass
+
+
+def parse_since(value):
+    """An aware datetime from an ISO 8601 date or datetime; naive values are in the local time zone."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None and parse_date(value):
+            parsed = datetime.combine(parse_date(value), time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ExportError(f"since must be an ISO 8601 date or datetime, not {value!r}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class ColumnarExport:
+    """
+    One export of `dataset`: its rows as column batches, oldest change first.
+
+    A full export reads every row. An incremental one (`since`, or a named
+    `cursor`) reads the rows changed after `since` (by default where that
+    cursor's last complete export stopped) up to `until`, which trails the
+    clock by COLUMNAR_EXPORT_LAG_SECONDS. Deleted rows are not reported.
+    """
+
+    def __init__(self, dataset, since=None, cursor=None, now=None):
+        if dataset not in DATASETS:
+            raise ExportError(f"Unknown dataset {dataset!r}; choose from {', '.join(DATASETS)}")
+        if cursor and not re.fullmatch(r'[-\w]{1,50}', cursor):
+            raise ExportError("cursor must be a name of up to 50 letters, digits, hyphens or underscores")
+        self.dataset = dataset
+        self.spec = DATASETS[dataset]
+        self.cursor = cursor
+        if since is None and cursor:
+            since = (ExportCursor.objects.filter(name=cursor, dataset=dataset)
+                     .values_list('exported_until', flat=True).first())
+        self.since = since
+        self.until = None
+        if since is not None or cursor:
+            self.until = (now or timezone.now()) - timedelta(seconds=settings.COLUMNAR_EXPORT_LAG_SECONDS)
+
+    @property
+    def columns(self):
+        """[(name, type)]"""
+        return [(name, type) for name, _, type in self.spec['columns']]
+
+    def metadata(self):
+        return {
+            'dataset': self.dataset,
+            'since': self.since.isoformat() if self.since else None,
+            'until': self.until.isoformat() if self.until else None,
+        }
+
+    def batches(self, batch_size=None):
+        """Yield one list of values per column for each batch of up to `batch_size` rows."""
+        batch_size = batch_size or settings.COLUMNAR_EXPORT_BATCH_SIZE
+        updated = self.spec['updated']
+        rows = self.spec['model']._default_manager.all()
+        if self.since is not None:
+            rows = rows.filter(**{f'{updated}__gt': self.since})
+        if self.until is not None:
+            rows = rows.filter(**{f'{updated}__lte': self.until})
+        rows = rows.order_by(updated, 'id').values_list(*(lookup for _, lookup, _ in self.spec['columns']))
+
+        batch = []
+        for row in iterate(rows, chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield [list(values) for values in zip(*batch)]
+                batch = []
+        if batch:
+            yield [list(values) for values in zip(*batch)]
+
+    def advance_cursor(self):
+        """Record that the cursor's consumer has everything up to `until`."""
+        if self.cursor and self.until is not None:
+            ExportCursor.objects.update_or_create(name=self.cursor, dataset=self.dataset,
+                                                  defaults={'exported_until': self.until})
+
+
+# Standard-library format ("hicol"), little-endian throughout:
+#   b'HICOL1', a uint32 header length and a UTF-8 JSON header
+#   {"dataset", "since", "until", "columns": [{"name", "type"}]}; then per batch
+#   a uint32 row count n followed by each column: a uint8 null flag, when set
+#   a ceil(n / 8) byte bitmap (bit i set when row i is null), then the values:
+#     int64      int64
+#     decimal    int64, in units of 10 ** -DECIMAL_SCALE
+#     timestamp  int64 microseconds since 1970-01-01 UTC
+#     date       int32 days since 1970-01-01
+#     string     n + 1 uint32 offsets into the UTF-8 bytes that follow
+#   Null slots hold zero values. A zero row count ends the stream.
+MAGIC = b'HICOL1'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MICROSECOND = timedelta(microseconds=1)
+
+ZERO_VALUES = {'int64': 0, 'decimal': Decimal(0), 'timestamp': EPOCH, 'date': EPOCH.date(), 'string': ''}
+
+
+def _pack(typecode, values):
+    packed = array.array(typecode, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(typecode, data):
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _encode_strings(values):
+    encoded = [value.encode('utf-8') for value in values]
+    return _pack('I', [0, *accumulate(map(len, encoded))]) + b''.join(encoded)
+
+
+ENCODERS = {
+    'int64': lambda values: _pack('q', values),
+    'decimal': lambda values: _pack('q', [int(value.scaleb(DECIMAL_SCALE)) for value in values]),
+    'timestamp': lambda values: _pack('q', [(value - EPOCH) // MICROSECOND for value in values]),
+    'date': lambda values: _pack('i', [value.toordinal() - EPOCH_ORDINAL for value in values]),
+    'string': _encode_strings,
+}
+
+
+def _encode_batch(columns, batch):
+    parts = [struct.pack('<I', len(batch[0]))]
+    for (_, type), values in zip(columns, batch):
+        if None in values:
+            bitmap = bytearray((len(values) + 7) // 8)
+            for index, value in enumerate(values):
+                if value is None:
+                    bitmap[index >> 3] |= 1 << (index & 7)
+            zero = ZERO_VALUES[type]
+            values = [zero if value is None else value for value in values]
+            parts += [b'\x01', bytes(bitmap)]
+        else:
+            parts.append(b'\x00')
+        parts.append(ENCODERS[type](values))
+    return b''.join(parts)
+
+
+def columnar_chunks(export, batch_size=None):
+    """The export in the standard-library format, one chunk per batch."""
+    header = json.dumps({
+        **export.metadata(),
+        'columns': [{'name': name, 'type': type} for name, type in export.columns],
+    }).encode('utf-8')
+    yield MAGIC + struct.pack('<I', len(header)) + header
+    for batch in export.batches(batch_size):
+        yield _encode_batch(export.columns, batch)
+    yield struct.pack('<I', 0)
+
+
+def _read(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ExportError("Truncated columnar export")
+    return data
+
+
+def _decode_column(stream, type, count):
+    nulls = None
+    if _read(stream, 1) == b'\x01':
+        nulls = _read(stream, (count + 7) // 8)
+
+    if type == 'string':
+        offsets = _unpack('I', _read(stream, (count + 1) * 4))
+        data = _read(stream, offsets[-1])
+        values = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+    elif type == 'date':
+        values = [date.fromordinal(value + EPOCH_ORDINAL) for value in _unpack('i', _read(stream, count * 4))]
+    else:
+        raw = _unpack('q', _read(stream, count * 8))
+        if type == 'decimal':
+            values = [Decimal(value).scaleb(-DECIMAL_SCALE) for value in raw]
+        elif type == 'timestamp':
+            values = [EPOCH + value * MICROSECOND for value in raw]
+        else:
+            values = list(raw)
+
+    if nulls:
+        values = [None if nulls[index >> 3] & (1 << (index & 7)) else value for index, value in enumerate(values)]
+    return values
+
+
+def read_columnar(stream):
+    """
+    Decode a standard-library format export from a binary file object:
+    (header, batches), where batches yields {column name: values} with
+    nulls as None.
+    """
+    if _read(stream, len(MAGIC)) != MAGIC:
+        raise ExportError("Not a columnar export")
+    (length,) = struct.unpack('<I', _read(stream, 4))
+    header = json.loads(_read(stream, length))
+
+    def batches():
+        while True:
+            (count,) = struct.unpack('<I', _read(stream, 4))
+            if not count:
+                return
+            yield {column['name']: _decode_column(stream, column['type'], count) for column in header['columns']}
+
+    return header, batches()
+
+
+# Arrow IPC stream and Parquet, through pyarrow
+
+class _ChunkSink:
+    """Write-only file object collecting what a pyarrow writer produces, drained between batches."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data, self.parts = b''.join(self.parts), []
+        return data
+
+
+def arrow_schema(export):
+    types = {
+        'int64': pa.int64(),
+        'decimal': pa.decimal128(12, DECIMAL_SCALE),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+        'date': pa.date32(),
+        'string': pa.string(),
+    }
+    metadata = {key: value or '' for key, value in export.metadata().items()}
+    return pa.schema([(name, types[type]) for name, type in export.columns], metadata=metadata)
+
+
+def _record_batches(export, schema, batch_size):
+    for batch in export.batches(batch_size):
+        yield pa.record_batch([pa.array(values, type=field.type) for values, field in zip(batch, schema)],
+                              schema=schema)
+
+
+def arrow_chunks(export, batch_size=None):
+    """The export as an Arrow IPC stream, one record batch per chunk."""
+    sink = _ChunkSink()
+    schema = arrow_schema(export)
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for record_batch in _record_batches(export, schema, batch_size):
+            writer.write_batch(record_batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_chunks(export, batch_size=None):
+    """The export as a Parquet file, one row group per batch."""
+    sink = _ChunkSink()
+    schema = arrow_schema(export)
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for record_batch in _record_batches(export, schema, batch_size):
+            writer.write_batch(record_batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+FORMATS = {
+    'arrow': {'chunks': arrow_chunks, 'content_type': 'application/vnd.apache.arrow.stream',
+              'extension': 'arrows', 'needs_pyarrow': True},
+    'parquet': {'chunks': parquet_chunks, 'content_type': 'application/vnd.apache.parquet',
+                'extension': 'parquet', 'needs_pyarrow': True},
+    'columnar': {'chunks': columnar_chunks, 'content_type': 'application/octet-stream',
+                 'extension': 'hicol', 'needs_pyarrow': False},
+}
+
+
+def default_format():
+    return 'arrow' if HAS_PYARROW else 'columnar'
+
+
+def check_format(format):
+    if format not in FORMATS:
+        raise ExportError(f"Unknown format {format!r}; choose from {', '.join(FORMATS)}")
+    if FORMATS[format]['needs_pyarrow'] and not HAS_PYARROW:
+        raise ExportError(f"The {format} format needs pyarrow, which is not installed; use columnar")
+
+
+def export_chunks(export, format, batch_size=None):
+    """
+    Encode `export` in `format` as byte chunks. The export's cursor advances
+    only after the last chunk has been consumed, so an interrupted download
+    is exported again next time.
+    """
+    check_format(format)
+    for chunk in FORMATS[format]['chunks'](export, batch_size):
+        if chunk:
+            yield chunk
+    export.advance_cursor()
@@ -0,0 +1,79 @@
+# admin_panel/exports.py
+import csv
+import zlib
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(headers, rows, rows_per_chunk=None):
+    """
+    Encode `rows` as CSV lazily, yielding UTF-8 byte chunks of about
+    `rows_per_chunk` rows, so memory stays flat however many rows there are.
+    """
+    rows_per_chunk = rows_per_chunk or settings.REPORT_EXPORT_CHUNK_SIZE
+    writer = csv.writer(Echo())
+    lines = [writer.writerow(headers)]
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) >= rows_per_chunk:
+            yield ''.join(lines).encode('utf-8')
+            lines = []
+    if lines:
+        yield ''.join(lines).encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte stream into a single gzip member as it is produced."""
+    # wbits=31 selects the gzip container rather than raw zlib
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(request):
+    return request is not None and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def streaming_csv_response(filename, headers, rows, request=None):
+    """
+    A CSV attachment streamed from `rows` (any iterable, ideally a queryset
+    iterator). When REPORT_EXPORT_GZIP is on and the client accepts gzip, the
+    body is compressed on the fly and sent with Content-Encoding: gzip.
+    """
+    return csv_chunks_response(filename, csv_chunks(headers, rows), request=request)
+
+
+def csv_chunks_response(filename, chunks, request=None):
+    """A CSV attachment streamed from already encoded byte chunks, gzipped as above."""
+    return attachment_response(filename, chunks, 'text/csv', request=request)
+
+
+def attachment_response(filename, chunks, content_type, request=None, gzip=True):
+    """A streamed attachment, gzipped as above unless `gzip` is off (for formats compressed already)."""
+    compress = gzip and settings.REPORT_EXPORT_GZIP and accepts_gzip(request)
+    response = StreamingHttpResponse(gzip_chunks(chunks) if compress else chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Vary'] = 'Accept-Encoding'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+
+def iterate(queryset, chunk_size=None):
+    """
+    Stream a queryset (typically values_list() with the joined columns) in
+    chunks: a server-side cursor where the database supports one, chunked
+    fetches otherwise. Rows are never cached on the queryset.
+    """
+    return queryset.iterator(chunk_size=chunk_size or settings.REPORT_EXPORT_CHUNK_SIZE)
@@ -0,0 +1,97 @@
+# admin_panel/facets.py
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from policy.models import Claim
+
+from .models import ClaimFacet
+
+FACETS_CACHE_KEY = 'admin_panel:claim_facets'
+
+
+def facet_options():
+    """{'user': [...], 'policy': [...], 'status': [...]}: values that currently have claims."""
+    options = cache.get(FACETS_CACHE_KEY)
+    if options is None:
+        options = {kind: [] for kind, _ in ClaimFacet.KIND_CHOICES}
+        for kind, value in ClaimFacet.objects.filter(claim_count__gt=0).values_list('kind', 'value'):
+            options[kind].append(value)
+        cache.set(FACETS_CACHE_KEY, options, settings.CLAIM_FACETS_CACHE_TIMEOUT)
+    return options
+
+
+def adjust_facets(deltas):
+    """Apply {(kind, value): delta} to the facet counts inside the current transaction."""
+    changed = False
+    for (kind, value), delta in deltas.items():
+        if not delta or value is None:
+            continue
+        changed = True
+        rows = ClaimFacet.objects.filter(kind=kind, value=value)
+        if rows.update(claim_count=F('claim_count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                ClaimFacet.objects.create(kind=kind, value=value, claim_count=delta)
+        except IntegrityError:
+            # Created concurrently; apply the delta to that row
+            rows.update(claim_count=F('claim_count') + delta)
+
+    if changed:
+        transaction.on_commit(lambda: cache.delete(FACETS_CACHE_KEY))
+
+
+def claim_deltas(claim, sign):
+    """Deltas for one claim being added (sign=1) or removed (sign=-1)."""
+    owner = claim.owner()
+    deltas = Counter({('status', claim.status): sign})
+    if owner:
+        deltas[('user', owner['username'])] += sign
+        deltas[('policy', owner['policy_name'])] += sign
+    return deltas
+
+
+def bulk_created_deltas(claim_pks):
+    """Deltas for claims inserted with bulk_create(), grouped in the database."""
+    deltas = Counter()
+    rows = (Claim.objects.filter(pk__in=claim_pks)
+            .values('status', 'user_policy__user__username', 'user_policy__policy__name')
+            .annotate(count=Count('id')))
+    for row in rows:
+        deltas[('status', row['status'])] += row['count']
+        deltas[('user', row['user_policy__user__username'])] += row['count']
+        deltas[('policy', row['user_policy__policy__name'])] += row['count']
+    return deltas
+
+
+def bulk_status_deltas(claim_pks, old_status):
+    """Deltas for claims moved out of `old_status` with QuerySet.update()."""
+    deltas = Counter()
+    for status, count in Claim.objects.filter(pk__in=claim_pks).values_list('status').annotate(count=Count('id')):
+        deltas[('status', status)] += count
+        deltas[('status', old_status)] -= count
+    return deltas
+
+
+def rebuild_claim_facets():
+    """Recount every facet from the claim table (initial build, or after renames)."""
+    deltas = Counter()
+    for status, count in Claim.objects.values_list('status').annotate(count=Count('id')):
+        deltas[('status', status)] += count
+    for kind, field in (('user', 'user_policy__user__username'), ('policy', 'user_policy__policy__name')):
+        for value, count in Claim.objects.values_list(field).annotate(count=Count('id')):
+            deltas[(kind, value)] += count
+
+    with transaction.atomic():
+        ClaimFacet.objects.all().delete()
+        ClaimFacet.objects.bulk_create(
+            [ClaimFacet(kind=kind, value=value, claim_count=count)
+             for (kind, value), count in deltas.items() if value is not None and count],
+            batch_size=500,
+        )
+        transaction.on_commit(lambda: cache.delete(FACETS_CACHE_KEY))
+    return len(deltas)
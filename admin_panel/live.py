@@ -0,0 +1,98 @@
+# admin_panel/live.py
+import asyncio
+import threading
+from functools import partial
+
+from django.db import transaction
+
+from policy.models import Claim
+
+# Live badges and the dashboard counters (admin_panel/stats.py) they are made of
+BADGES = {
+    'open_tickets': ('feedback.open',),
+    'pending_claims': tuple(f'claims.{code}' for code in Claim.PENDING_STATUSES),
+    'total_users': ('users.total',),
+}
+
+# Events a slow subscriber may fall behind by before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def badge_deltas(counter_deltas):
+    """Fold {counter name: delta} into {badge: delta}, dropping badges that did not move."""
+    deltas = {}
+    for badge, names in BADGES.items():
+        delta = sum(counter_deltas.get(name, 0) for name in names)
+        if delta:
+            deltas[badge] = int(delta)
+    return deltas
+
+
+def badge_values(stats):
+    """Current badge values from dashboard_stats()."""
+    return {
+        'open_tickets': stats['pending_feedback'],
+        'pending_claims': stats['active_claims'],
+        'total_users': stats['total_users'],
+    }
+
+
+class CounterPublisher:
+    """
+    Fans counter changes out to every connected admin in this process.
+
+    Writes publish from request or worker threads; each subscriber is an
+    asyncio.Queue owned by the event loop serving its stream, so publishing
+    never blocks on a slow client and no subscriber polls the database.
+    Changes written by other processes are not seen here: run the ASGI
+    server as a single process, or have clients resync on reconnect.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self.sequence = 0
+
+    def subscribe(self):
+        """Register the running event loop's new queue and return it."""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {entry for entry in self._subscribers if entry[1] is not queue}
+
+    def publish(self, deltas):
+        """Send {badge: delta} to every subscriber. Returns the event's sequence number."""
+        with self._lock:
+            self.sequence += 1
+            event = {'seq': self.sequence, 'deltas': deltas}
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The loop has closed under a stream that never unsubscribed
+                self.unsubscribe(queue)
+        return event['seq']
+
+    @staticmethod
+    def _offer(queue, event):
+        if queue.full():
+            # Deltas cannot be skipped; drop the backlog and have the client reload its values
+            while not queue.empty():
+                queue.get_nowait()
+            event = {'seq': event['seq'], 'resync': True}
+        queue.put_nowait(event)
+
+
+publisher = CounterPublisher()
+
+
+def publish_counter_deltas(counter_deltas):
+    """Publish the badge changes in `counter_deltas` once the writing transaction commits."""
+    deltas = badge_deltas(counter_deltas)
+    if deltas:
+        transaction.on_commit(partial(publisher.publish, deltas))
@@ -0,0 +1,80 @@
+# admin_panel/management/commands/bench_report_pdf.py
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
+from reportlab.lib.styles import getSampleStyleSheet
+
+from admin_panel.pdf import TABLE_STYLE, write_table_pdf
+
+HEADERS = ['Claim ID', 'User', 'Policy', 'Amount', 'Status', 'Date Filed']
+POLICIES = ['Gold Health', 'Silver Shield', 'Family Floater Plus', 'Senior Care', 'Basic Cover']
+STATUSES = ['Submitted', 'Under Review', 'Approved', 'Rejected', 'Paid']
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure claims report PDF rendering (pages/second and peak RSS) on synthetic "
+        "rows shaped like ClaimsReportView output. No database rows are read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Synthetic claim rows to render')
+        parser.add_argument('--single-table', action='store_true',
+                            help='Render the previous layout (one Table holding every row) for comparison')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = self._synthetic_rows(random.Random(options['seed']), options['rows'])
+        render = self._single_table if options['single_table'] else self._paged
+        # Peak RSS is per process; run each layout in its own invocation to compare them
+        with tempfile.TemporaryFile() as output:
+            started = time.perf_counter()
+            pages = render(output, rows)
+            elapsed = time.perf_counter() - started
+            size = output.tell()
+
+        layout = 'single table' if options['single_table'] else 'paged tables'
+        self.stdout.write(
+            f"Rendered {options['rows']:,} rows ({layout}) into {pages:,} pages, {size / 2**20:.1f} MiB "
+            f"in {elapsed:.2f}s: {pages / elapsed:,.1f} pages/s, {options['rows'] / elapsed:,.0f} rows/s"
+        )
+        self.stdout.write(f"Peak RSS: {self._peak_rss_mib():,.1f} MiB")
+
+    @staticmethod
+    def _paged(output, rows):
+        return write_table_pdf(output, 'Claims Summary Report', HEADERS, rows)
+
+    @staticmethod
+    def _single_table(output, rows):
+        doc = SimpleDocTemplate(output, pagesize=letter)
+        doc.build([
+            Paragraph('Claims Summary Report', getSampleStyleSheet()['Heading1']),
+            Table([HEADERS] + list(rows), style=TABLE_STYLE),
+        ])
+        return doc.page
+
+    @staticmethod
+    def _synthetic_rows(rng, count):
+        today = date.today()
+        for number in range(1, count + 1):
+            yield [
+                f'CLM{number:07d}',
+                f'member{rng.randint(1, count // 4 + 1)}',
+                rng.choice(POLICIES),
+                f"${rng.randint(1_000, 400_000):.2f}",
+                rng.choice(STATUSES),
+                (today - timedelta(days=rng.randint(0, 365))).strftime('%Y-%m-%d'),
+            ]
+
+    @staticmethod
+    def _peak_rss_mib():
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
@@ -0,0 +1,17 @@
+# admin_panel/management/commands/expire_report_jobs.py
+from django.core.management.base import BaseCommand
+
+from admin_panel.report_jobs import expire_report_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete report artifacts older than REPORT_ARTIFACT_TTL_HOURS and fail report jobs "
+        "queued or running for longer than REPORT_JOB_TIMEOUT_MINUTES. Run it periodically."
+    )
+
+    def handle(self, *args, **options):
+        expired, timed_out = expire_report_jobs()
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {expired} report artifact(s); timed out {timed_out} stuck job(s)."
+        ))
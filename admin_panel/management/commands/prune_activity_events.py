@@ -0,0 +1,29 @@
+# admin_panel/management/commands/prune_activity_events.py
+import gzip
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from admin_panel.activity import prune_activity, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete activity feed events older than the retention window "
+        "(ACTIVITY_RETENTION_DAYS), optionally archiving them first as gzipped JSON lines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ACTIVITY_RETENTION_DAYS,
+                            help='Keep events from the last N days.')
+        parser.add_argument('--archive', help='Append the removed events to this .jsonl.gz file.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['days'])
+        if options['archive']:
+            with gzip.open(options['archive'], 'at', encoding='utf-8') as archive:
+                removed = prune_activity(cutoff, archive=archive, batch_size=options['batch_size'])
+        else:
+            removed = prune_activity(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} activity event(s) older than {cutoff:%Y-%m-%d}."))
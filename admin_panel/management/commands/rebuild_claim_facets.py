@@ -0,0 +1,15 @@
+# admin_panel/management/commands/rebuild_claim_facets.py
+from django.core.management.base import BaseCommand
+
+from admin_panel.facets import rebuild_claim_facets
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the claim browser's filter facets from the claim table. Counts are "
+        "maintained on every write; run this after renaming users or policies."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_claim_facets()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} claim facet(s)."))
@@ -0,0 +1,35 @@
+# admin_panel/management/commands/rebuild_rollups.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_panel.rollups import ROLLUPS
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily reporting rollups (claims, policies) from the source "
+        "tables, or compact them. Rollups are maintained on every write; rebuild after raw "
+        "SQL changes or backfills."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rollup', choices=sorted(ROLLUPS), action='append',
+                            help='Rollup to process (repeatable); all by default.')
+        parser.add_argument('--since', help='Only rebuild days from this date (YYYY-MM-DD) onwards.')
+        parser.add_argument('--compact', action='store_true',
+                            help='Instead of rebuilding, drop rows whose count has fallen to zero.')
+
+    def handle(self, *args, **options):
+        try:
+            since = date.fromisoformat(options['since']) if options['since'] else None
+        except ValueError:
+            raise CommandError("--since must be a date in YYYY-MM-DD format.")
+
+        for name in options['rollup'] or sorted(ROLLUPS):
+            rollup = ROLLUPS[name]
+            if options['compact']:
+                self.stdout.write(f"{name}: removed {rollup.compact()} empty row(s).")
+            else:
+                self.stdout.write(f"{name}: wrote {rollup.rebuild(since=since)} row(s).")
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,24 @@
+# admin_panel/management/commands/rebuild_search_index.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from admin_panel.search import DOCUMENTS, get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for claims and tickets (after renames or a backend change)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(DOCUMENTS), action='append',
+                            help='Only rebuild this index (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        for kind in options['kind'] or sorted(DOCUMENTS):
+            started = time.perf_counter()
+            count = backend.rebuild(kind, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {count} {kind} document(s) in {time.perf_counter() - started:.2f}s"
+            ))
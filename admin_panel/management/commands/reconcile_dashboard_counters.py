@@ -0,0 +1,18 @@
+# admin_panel/management/commands/reconcile_dashboard_counters.py
+from django.core.management.base import BaseCommand
+
+from admin_panel.stats import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the admin dashboard counters from the source tables and report "
+        "any that had drifted. Counters are maintained on every write; run this "
+        "after raw SQL changes or from a nightly job."
+    )
+
+    def handle(self, *args, **options):
+        drifted = reconcile_counters()
+        for name, (stored, actual) in sorted(drifted.items()):
+            self.stdout.write(f"{name}: {stored} -> {actual}")
+        self.stdout.write(self.style.SUCCESS(f"Reconciled dashboard counters; {len(drifted)} had drifted."))
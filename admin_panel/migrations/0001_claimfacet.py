@@ -0,0 +1,48 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_facets(apps, schema_editor):
+    """Initial counts for existing claims; later writes keep them current."""
+    Claim = apps.get_model('policy', 'Claim')
+    ClaimFacet = apps.get_model('admin_panel', 'ClaimFacet')
+    counts = {}
+    for kind, field in (('status', 'status'), ('user', 'user_policy__user__username'),
+                        ('policy', 'user_policy__policy__name')):
+        for value, count in Claim.objects.values_list(field).annotate(count=Count('id')):
+            if kind == 'status':
+                value = value.strip().upper().replace(' ', '_')
+            if value is not None:
+                counts[kind, value] = counts.get((kind, value), 0) + count
+    ClaimFacet.objects.bulk_create(
+        [ClaimFacet(kind=kind, value=value, claim_count=count) for (kind, value), count in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('policy', '0006_claim_browser_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaimFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('user', 'User'), ('policy', 'Policy'), ('status', 'Status')], max_length=10)),
+                ('value', models.CharField(max_length=150)),
+                ('claim_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['kind', 'value'],
+                'unique_together': {('kind', 'value')},
+            },
+        ),
+        migrations.RunPython(build_facets, migrations.RunPython.noop),
+    ]
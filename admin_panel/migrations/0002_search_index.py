@@ -0,0 +1,69 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:05
+
+from django.db import migrations
+
+# Mirrors the documents in admin_panel/search.py; later changes are picked up by rebuild_search_index
+TABLES = {
+    'search_claim': ('identifier', 'names', 'body'),
+    'search_feedback': ('identifier', 'names', 'body'),
+}
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 tables exist only on SQLite; other databases use the icontains backend."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    claim = apps.get_model('policy', 'Claim')._meta.db_table
+    user_policy = apps.get_model('policy', 'UserPolicy')._meta.db_table
+    policy = apps.get_model('policy', 'Policy')._meta.db_table
+    user = apps.get_model('users', 'CustomUser')._meta.db_table
+    feedback = apps.get_model('feedback_support', 'Feedback')._meta.db_table
+    feedback_policy = apps.get_model('feedback_support', 'Policy')._meta.db_table
+    comment = apps.get_model('feedback_support', 'FeedbackComment')._meta.db_table
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, columns in TABLES.items():
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                           f"USING fts5({', '.join(columns)}, tokenize='unicode61 remove_diacritics 2')")
+
+        # Index the existing rows in one statement per table
+        cursor.execute(f"""
+            INSERT INTO search_claim (rowid, identifier, names, body)
+            SELECT c.id, c.claim_id, u.username || ' ' || p.name, c.reason || ' ' || COALESCE(c.comment, '')
+            FROM {claim} c
+            JOIN {user_policy} up ON up.id = c.user_policy_id
+            JOIN {policy} p ON p.id = up.policy_id
+            JOIN {user} u ON u.id = up.user_id
+        """)
+        cursor.execute(f"""
+            INSERT INTO search_feedback (rowid, identifier, names, body)
+            SELECT f.id, f.ticket_id, u.username || ' ' || p.name || ' ' || f.category,
+                   f.description || ' ' || COALESCE(
+                       (SELECT GROUP_CONCAT(fc.comment, ' ') FROM {comment} fc WHERE fc.feedback_id = f.id), '')
+            FROM {feedback} f
+            JOIN {feedback_policy} p ON p.id = f.policy_name_id
+            JOIN {user} u ON u.id = f.created_by_id
+        """)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0001_claimfacet'),
+        ('feedback_support', '0005_alter_feedbackcomment_feedback'),
+        ('policy', '0006_claim_browser_indexes'),
+        ('users', '0002_alter_customuser_role'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
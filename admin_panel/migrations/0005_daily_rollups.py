@@ -0,0 +1,70 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def build_rollups(apps, schema_editor):
+    """Initial rollups for existing rows; later writes keep them current."""
+    tz = timezone.get_current_timezone()
+    sources = (
+        ('policy', 'Claim', 'filed_date', 'ClaimDailyRollup',
+         {'status': 'status', 'policy_id': 'user_policy__policy_id'},
+         {'claim_count': Count('id'), 'amount_total': Sum('claim_amount')}),
+        ('policy', 'UserPolicy', 'application_date', 'PolicyDailyRollup',
+         {'status': 'status', 'policy_id': 'policy_id'},
+         {'purchase_count': Count('id')}),
+    )
+    for app_label, fact_name, date_field, rollup_name, dimensions, measures in sources:
+        Fact = apps.get_model(app_label, fact_name)
+        Rollup = apps.get_model('admin_panel', rollup_name)
+        rows = (Fact.objects.order_by()
+                .values(*dimensions.values(), day=TruncDate(date_field, tzinfo=tz))
+                .annotate(**measures))
+        Rollup.objects.bulk_create(
+            [Rollup(day=row['day'], **{name: row[lookup] for name, lookup in dimensions.items()},
+                    **{measure: row[measure] or 0 for measure in measures}) for row in rows],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0004_activityevent'),
+        ('policy', '0007_normalize_claim_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaimDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('claim_count', models.IntegerField(default=0)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('policy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='policy.policy')),
+            ],
+            options={
+                'unique_together': {('day', 'status', 'policy')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PolicyDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('purchase_count', models.IntegerField(default=0)),
+                ('policy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='policy.policy')),
+            ],
+            options={
+                'unique_together': {('day', 'status', 'policy')},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
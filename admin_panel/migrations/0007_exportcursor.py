@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0006_reportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField()),
+                ('dataset', models.CharField(max_length=30)),
+                ('exported_until', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='exportcursor',
+            constraint=models.UniqueConstraint(fields=('name', 'dataset'), name='admin_panel_exportcursor_unique'),
+        ),
+    ]
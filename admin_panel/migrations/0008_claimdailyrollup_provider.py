@@ -0,0 +1,64 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:43
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DurationField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+
+def rebuild_claim_rollup(apps, schema_editor):
+    """Regroup the claim rollup with the provider dimension and the turnaround measure."""
+    Claim = apps.get_model('policy', 'Claim')
+    ClaimDailyRollup = apps.get_model('admin_panel', 'ClaimDailyRollup')
+    rows = (Claim.objects.order_by()
+            .values('status', 'user_policy__policy_id', 'provider_id',
+                    day=TruncDate('filed_date', tzinfo=timezone.get_current_timezone()))
+            .annotate(claim_count=Count('id'), amount_total=Sum('claim_amount'),
+                      turnaround_total=Coalesce(
+                          Sum(F('decided_at') - F('filed_date'), filter=Q(decided_at__isnull=False)),
+                          Value(datetime.timedelta(0)), output_field=DurationField())))
+    ClaimDailyRollup.objects.all().delete()
+    ClaimDailyRollup.objects.bulk_create(
+        [ClaimDailyRollup(day=row['day'], status=row['status'], policy_id=row['user_policy__policy_id'],
+                          provider_id=row['provider_id'], claim_count=row['claim_count'],
+                          amount_total=row['amount_total'] or 0, turnaround_total=row['turnaround_total'])
+         for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0007_exportcursor'),
+        ('network_provider', '0005_networkprovider_created_by'),
+        ('policy', '0009_userpolicy_updated_at_export_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='claimdailyrollup',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='claimdailyrollup',
+            name='provider',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='network_provider.networkprovider'),
+        ),
+        migrations.AddField(
+            model_name='claimdailyrollup',
+            name='turnaround_total',
+            field=models.DurationField(default=datetime.timedelta),
+        ),
+        migrations.AddConstraint(
+            model_name='claimdailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('provider__isnull', False)), fields=('day', 'status', 'policy', 'provider'), name='admin_panel_claimrollup_provider_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='claimdailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('provider__isnull', True)), fields=('day', 'status', 'policy'), name='admin_panel_claimrollup_no_provider_unique'),
+        ),
+        migrations.RunPython(rebuild_claim_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.14 on 2026-10-17 23:40
+
+from django.db import migrations
+
+# Trigram tables of the IDs in admin_panel/search.py, so ID fragments are looked up instead of scanned
+TABLES = {
+    'search_claim_id': ('policy', 'Claim', 'claim_id'),
+    'search_feedback_id': ('feedback_support', 'Feedback', 'ticket_id'),
+}
+
+
+def create_id_index(apps, schema_editor):
+    """FTS5 tables exist only on SQLite; other databases use the icontains backend."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table, (app_label, model_name, field) in TABLES.items():
+            source = apps.get_model(app_label, model_name)._meta.db_table
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(identifier, tokenize='trigram')")
+            cursor.execute(f"INSERT INTO {table} (rowid, identifier) SELECT id, {field} FROM {source}")
+
+
+def drop_id_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0008_claimdailyrollup_provider'),
+        ('feedback_support', '0005_alter_feedbackcomment_feedback'),
+        ('policy', '0009_userpolicy_updated_at_export_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_id_index, drop_id_index),
+    ]
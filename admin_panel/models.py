@@ -1,3 +1,194 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
+
+
+class ClaimFacet(models.Model):
+    """
+    Claim counts per username, policy name and status, kept up to date on
+    every claim write (admin_panel/facets.py) so the claims browser can fill
+    its filter dropdowns without DISTINCT scans over the claim table.
+    """
+    KIND_CHOICES = (
+        ('user', 'User'),
+        ('policy', 'Policy'),
+        ('status', 'Status'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=150)
+    claim_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kind', 'value')
+        ordering = ['kind', 'value']
+
+    def __str__(self):
+        return f"{self.kind}={self.value} ({self.claim_count})"
+
+
+class DashboardCounter(models.Model):
+    """
+    Precomputed admin dashboard numbers (claims per status, open tickets,
+    users, ...), adjusted by signals on every write (admin_panel/stats.py)
+    and recomputed by the reconcile_dashboard_counters command.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only log behind the admin "recent activity" feed. Rows are written
+    by signals on claim, policy, ticket and registration writes
+    (admin_panel/activity.py) and never updated; ids therefore follow time,
+    so the feed pages by id. Old rows are archived by prune_activity_events.
+    """
+    VERB_CHOICES = (
+        ('claim_filed', 'Claim filed'),
+        ('claim_status', 'Claim status changed'),
+        ('policy_added', 'Policy added'),
+        ('policy_purchased', 'Policy purchased'),
+        ('ticket_opened', 'Support ticket opened'),
+        ('user_registered', 'User registered'),
+    )
+
+    verb = models.CharField(max_length=30, choices=VERB_CHOICES)
+    # Title and description are rendered when the event happens and kept as written
+    title = models.CharField(max_length=100)
+    description = models.CharField(max_length=255)
+    # The claim ID, ticket ID, policy ID or username the event is about
+    object_ref = models.CharField(max_length=150, blank=True)
+    # Font Awesome icon and Bootstrap background class for the feed
+    icon = models.CharField(max_length=30, default='fa-circle')
+    color = models.CharField(max_length=20, default='bg-secondary')
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M} {self.title}"
+
+    # The dashboard template reads activity.time
+    @property
+    def time(self):
+        return self.created_at
+
+
+class ClaimDailyRollup(models.Model):
+    """
+    Claims filed per local day, status, policy and provider (NULL for claims
+    without one), with their total amount and total time from filing to
+    decision. Maintained on every claim write (admin_panel/rollups.py) so
+    reports over long ranges read one row per day and group instead of
+    every claim.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    policy = models.ForeignKey('policy.Policy', on_delete=models.CASCADE, related_name='+')
+    # A deleted provider's rows are first folded into the NULL rows (admin_panel/signals.py)
+    provider = models.ForeignKey('network_provider.NetworkProvider', on_delete=models.CASCADE,
+                                 null=True, blank=True, related_name='+')
+    claim_count = models.IntegerField(default=0)
+    amount_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    turnaround_total = models.DurationField(default=timedelta)
+
+    class Meta:
+        # NULLs never collide in a unique index, so claims without a provider get their own
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'policy', 'provider'],
+                                    condition=models.Q(provider__isnull=False),
+                                    name='admin_panel_claimrollup_provider_unique'),
+            models.UniqueConstraint(fields=['day', 'status', 'policy'], condition=models.Q(provider__isnull=True),
+                                    name='admin_panel_claimrollup_no_provider_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status} policy={self.policy_id} provider={self.provider_id}: {self.claim_count}"
+
+
+class PolicyDailyRollup(models.Model):
+    """Policy applications per local day, status and policy (admin_panel/rollups.py)."""
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    policy = models.ForeignKey('policy.Policy', on_delete=models.CASCADE, related_name='+')
+    purchase_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'status', 'policy')
+
+    def __str__(self):
+        return f"{self.day} {self.status} policy={self.policy_id}: {self.purchase_count}"
+
+
+def report_upload_to(instance, filename):
+    """Generated report files live in their own namespace under MEDIA_ROOT."""
+    return f'report_artifacts/{filename}'
+
+
+class ReportJob(models.Model):
+    """
+    One requested report build, run by the report process pool
+    (admin_panel/report_jobs.py). Identical requests share a job through
+    `key`: at most one job per key is queued or running at a time, and a
+    ready artifact is reused until it expires.
+    """
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('READY', 'Ready'),
+        ('FAILED', 'Failed'),
+        ('EXPIRED', 'Expired'),  # artifact deleted by expire_report_jobs
+    )
+
+    key = models.CharField(max_length=64, db_index=True)
+    report = models.CharField(max_length=30)
+    format = models.CharField(max_length=10)
+    params = models.JSONField(default=dict, blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                     on_delete=models.SET_NULL, related_name='+')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    artifact = models.FileField(upload_to=report_upload_to, max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key'], condition=models.Q(status__in=['QUEUED', 'RUNNING']),
+                                    name='admin_panel_reportjob_one_in_flight'),
+        ]
+
+    def __str__(self):
+        return f"{self.report}.{self.format} job {self.pk} ({self.status})"
+
+
+class ExportCursor(models.Model):
+    """
+    How far a named consumer (a warehouse load, an analyst's notebook) has
+    read one columnar export dataset (admin_panel/columnar.py). Each
+    incremental export streams the rows changed after `exported_until` and
+    moves it forward once the stream completes.
+    """
+    name = models.SlugField(max_length=50)
+    dataset = models.CharField(max_length=30)
+    exported_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'dataset'], name='admin_panel_exportcursor_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}:{self.dataset} until {self.exported_until:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,137 @@
+# admin_panel/pdf.py
+from itertools import islice
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+HEADER_FONT, HEADER_FONT_SIZE = 'Helvetica-Bold', 14
+BODY_FONT, BODY_FONT_SIZE = 'Helvetica', 10
+
+PAGE_SIZE = letter
+MARGIN = inch
+
+# Fixed row heights let each page's table be sized without measuring it
+HEADER_HEIGHT = 32
+ROW_HEIGHT = 18
+CELL_PADDING = 12
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), HEADER_FONT),
+    ('FONTSIZE', (0, 0), (-1, 0), HEADER_FONT_SIZE),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def column_widths(headers, rows):
+    """Widths that fit the header and `rows` (a sample, typically the first page)."""
+    widths = [stringWidth(str(header), HEADER_FONT, HEADER_FONT_SIZE) for header in headers]
+    for row in rows:
+        for index, value in enumerate(row):
+            widths[index] = max(widths[index], stringWidth(str(value), BODY_FONT, BODY_FONT_SIZE))
+    return [width + CELL_PADDING for width in widths]
+
+
+def rows_that_fit(height):
+    """Rows of a table, under its header row, that fit in `height` points."""
+    return max(0, int((height - HEADER_HEIGHT) // ROW_HEIGHT))
+
+
+def page_chunks(rows, first_page, per_page):
+    """Lists of rows from `rows` (any iterable, read lazily): `first_page` rows, then `per_page` at a time."""
+    rows = iter(rows)
+    size = first_page
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+        size = per_page
+
+
+class TablePDF:
+    """
+    A titled table report drawn straight onto a canvas, one page at a time.
+    Each page holds a Table cut from the rows to fill its body, with the
+    header row repeated, so only one page of rows is in memory however long
+    the report is. Heights come from Flowable.wrapOn() against the page body
+    (the page less its margins).
+    """
+
+    def __init__(self, output, pagesize=PAGE_SIZE, margin=MARGIN):
+        self.canvas = Canvas(output, pagesize=pagesize, pageCompression=1)
+        page_width, page_height = pagesize
+        self.left, self.bottom, self.top = margin, margin, page_height - margin
+        self.width, self.height = page_width - 2 * margin, page_height - 2 * margin
+        self.y = self.top
+
+    def draw(self, flowable, centered=False):
+        """Draw `flowable` below what is already on the page and return its height."""
+        if self.y < self.top:
+            self.y -= flowable.getSpaceBefore()
+        width, height = flowable.wrapOn(self.canvas, self.width, self.y - self.bottom)
+        x = self.left + (self.width - width) / 2 if centered else self.left
+        flowable.drawOn(self.canvas, x, self.y - height)
+        self.y -= height + flowable.getSpaceAfter()
+        return height
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.y = self.top
+
+    @property
+    def room(self):
+        return self.y - self.bottom
+
+    def save(self):
+        """Finish the document and return its page count."""
+        pages = self.canvas.getPageNumber()
+        self.canvas.save()
+        return pages
+
+
+def write_table_pdf(output, title, headers, rows, subtitles=()):
+    """
+    Write a titled table report to `output` (a path or binary file) and
+    return the number of pages. Rows are consumed lazily, so a chunked
+    queryset iterator can be passed straight through.
+    """
+    pdf = TablePDF(output)
+    styles = getSampleStyleSheet()
+    title_style = styles['Heading1']
+    title_style.alignment = 1
+    pdf.draw(Paragraph(title, title_style))
+    pdf.draw(Paragraph(f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
+    for line in subtitles:
+        pdf.draw(Paragraph(line, styles['Normal']))
+    pdf.draw(Spacer(1, 2 * styles['Normal'].leading))
+
+    first_page = rows_that_fit(pdf.room)
+    if not first_page:
+        # The title left no room for a header and a row
+        pdf.new_page()
+        first_page = rows_that_fit(pdf.room)
+
+    widths = None
+    for page, chunk in enumerate(page_chunks(rows, first_page, rows_that_fit(pdf.height))):
+        if page:
+            pdf.new_page()
+        if widths is None:
+            widths = column_widths(headers, chunk)
+        pdf.draw(Table([headers] + chunk, colWidths=widths,
+                       rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * len(chunk), style=TABLE_STYLE),
+                 centered=True)
+    if widths is None:
+        pdf.draw(Paragraph("No data available for the selected criteria.", styles['Normal']))
+    return pdf.save()
@@ -0,0 +1,137 @@
+# admin_panel/report_cache.py
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# What each cached report is computed from; a write to any of these tables
+# invalidates every cached result tagged with it (see admin_panel/signals.py).
+# Tag versions and hit counters live in the configured cache, so they are only
+# shared between processes when CACHES points at a shared backend.
+REPORT_TAGS = {
+    'dashboard': ('claims', 'policies', 'providers'),
+    'chart': ('claims', 'policies'),
+    'claims': ('claims', 'policies', 'users'),
+    'policy_usage': ('policies',),
+    'provider': ('claims', 'providers'),
+    'provider_performance': ('claims', 'providers'),
+    'monthly_trends': ('claims', 'policies'),
+}
+
+
+def _tag_key(tag):
+    return f'admin_panel:report_tag:{tag}'
+
+
+def _stat_key(report, outcome):
+    return f'admin_panel:report_cache:{report}:{outcome}'
+
+
+def _tag_versions(tags):
+    """
+    The current version of each tag. A tag missing from the cache (never
+    set, or evicted) gets a fresh version, so entries written under an
+    earlier one can never be served again.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def report_tag_versions(report):
+    """The versions of `report`'s tags; they all change when a tagged table is written."""
+    return _tag_versions(REPORT_TAGS[report])
+
+
+def report_cache_key(report, params):
+    """
+    Results are keyed by report, parameters (dates, filters and format) and
+    the versions of the report's tags. The day is included because reports
+    without explicit dates default to ranges ending today.
+    """
+    raw = json.dumps([report, sorted(params.items()), timezone.localdate().isoformat(),
+                      report_tag_versions(report)], default=str)
+    return f'admin_panel:report:{report}:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+
+def _count(report, outcome):
+    key = _stat_key(report, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.add(key, 1, None)
+
+
+def get_cached_report(report, params):
+    """(key, value): the cached result, or None as value on a miss. Counts the hit or miss."""
+    key = report_cache_key(report, params)
+    value = cache.get(key)
+    _count(report, 'hits' if value is not None else 'misses')
+    return key, value
+
+
+def store_report(key, value, timeout=None):
+    cache.set(key, value, settings.REPORT_CACHE_TIMEOUT if timeout is None else timeout)
+
+
+def cached_report(report, params, compute, timeout=None):
+    """compute() for `report` with `params`, served from the cache until a tagged table changes."""
+    key, value = get_cached_report(report, params)
+    if value is None:
+        value = compute()
+        store_report(key, value, timeout)
+    return value
+
+
+def cache_chunks(key, chunks, meta=None, timeout=None):
+    """
+    Pass byte chunks through to the response and, once the stream is
+    complete, cache {'content': bytes, **meta} unless it grew past
+    REPORT_CACHE_MAX_BYTES.
+    """
+    kept, size = [], 0
+    for chunk in chunks:
+        if kept is not None:
+            size += len(chunk)
+            if size > settings.REPORT_CACHE_MAX_BYTES:
+                kept = None
+            else:
+                kept.append(chunk)
+        yield chunk
+    if kept is not None:
+        store_report(key, {**(meta or {}), 'content': b''.join(kept)}, timeout)
+
+
+def invalidate_report_tags(*tags):
+    """Retire every cached result tagged with any of `tags` once the current transaction commits."""
+    def bump():
+        version = time.time_ns()
+        cache.set_many({_tag_key(tag): version for tag in tags}, None)
+    transaction.on_commit(bump)
+
+
+def report_cache_stats():
+    """[{'report', 'label', 'hits', 'misses', 'hit_rate'}] for every cached report, as counted by this cache."""
+    counts = cache.get_many([_stat_key(report, outcome) for report in REPORT_TAGS for outcome in ('hits', 'misses')])
+    stats = []
+    for report in REPORT_TAGS:
+        hits = counts.get(_stat_key(report, 'hits'), 0)
+        misses = counts.get(_stat_key(report, 'misses'), 0)
+        stats.append({
+            'report': report,
+            'label': report.replace('_', ' ').title(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses) * 100, 1) if hits + misses else 0,
+        })
+    return stats
@@ -0,0 +1,197 @@
+# admin_panel/report_jobs.py
+import hashlib
+import json
+import logging
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .exports import csv_chunks
+from .models import ReportJob
+from .report_cache import report_tag_versions
+
+logger = logging.getLogger(__name__)
+
+# Reports that can run as jobs, by SimpleReportMixin.report_name
+REPORT_VIEWS = {
+    'claims': 'admin_panel.views.ClaimsReportView',
+    'policy_usage': 'admin_panel.views.PolicyUsageReportView',
+    'provider': 'admin_panel.views.ProviderReportView',
+    'monthly_trends': 'admin_panel.views.MonthlyTrendsReportView',
+}
+FORMATS = ('pdf', 'csv')
+
+# The only request parameters that change a report; the rest do not split jobs
+REPORT_PARAM_KEYS = ('start_date', 'end_date', 'granularity')
+
+IN_FLIGHT = ('QUEUED', 'RUNNING')
+
+
+def job_key(report, format, params):
+    """
+    Identical requests on the same day share a key until a table the report
+    reads is written (its report cache tag versions), so a ready artifact is
+    never served with stale data. The day is included because reports
+    without explicit dates default to ranges ending today.
+    """
+    raw = json.dumps([report, format, sorted(params.items()), timezone.localdate().isoformat(),
+                      report_tag_versions(report)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def submit_report_job(report, format, params, user=None):
+    """
+    Queue `report` in `format` for `params` (a dict or QueryDict), or return
+    the job already building or holding a live artifact for the same request.
+    """
+    if report not in REPORT_VIEWS or format not in FORMATS:
+        raise ValueError(f'Unknown report {report!r} in format {format!r}')
+    params = {key: params[key] for key in REPORT_PARAM_KEYS if params.get(key)}
+    key = job_key(report, format, params)
+
+    existing = (ReportJob.objects.filter(key=key)
+                .filter(Q(status__in=IN_FLIGHT) | Q(status='READY', expires_at__gt=timezone.now()))
+                .order_by('-id').first())
+    if existing:
+        return existing
+
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(key=key, report=report, format=format, params=params,
+                                           requested_by=user if user and user.is_authenticated else None)
+    except IntegrityError:
+        # Submitted concurrently; the constraint admits one in-flight job per key
+        return ReportJob.objects.get(key=key, status__in=IN_FLIGHT)
+
+    transaction.on_commit(lambda: report_queue.submit(job.pk))
+    return job
+
+
+def build_report(job):
+    """Build the job's report into a temporary file and return it, positioned at the start."""
+    view = import_string(REPORT_VIEWS[job.report])()
+    query = QueryDict(mutable=True)
+    query.update(job.params)
+    view.report_params = query
+    report = view.build_report()
+
+    artifact = tempfile.TemporaryFile()
+    if job.format == 'csv':
+        # Same encoding as the streamed download, written chunk by chunk
+        for chunk in csv_chunks(report['headers'], report['rows']):
+            artifact.write(chunk)
+    else:
+        view.write_pdf(artifact, report['title'], report['headers'], report['rows'])
+    artifact.seek(0)
+    return report['report_type'], artifact
+
+
+def run_report_job(job_id):
+    """Run one queued job to READY or FAILED. Returns the final status, or None if it was taken."""
+    try:
+        claimed = (ReportJob.objects.filter(pk=job_id, status='QUEUED')
+                   .update(status='RUNNING', updated_at=timezone.now()))
+        if not claimed:
+            return None
+        job = ReportJob.objects.get(pk=job_id)
+        try:
+            report_type, artifact = build_report(job)
+        except Exception as exc:
+            logger.exception("Report job %s failed", job_id)
+            job.status = 'FAILED'
+            job.last_error = f"{type(exc).__name__}: {exc}"
+        else:
+            with artifact:
+                job.artifact.save(f'{report_type}_{job.pk}.{job.format}', File(artifact), save=False)
+            job.status = 'READY'
+            job.last_error = ''
+            job.expires_at = timezone.now() + timedelta(hours=settings.REPORT_ARTIFACT_TTL_HOURS)
+        job.save()
+        return job.status
+    finally:
+        close_old_connections()
+
+
+def _init_worker():
+    # Spawned workers start from a bare interpreter; DJANGO_SETTINGS_MODULE is inherited
+    django.setup()
+
+
+class ReportQueue:
+    """
+    Local process pool for report builds, so reportlab's CPU time does not
+    hold web workers or the GIL. Workers are spawned (not forked) to avoid
+    sharing the parent's database connections. With REPORT_JOB_WORKERS = 0
+    jobs run inline after commit, which suits development and tests. Jobs
+    lost to a restart stay QUEUED until expire_report_jobs fails them.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id):
+        workers = settings.REPORT_JOB_WORKERS if self.workers is None else self.workers
+        if not workers:
+            return run_report_job(job_id)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+        return self._executor.submit(run_report_job, job_id)
+
+
+report_queue = ReportQueue()
+
+
+def expire_report_jobs(now=None):
+    """
+    Delete artifacts past their expiry and fail jobs stuck in flight for
+    longer than REPORT_JOB_TIMEOUT_MINUTES. Returns (expired, timed_out).
+    """
+    now = now or timezone.now()
+    expired = 0
+    for job in ReportJob.objects.filter(status='READY', expires_at__lte=now).iterator():
+        if job.artifact:
+            job.artifact.delete(save=False)
+        job.status = 'EXPIRED'
+        job.save(update_fields=['artifact', 'status', 'updated_at'])
+        expired += 1
+
+    stale = now - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES)
+    timed_out = ReportJob.objects.filter(status__in=IN_FLIGHT, updated_at__lt=stale).update(
+        status='FAILED', last_error='Timed out waiting for a report worker.', updated_at=now,
+    )
+    return expired, timed_out
+
+
+def report_job_payload(job):
+    payload = {
+        'job_id': job.pk,
+        'status': job.status,
+        'report': job.report,
+        'format': job.format,
+        'status_url': reverse('admin_panel:report_job_status', args=[job.pk]),
+    }
+    if job.status == 'READY':
+        payload['download_url'] = reverse('admin_panel:download_report_job', args=[job.pk])
+        payload['expires_at'] = job.expires_at.isoformat()
+    if job.status == 'FAILED':
+        payload['error'] = job.last_error
+    return payload
@@ -1,291 +1,247 @@
 # admin_panel/reports.py
-from django.db.models import Count, Avg, Sum, Q
-from django.utils import timezone
 from datetime import datetime, timedelta
-import csv
-from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from django.http import HttpResponse, JsonResponse
-
-from claims.models import Claim
-from policies.models import Policy, PolicyPurchase
-from providers.models import NetworkProvider
-
-
-class ReportGenerator:
-    """Base class for report generation"""
-
-    @staticmethod
-    def get_date_range(request):
-        """Get date range from request or default to last 30 days"""
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-
-        if not start_date:
-            start_date = (timezone.now() - timedelta(days=30)).date()
-        else:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-
-        if not end_date:
-            end_date = timezone.now().date()
-        else:
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-
-        return start_date, end_date
-
-
-class ClaimsReport(ReportGenerator):
-    """Claims-related reports"""
-
-    @staticmethod
-    def get_claims_summary(start_date, end_date):
-        """Get claims summary statistics"""
-        claims = Claim.objects.filter(
-            created_at__date__range=[start_date, end_date]
-        )
 
-        total_claims = claims.count()
-        approved_claims = claims.filter(status='Approved').count()
-        pending_claims = claims.filter(status='Pending').count()
-
-        return {
-            'total_claims': total_claims,
-            'approved_claims': approved_claims,
-            'pending_claims': pending_claims,
-            'claims_queryset': claims
-        }
-
-    @staticmethod
-    def get_monthly_claims_growth():
-        """Calculate monthly claims growth"""
-        last_month = timezone.now() - timedelta(days=30)
-
-        current_month_claims = Claim.objects.filter(
-            created_at__gte=last_month
-        ).count()
-
-        previous_month_claims = Claim.objects.filter(
-            created_at__gte=last_month - timedelta(days=30),
-            created_at__lt=last_month
-        ).count()
-
-        monthly_growth = round(
-            ((current_month_claims - previous_month_claims) / previous_month_claims * 100)
-            if previous_month_claims > 0 else 0,
-            1
-        )
+from django.db.models import Q, Sum
+from django.utils import timezone
 
-        return monthly_growth
-
-
-class PolicyReport(ReportGenerator):
-    """Policy-related reports"""
-
-    @staticmethod
-    def get_policy_usage_stats(start_date, end_date):
-        """Get policy usage statistics"""
-        active_policies = PolicyPurchase.objects.filter(
-            is_active=True,
-            purchased_on__date__range=[start_date, end_date]
-        ).count()
-
-        total_policies = Policy.objects.count()
-        policy_utilization = round((active_policies / total_policies * 100) if total_policies > 0 else 0, 1)
-
-        return {
-            'active_policies': active_policies,
-            'policy_utilization': policy_utilization
-        }
-
-
-class ProviderReport(ReportGenerator):
-    """Provider-related reports"""
-
-    @staticmethod
-    def get_provider_performance():
-        """Get provider performance statistics"""
-        total_providers = NetworkProvider.objects.count()
-
-        avg_provider_rating = NetworkProvider.objects.aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating'] or 0
-        avg_provider_rating = round(avg_provider_rating, 1)
-
-        top_providers = NetworkProvider.objects.annotate(
-            total_claims=Count('claim')
-        ).order_by('-total_claims')[:5]
-
-        return {
-            'total_providers': total_providers,
-            'avg_provider_rating': avg_provider_rating,
-            'top_providers': top_providers
-        }
-
-
-class TrendsReport(ReportGenerator):
-    """Trends-related reports"""
-
-    @staticmethod
-    def get_chart_data(chart_type):
-        """Get chart data for visualization"""
-        months = []
-        data = []
-
-        for i in range(6, 0, -1):
-            month_date = timezone.now() - timedelta(days=30 * i)
-            month = month_date.strftime('%b')
-            months.append(month)
-
-            if chart_type == 'claims':
-                count = Claim.objects.filter(
-                    created_at__month=month_date.month,
-                    created_at__year=month_date.year
-                ).count()
-            elif chart_type == 'policies':
-                count = PolicyPurchase.objects.filter(
-                    purchased_on__month=month_date.month,
-                    purchased_on__year=month_date.year
-                ).count()
-            else:
-                count = 0
-
-            data.append(count)
-
-        return {'labels': months, 'data': data}
-
-
-class ReportExporter:
-    """Handle report export functionality"""
-
-    @staticmethod
-    def export_to_pdf(data, title, data_type='queryset'):
-        """Export data to PDF format"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Add title
-        title_style = styles['Heading1']
-        title_style.alignment = 1
-        story.append(Paragraph(title, title_style))
-        story.append(Paragraph(f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-        story.append(Paragraph("<br/><br/>", styles['Normal']))
-
-        # Create table based on data type
-        if data_type == 'trends':
-            table_data = ReportExporter._format_trends_data(data)
-        else:
-            table_data = ReportExporter._format_queryset_data(data)
-
-        # Create table
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        story.append(table)
-        doc.build(story)
-
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{title.lower().replace(" ", "_")}.pdf"'
-        return response
-
-    @staticmethod
-    def export_to_csv(data, report_type, data_type='queryset'):
-        """Export data to CSV format"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{report_type}_report.csv"'
-
-        writer = csv.writer(response)
-
-        if data_type == 'trends':
-            writer.writerow(['Month', 'Claims', 'Policies', 'Revenue'])
-            for i in range(len(data['months'])):
-                writer.writerow([
-                    data['months'][i],
-                    data['claims'][i],
-                    data['policies'][i],
-                    data['revenue'][i]
-                ])
-        else:
-            table_data = ReportExporter._format_queryset_data(data, for_csv=True)
-            for row in table_data:
-                writer.writerow(row)
-
-        return response
-
-    @staticmethod
-    def _format_trends_data(data):
-        """Format trends data for table"""
-        table_data = [['Month', 'Claims', 'Policies', 'Revenue']]
-        for i in range(len(data['months'])):
-            table_data.append([
-                data['months'][i],
-                data['claims'][i],
-                data['policies'][i],
-                f"${data['revenue'][i]:,}"
-            ])
-        return table_data
-
-    @staticmethod
-    def _format_queryset_data(data, for_csv=False):
-        """Format queryset data for table"""
-        if hasattr(data, 'model'):
-            model_name = data.model.__name__
-
-            if model_name == 'Claim':
-                headers = ['Claim ID', 'User', 'Policy', 'Amount', 'Status', 'Date']
-                table_data = [headers]
-                for item in data:
-                    row = [
-                        item.claim_id,
-                        item.user.get_full_name(),
-                        item.policy.name,
-                        f"${item.amount}" if not for_csv else item.amount,
-                        item.status,
-                        item.created_at.strftime('%Y-%m-%d')
-                    ]
-                    table_data.append(row)
-
-            elif model_name == 'Policy':
-                headers = ['Policy Name', 'Total Purchases', 'Active Purchases', 'Premium']
-                table_data = [headers]
-                for item in data:
-                    row = [
-                        item.name,
-                        item.total_purchases,
-                        item.active_purchases,
-                        f"${item.premium}" if not for_csv else item.premium
-                    ]
-                    table_data.append(row)
-
-            elif model_name == 'NetworkProvider':
-                headers = ['Provider Name', 'Total Claims', 'Avg Claim Amount', 'Success Rate']
-                table_data = [headers]
-                for item in data:
-                    row = [
-                        item.name,
-                        item.total_claims,
-                        f"${item.avg_claim_amount or 0:.2f}" if not for_csv else (item.avg_claim_amount or 0),
-                        f"{item.success_rate or 0:.1f}%" if not for_csv else (item.success_rate or 0)
-                    ]
-                    table_data.append(row)
-            else:
-                table_data = [['No data available']]
-        else:
-            table_data = [['Invalid data format']]
-
-        return table_data
\ No newline at end of file
+from network_provider.models import NetworkProvider
+from policy.models import Claim, Policy
+
+from .exports import iterate
+from .models import ClaimDailyRollup, PolicyDailyRollup
+from .report_cache import cached_report
+from .trends import parse_trend_params, trend_series
+
+# The reporting engine: every reports-dashboard metric and the rows of every
+# report download. Aggregates read the daily rollups (admin_panel/rollups.py),
+# each with one scan per table; only the claims listing reads the claims.
+
+
+def parse_date_range(params, default_days=30):
+    """
+    (start, end) local dates from request parameters start_date and end_date
+    (YYYY-MM-DD). Missing or malformed dates give the last `default_days`
+    days up to today.
+    """
+    today = timezone.localdate()
+    start, end = today - timedelta(days=default_days), today
+    try:
+        if params.get('start_date'):
+            start = datetime.strptime(params['start_date'], '%Y-%m-%d').date()
+        if params.get('end_date'):
+            end = datetime.strptime(params['end_date'], '%Y-%m-%d').date()
+    except ValueError:
+        start, end = today - timedelta(days=default_days), today
+    return start, end
+
+
+# Dashboard metrics
+
+def claim_metrics(start, end, today=None):
+    """
+    Claim totals for [start, end] and the growth of the last 30 days over
+    the 30 before, in one scan of the daily claim rollup.
+    """
+    today = today or timezone.localdate()
+    growth_from = today - timedelta(days=30)
+    in_range = Q(day__range=[start, end])
+    current = Q(day__gt=growth_from)
+    previous = Q(day__gt=growth_from - timedelta(days=30), day__lte=growth_from)
+
+    totals = ClaimDailyRollup.objects.filter(in_range | current | previous).aggregate(
+        total_claims=Sum('claim_count', filter=in_range),
+        approved_claims=Sum('claim_count', filter=in_range & Q(status='APPROVED')),
+        pending_claims=Sum('claim_count', filter=in_range & Q(status__in=Claim.PENDING_STATUSES)),
+        current=Sum('claim_count', filter=current),
+        previous=Sum('claim_count', filter=previous),
+    )
+    totals = {name: value or 0 for name, value in totals.items()}
+    current_claims, previous_claims = totals.pop('current'), totals.pop('previous')
+    totals['monthly_growth'] = round(
+        ((current_claims - previous_claims) / previous_claims * 100) if previous_claims > 0 else 0, 1
+    )
+    return totals
+
+
+def policy_metrics(start, end):
+    """Policies activated in [start, end] and their share of the catalogue."""
+    active_policies = PolicyDailyRollup.objects.filter(
+        status='ACTIVE', day__range=[start, end]
+    ).aggregate(total=Sum('purchase_count'))['total'] or 0
+    total_policies = Policy.objects.count()
+    return {
+        'active_policies': active_policies,
+        'policy_utilization': round((active_policies / total_policies * 100) if total_policies > 0 else 0, 1),
+    }
+
+
+def provider_performance():
+    """
+    Claims per provider, busiest first, in one grouped scan of the daily
+    claim rollup: claim count, approved amount, approval rate among decided
+    claims and average turnaround from filing to decision. Only providers
+    with claims are listed.
+    """
+    rows = (ClaimDailyRollup.objects.filter(provider__isnull=False)
+            .values('provider', 'provider__provider_id', 'provider__hospital_name', 'provider__status')
+            .annotate(
+                claims=Sum('claim_count'),
+                approved_count=Sum('claim_count', filter=Q(status='APPROVED')),
+                decided_count=Sum('claim_count', filter=Q(status__in=Claim.DECIDED_STATUSES)),
+                approved_amount=Sum('amount_total', filter=Q(status='APPROVED')),
+                turnaround=Sum('turnaround_total', filter=Q(status__in=Claim.DECIDED_STATUSES)),
+            )
+            .filter(claims__gt=0)
+            .order_by('-claims', 'provider__hospital_name'))
+
+    performance = []
+    for row in rows:
+        decided = row['decided_count'] or 0
+        performance.append({
+            'provider_id': row['provider__provider_id'],
+            'name': row['provider__hospital_name'],
+            'status': row['provider__status'],
+            'total_claims': row['claims'],
+            'approved_claims': row['approved_count'] or 0,
+            'decided_claims': decided,
+            'approved_amount': row['approved_amount'] or 0,
+            'approval_rate': round((row['approved_count'] or 0) / decided * 100, 1) if decided else None,
+            'avg_turnaround_days': round(row['turnaround'].total_seconds() / decided / 86400, 1) if decided else None,
+        })
+    return performance
+
+
+def cached_provider_performance():
+    """provider_performance(), kept until claims or providers change (admin_panel/report_cache.py)."""
+    return cached_report('provider_performance', {}, provider_performance)
+
+
+def provider_metrics(top=5):
+    """
+    The network size and, across the providers with claims, the share of
+    decided claims that were approved (None before any decision).
+    """
+    providers = cached_provider_performance()
+    decided = sum(provider['decided_claims'] for provider in providers)
+    approved = sum(provider['approved_claims'] for provider in providers)
+    return {
+        'total_providers': NetworkProvider.objects.count(),
+        'provider_approval_rate': round(approved / decided * 100, 1) if decided else None,
+        'top_providers': providers[:top],
+    }
+
+
+def dashboard_metrics(start, end, today=None):
+    """
+    Every figure on the reports dashboard for [start, end]: claim totals and
+    growth, policy utilization and provider performance. Five queries
+    whatever the data size: one per rollup table, one counting policies, one
+    counting providers and one more on the claim rollup per provider
+    (skipped while it is cached).
+    """
+    return {
+        **claim_metrics(start, end, today=today),
+        **policy_metrics(start, end),
+        **provider_metrics(),
+    }
+
+
+# Report downloads: {'title', 'report_type', 'headers', 'rows'}, rows possibly lazy
+
+def claims_report(start, end):
+    """
+    Claims filed between the local midnights bounding [start, end], with
+    user and policy joined in the same query and read in chunks.
+    """
+    tz = timezone.get_current_timezone()
+    claims = Claim.objects.filter(
+        filed_date__gte=timezone.make_aware(datetime.combine(start, datetime.min.time()), tz),
+        filed_date__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), datetime.min.time()), tz),
+    ).order_by('filed_date', 'id').values_list(
+        'claim_id', 'user_policy__user__username', 'user_policy__policy__name',
+        'claim_amount', 'status', 'filed_date'
+    )
+
+    def rows():
+        for claim_id, user_name, policy_name, amount, status, filed_date in iterate(claims):
+            yield [
+                claim_id or 'N/A',
+                user_name or 'N/A',
+                policy_name or 'N/A',
+                f"${amount:.2f}" if amount else '$0.00',
+                status.title() if status else 'N/A',
+                filed_date.strftime('%Y-%m-%d') if filed_date else 'N/A'
+            ]
+
+    return {'title': 'Claims Summary Report', 'report_type': 'claims_summary',
+            'headers': ['Claim ID', 'User', 'Policy', 'Amount', 'Status', 'Date Filed'], 'rows': rows()}
+
+
+def policy_usage_report():
+    """Purchases per catalogue policy, from the daily policy rollup."""
+    purchases = {
+        row['policy']: row for row in PolicyDailyRollup.objects.values('policy').annotate(
+            total=Sum('purchase_count'),
+            active=Sum('purchase_count', filter=Q(status='ACTIVE'))
+        )
+    }
+    rows = []
+    for policy in Policy.objects.all():
+        total = purchases.get(policy.pk, {}).get('total') or 0
+        active = purchases.get(policy.pk, {}).get('active') or 0
+        utilization = round((active / total * 100) if total > 0 else 0, 1)
+        rows.append([
+            policy.name,
+            policy.policy_id or 'N/A',
+            f"${policy.premium:.2f}" if policy.premium else '$0.00',
+            total,
+            active,
+            f"{utilization}%"
+        ])
+
+    return {'title': 'Policy Usage Report', 'report_type': 'policy_usage',
+            'headers': ['Policy Name', 'Policy ID', 'Premium', 'Total Purchases', 'Active Policies',
+                        'Utilization Rate'],
+            'rows': rows}
+
+
+def provider_report():
+    rows = [
+        [
+            provider['provider_id'],
+            provider['name'],
+            provider['total_claims'],
+            f"${provider['approved_amount']:,.2f}",
+            f"{provider['approval_rate']}%" if provider['approval_rate'] is not None else 'N/A',
+            provider['avg_turnaround_days'] if provider['avg_turnaround_days'] is not None else 'N/A',
+            provider['status'],
+        ]
+        for provider in cached_provider_performance()
+    ]
+    return {'title': 'Provider Performance Report', 'report_type': 'provider_performance',
+            'headers': ['Provider ID', 'Provider Name', 'Total Claims', 'Approved Amount', 'Approval Rate',
+                        'Avg Turnaround (days)', 'Status'],
+            'rows': rows}
+
+
+def trends_report(params):
+    """Trend rows for the range and granularity in `params` (the last 6 months by default)."""
+    start, end, granularity = parse_trend_params(params)
+    trends = trend_series(start, end, granularity)
+    rows = [
+        [label, claims, policies, approved, f"${revenue:,.2f}"]
+        for label, claims, policies, approved, revenue in zip(
+            trends['labels'], trends['claims'], trends['policies'], trends['approved_claims'], trends['revenue'])
+    ]
+    return {'title': 'Monthly Trends Report', 'report_type': 'monthly_trends',
+            'headers': ['Period', 'Claims', 'New Policies', 'Approved Claims', 'Revenue ($)'], 'rows': rows}
+
+
+def chart_data(chart_type, params):
+    """{'labels', 'data'} for one trend series, as the dashboard charts read it."""
+    start, end, granularity = parse_trend_params(params)
+    trends = trend_series(start, end, granularity, series=[chart_type])
+    return {
+        'labels': trends['labels'],
+        'data': [float(value) if chart_type == 'revenue' else value for value in trends[chart_type]],
+    }
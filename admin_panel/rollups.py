@@ -0,0 +1,176 @@
+# admin_panel/rollups.py
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from policy.models import Claim, UserPolicy
+
+from .models import ClaimDailyRollup, PolicyDailyRollup
+
+
+class Rollup:
+    """
+    A daily rollup table: `measures` of `fact_model` rows grouped by the
+    local day of `date_field` and by `dimensions` ({rollup field: fact
+    lookup}). The first measure is the row count; a rollup row is only
+    created for a positive count.
+
+    Keys are tuples (day, *dimension values) in the order of `dimensions`,
+    always starting with status. `fact(obj)` gives ({dimension: value},
+    {measure: value}) for one object from its own fields, or None when it
+    cannot be placed, so a single write is rolled up without a query;
+    `related` is what fact() follows, loaded along with a stored object.
+    """
+
+    def __init__(self, model, fact_model, date_field, dimensions, measures, fact, related=()):
+        self.model = model
+        self.fact_model = fact_model
+        self.date_field = date_field
+        self.dimensions = dimensions
+        self.measures = measures
+        self.fact = fact
+        self.related = related
+        self.count_field = next(iter(measures))
+
+    def grouped(self, facts):
+        """{key: {measure: value}} for a queryset of facts, in one GROUP BY query."""
+        rows = (facts.order_by()
+                .values(*self.dimensions.values(),
+                        day=TruncDate(self.date_field, tzinfo=timezone.get_current_timezone()))
+                .annotate(**self.measures))
+        grouped = {}
+        for row in rows:
+            key = (row['day'], *(row[lookup] for lookup in self.dimensions.values()))
+            grouped[key] = {measure: 0 if row[measure] is None else row[measure] for measure in self.measures}
+        return grouped
+
+    def facts_for(self, pks):
+        return self.grouped(self.fact_model._default_manager.filter(pk__in=pks))
+
+    def facts_of(self, obj):
+        """facts_for([obj.pk]) as the object stands in memory."""
+        fact = self.fact(obj)
+        if fact is None:
+            return {}
+        dimensions, measures = fact
+        day = timezone.localtime(getattr(obj, self.date_field)).date()
+        return {(day, *(dimensions[name] for name in self.dimensions)): measures}
+
+    def stored(self, pk):
+        """The object as last saved, with what fact() follows, in one query (None if it is gone)."""
+        return self.fact_model._default_manager.select_related(*self.related).filter(pk=pk).first()
+
+    def adjust(self, deltas):
+        """Apply {key: {measure: delta}} inside the current transaction."""
+        for key, changes in deltas.items():
+            changes = {measure: delta for measure, delta in changes.items() if delta}
+            if not changes:
+                continue
+            lookup = dict(zip(('day', *self.dimensions), key))
+            rows = self.model.objects.filter(**lookup)
+            if rows.update(**{measure: F(measure) + delta for measure, delta in changes.items()}):
+                continue
+            if changes.get(self.count_field, 0) <= 0:
+                # Nothing was counted here (yet); a rebuild will settle it
+                continue
+            try:
+                with transaction.atomic():
+                    self.model.objects.create(**lookup, **changes)
+            except IntegrityError:
+                # Created concurrently; apply the deltas to that row
+                rows.update(**{measure: F(measure) + delta for measure, delta in changes.items()})
+
+    def rebuild(self, since=None, batch_size=500):
+        """
+        Recompute the rollup from the fact table, entirely or from the local
+        day `since` onwards. Returns the number of rollup rows written.
+        """
+        facts = self.fact_model._default_manager.all()
+        rows = self.model.objects.all()
+        if since is not None:
+            lower = timezone.make_aware(datetime.combine(since, time.min), timezone.get_current_timezone())
+            facts = facts.filter(**{f'{self.date_field}__gte': lower})
+            rows = rows.filter(day__gte=since)
+
+        grouped = self.grouped(facts)
+        with transaction.atomic():
+            rows.delete()
+            self.model.objects.bulk_create(
+                [self.model(**dict(zip(('day', *self.dimensions), key)), **values)
+                 for key, values in grouped.items() if values[self.count_field]],
+                batch_size=batch_size,
+            )
+        return len(grouped)
+
+    def compact(self):
+        """Drop rows whose facts have all moved away (status changes, deletions)."""
+        deleted, _ = self.model.objects.filter(**{self.count_field: 0}).delete()
+        return deleted
+
+
+def claim_fact(claim):
+    owner = claim.owner()
+    if owner is None:
+        return None
+    amount = Claim._meta.get_field('claim_amount').to_python(claim.claim_amount)
+    turnaround = claim.decided_at - claim.filed_date if claim.decided_at else timedelta(0)
+    dimensions = {'status': claim.status, 'policy_id': owner['policy_id'], 'provider_id': claim.provider_id}
+    return dimensions, {'claim_count': 1, 'amount_total': amount, 'turnaround_total': turnaround}
+
+
+def policy_fact(user_policy):
+    return {'status': user_policy.status, 'policy_id': user_policy.policy_id}, {'purchase_count': 1}
+
+
+ROLLUPS = {
+    'claim': Rollup(
+        ClaimDailyRollup, Claim, 'filed_date',
+        dimensions={'status': 'status', 'policy_id': 'user_policy__policy_id', 'provider_id': 'provider_id'},
+        measures={
+            'claim_count': Count('id'),
+            'amount_total': Sum('claim_amount'),
+            # Filing to decision, summed over decided claims (zero for pending ones)
+            'turnaround_total': Coalesce(Sum(F('decided_at') - F('filed_date'), filter=Q(decided_at__isnull=False)),
+                                         Value(timedelta(0)), output_field=DurationField()),
+        },
+        fact=claim_fact, related=('user_policy__user', 'user_policy__policy'),
+    ),
+    'policy': Rollup(
+        PolicyDailyRollup, UserPolicy, 'application_date',
+        dimensions={'status': 'status', 'policy_id': 'policy_id'},
+        measures={'purchase_count': Count('id')},
+        fact=policy_fact,
+    ),
+}
+
+
+def difference(new, old):
+    """{key: {measure: new - old}} over the keys of both groupings."""
+    deltas = defaultdict(dict)
+    for key in new.keys() | old.keys():
+        for measure in (new.get(key) or old.get(key)):
+            added, removed = new.get(key, {}).get(measure), old.get(key, {}).get(measure)
+            # Measures are numbers or durations, so a missing side is left out rather than taken as 0
+            deltas[key][measure] = added if removed is None else -removed if added is None else added - removed
+    return deltas
+
+
+def moved_status_deltas(grouped, old_status, unset=()):
+    """
+    Deltas for facts now grouped as `grouped` that were all in `old_status`
+    before an update. The `unset` measures were zero in the old status (a
+    claim's turnaround while it was pending), so only the new key gains them.
+    """
+    deltas = defaultdict(dict)
+    for key, values in grouped.items():
+        old_key = (key[0], old_status, *key[2:])
+        for measure, value in values.items():
+            deltas[key][measure] = deltas[key][measure] + value if measure in deltas[key] else value
+            if measure not in unset:
+                moved = deltas[old_key]
+                moved[measure] = moved[measure] - value if measure in moved else -value
+    return deltas
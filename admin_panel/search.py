@@ -0,0 +1,281 @@
+# admin_panel/search.py
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# A single word with a digit in it, such as 'CLM0001' or '001', is probably (part of) an ID;
+# three characters at least, as the trigram index cannot look up anything shorter
+ID_QUERY_RE = re.compile(r'^\s*(?=\w*\d)(\w{3,})\s*$', re.UNICODE)
+
+
+class SearchDocument:
+    """
+    How one model is indexed: the text of each column (the first being the
+    human-readable ID), the queryset that loads it without per-row queries
+    and the fields the icontains backend falls back to.
+    """
+    kind = None
+    model_label = None
+    columns = ()
+    icontains_fields = ()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def queryset(self):
+        return self.model._default_manager.all()
+
+    def text(self, obj):
+        raise NotImplementedError
+
+
+class ClaimDocument(SearchDocument):
+    kind = 'claim'
+    model_label = 'policy.Claim'
+    columns = ('identifier', 'names', 'body')
+    icontains_fields = ('claim_id', 'user_policy__user__username', 'user_policy__policy__name',
+                        'reason', 'comment')
+
+    def queryset(self):
+        return super().queryset().select_related('user_policy__user', 'user_policy__policy')
+
+    def text(self, claim):
+        return {
+            'identifier': claim.claim_id,
+            'names': f'{claim.user_policy.user.username} {claim.user_policy.policy.name}',
+            'body': f'{claim.reason} {claim.comment or ""}',
+        }
+
+
+class FeedbackDocument(SearchDocument):
+    """A ticket is indexed together with its comments."""
+    kind = 'feedback'
+    model_label = 'feedback_support.Feedback'
+    columns = ('identifier', 'names', 'body')
+    icontains_fields = ('ticket_id', 'created_by__username', 'policy_name__name', 'category', 'description')
+
+    def queryset(self):
+        return super().queryset().select_related('created_by', 'policy_name').prefetch_related('feedback_comments')
+
+    def text(self, feedback):
+        comments = ' '.join(comment.comment for comment in feedback.feedback_comments.all())
+        return {
+            'identifier': feedback.ticket_id,
+            'names': f'{feedback.created_by.username} {feedback.policy_name.name} {feedback.category}',
+            'body': f'{feedback.description} {comments}',
+        }
+
+
+DOCUMENTS = {document.kind: document for document in (ClaimDocument(), FeedbackDocument())}
+
+
+class SearchBackend:
+    """
+    Interface for the search index behind the admin and ticket searches.
+    Backends that need no index (icontains) make update/remove no-ops.
+    """
+
+    def update(self, kind, pks):
+        """(Re)index the objects with these primary keys; missing ones are removed."""
+        raise NotImplementedError
+
+    def remove(self, kind, pks):
+        raise NotImplementedError
+
+    def rebuild(self, kind, batch_size=500):
+        """Recreate the whole index for `kind`. Returns the number of objects indexed."""
+        raise NotImplementedError
+
+    def filter(self, queryset, kind, query):
+        """Restrict `queryset` to matches, keeping its own ordering."""
+        raise NotImplementedError
+
+    def ranked_ids(self, kind, query, limit, within=None):
+        """Primary keys of the best `limit` matches, best first, optionally within a queryset."""
+        raise NotImplementedError
+
+    def rank(self, queryset, kind, query, limit=None):
+        """Restrict `queryset` to its best matches and order them by relevance."""
+        limit = limit or settings.SEARCH_MAX_RESULTS
+        ids = self.ranked_ids(kind, query, limit, within=queryset)
+        ordering = Case(*[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+                        output_field=IntegerField())
+        return queryset.filter(pk__in=ids).order_by(ordering) if ids else queryset.none()
+
+
+class IContainsBackend(SearchBackend):
+    """Unindexed fallback for databases without a full-text engine: scans with icontains."""
+
+    def update(self, kind, pks):
+        pass
+
+    def remove(self, kind, pks):
+        pass
+
+    def rebuild(self, kind, batch_size=500):
+        return 0
+
+    def _matches(self, kind, query):
+        condition = Q()
+        for token in TOKEN_RE.findall(query):
+            any_field = Q()
+            for field in DOCUMENTS[kind].icontains_fields:
+                any_field |= Q(**{f'{field}__icontains': token})
+            condition &= any_field
+        return condition
+
+    def filter(self, queryset, kind, query):
+        if not TOKEN_RE.search(query):
+            return queryset.none()
+        return queryset.filter(self._matches(kind, query))
+
+    def ranked_ids(self, kind, query, limit, within=None):
+        queryset = within if within is not None else DOCUMENTS[kind].queryset()
+        # No relevance score without an index: newest first
+        return list(self.filter(queryset, kind, query).order_by('-pk').values_list('pk', flat=True)[:limit])
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    One FTS5 table per kind (search_claim, search_feedback) whose rowid is the
+    object's primary key, so updates and deletes are rowid lookups and a
+    search reads only the posting lists of its terms.
+
+    Tokens only match as prefixes, so each kind also has a trigram-tokenized
+    table of its IDs (search_claim_id, ...) where a query that looks like an
+    ID matches anywhere ('0001' finds CLM0001) from the index, as the
+    icontains search did by scanning; those matches rank first.
+    """
+    # bm25() weights for (identifier, names, body): an ID hit outranks a name, a name outranks text
+    WEIGHTS = (10.0, 5.0, 1.0)
+
+    @staticmethod
+    def table(kind):
+        return f'search_{kind}'
+
+    @staticmethod
+    def id_table(kind):
+        return f'search_{kind}_id'
+
+    @staticmethod
+    def match_expression(query):
+        """Every word must match, as a prefix: 'knee surg' -> "knee"* "surg"*"""
+        return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+    @staticmethod
+    def id_match_expression(query):
+        """The trigram MATCH for a query that looks like an ID ('0001' -> "0001"), else None."""
+        match = ID_QUERY_RE.match(query)
+        return f'"{match.group(1)}"' if match else None
+
+    def _connection(self, kind):
+        return connections[router.db_for_write(DOCUMENTS[kind].model)]
+
+    def create_table(self, kind, connection=None):
+        connection = connection or self._connection(kind)
+        columns = ', '.join(DOCUMENTS[kind].columns)
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table(kind)} "
+                           f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')")
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.id_table(kind)} "
+                           f"USING fts5(identifier, tokenize='trigram')")
+
+    def update(self, kind, pks):
+        document = DOCUMENTS[kind]
+        pks = set(pks)
+        rows = [(obj.pk, *document.text(obj).values()) for obj in document.queryset().filter(pk__in=pks)]
+        missing = pks - {row[0] for row in rows}
+        if missing:
+            self.remove(kind, missing)
+        if rows:
+            placeholders = ', '.join(['%s'] * (len(document.columns) + 1))
+            with self._connection(kind).cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT OR REPLACE INTO {self.table(kind)} (rowid, {', '.join(document.columns)}) "
+                    f"VALUES ({placeholders})", rows,
+                )
+                cursor.executemany(f"INSERT OR REPLACE INTO {self.id_table(kind)} (rowid, identifier) "
+                                   f"VALUES (%s, %s)", [row[:2] for row in rows])
+
+    def remove(self, kind, pks):
+        pks = [(pk,) for pk in pks]
+        with self._connection(kind).cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table(kind)} WHERE rowid = %s", pks)
+            cursor.executemany(f"DELETE FROM {self.id_table(kind)} WHERE rowid = %s", pks)
+
+    def rebuild(self, kind, batch_size=500):
+        self.create_table(kind)
+        with self._connection(kind).cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table(kind)}")
+            cursor.execute(f"DELETE FROM {self.id_table(kind)}")
+        manager = DOCUMENTS[kind].model._default_manager
+        indexed, last_pk = 0, None
+        while True:
+            batch = manager.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return indexed
+            self.update(kind, pks)
+            indexed += len(pks)
+            last_pk = pks[-1]
+
+    def filter(self, queryset, kind, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        table, id_table = self.table(kind), self.id_table(kind)
+        sql, params = f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match]
+        id_match = self.id_match_expression(query)
+        if id_match:
+            sql += f" UNION SELECT rowid FROM {id_table} WHERE {id_table} MATCH %s"
+            params.append(id_match)
+        return queryset.filter(pk__in=RawSQL(sql, params))
+
+    def ranked_ids(self, kind, query, limit, within=None):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        table, id_table = self.table(kind), self.id_table(kind)
+        within_sql, within_params = '', ()
+        if within is not None:
+            subquery, within_params = within.order_by().values('pk').query.sql_with_params()
+            within_sql = f" AND rowid IN ({subquery})"
+
+        # Text matches by relevance, after the ID matches (newest first) when the query looks like an ID
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        sql = (f"SELECT rowid, 1 AS tier, bm25({table}, {weights}) AS score FROM {table} "
+               f"WHERE {table} MATCH %s{within_sql}")
+        params = [match, *within_params]
+        id_match = self.id_match_expression(query)
+        if id_match:
+            sql += f" AND rowid NOT IN (SELECT rowid FROM {id_table} WHERE {id_table} MATCH %s)"
+            sql = (f"SELECT rowid, 0 AS tier, -rowid AS score FROM {id_table} "
+                   f"WHERE {id_table} MATCH %s{within_sql} UNION ALL {sql}")
+            params = [id_match, *within_params, *params, id_match]
+        sql = f"SELECT rowid FROM ({sql}) ORDER BY tier, score LIMIT %s"
+        params.append(limit)
+        with self._connection(kind).cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+SEARCH_BACKENDS = {
+    'sqlite-fts5': SQLiteFTS5Backend,
+    'icontains': IContainsBackend,
+}
+
+
+def get_search_backend():
+    """Return the backend named by SEARCH_BACKEND (an alias or a dotted path)."""
+    backend = getattr(settings, 'SEARCH_BACKEND', 'icontains')
+    backend_class = SEARCH_BACKENDS.get(backend) or import_string(backend)
+    return backend_class()
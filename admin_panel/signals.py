@@ -0,0 +1,282 @@
+# admin_panel/signals.py
+from collections import Counter
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from claims.signals import claims_bulk_written
+from feedback_support.models import Feedback, FeedbackComment
+from network_provider.models import NetworkProvider
+from policy.models import Claim, Policy, UserPolicy
+
+from .activity import (
+    claim_filed_event, claim_status_event, policy_added_event, policy_purchased_event, record_events,
+    ticket_opened_event, user_registered_event,
+)
+from .facets import adjust_facets, bulk_created_deltas, bulk_status_deltas, claim_deltas
+from .models import ClaimDailyRollup
+from .report_cache import invalidate_report_tags
+from .rollups import ROLLUPS, difference, moved_status_deltas
+from .search import get_search_backend
+from .stats import OPEN_FEEDBACK_STATUS, adjust_counters, claim_counter_deltas, refresh_policy_counters
+
+# Rows per IN (...) lookup when resolving bulk-written claims
+LOOKUP_CHUNK_SIZE = 900
+
+
+# Claim facets and dashboard counters, adjusted in the writing transaction
+
+def _count_claims(facet_deltas, total=0):
+    adjust_facets(facet_deltas)
+    adjust_counters(claim_counter_deltas(facet_deltas, total))
+
+
+@receiver(post_save, sender=Claim)
+def count_saved_claim(sender, instance, created, **kwargs):
+    if created:
+        _count_claims(claim_deltas(instance, 1), total=1)
+        return
+
+    # Claim.save() keeps the values loaded from the database until post_save has run
+    loaded = getattr(instance, '_loaded_versioned', None) or {}
+    old_status = loaded.get('status')
+    if old_status is not None and old_status != instance.status:
+        _count_claims(Counter({('status', old_status): -1, ('status', instance.status): 1}))
+
+
+@receiver(post_delete, sender=Claim)
+def count_deleted_claim(sender, instance, **kwargs):
+    _count_claims(claim_deltas(instance, -1), total=-1)
+
+
+@receiver(claims_bulk_written)
+def count_bulk_written_claims(sender, claim_ids, created, old_status=None, **kwargs):
+    claim_ids = list(claim_ids)
+    deltas = Counter()
+    for start in range(0, len(claim_ids), LOOKUP_CHUNK_SIZE):
+        chunk = claim_ids[start:start + LOOKUP_CHUNK_SIZE]
+        deltas.update(bulk_created_deltas(chunk) if created else bulk_status_deltas(chunk, old_status))
+    _count_claims(deltas, total=len(claim_ids) if created else 0)
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_feedback_status(sender, instance, **kwargs):
+    instance._previous_status = (
+        Feedback.objects.filter(pk=instance.pk).values_list('status', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Feedback)
+def count_saved_feedback(sender, instance, created, **kwargs):
+    was_open = getattr(instance, '_previous_status', None) == OPEN_FEEDBACK_STATUS
+    is_open = instance.status == OPEN_FEEDBACK_STATUS
+    adjust_counters({'feedback.total': 1 if created else 0, 'feedback.open': int(is_open) - int(was_open)})
+
+
+@receiver(post_delete, sender=Feedback)
+def count_deleted_feedback(sender, instance, **kwargs):
+    adjust_counters({'feedback.total': -1, 'feedback.open': -int(instance.status == OPEN_FEEDBACK_STATUS)})
+
+
+@receiver(post_save, sender=Policy)
+@receiver(post_delete, sender=Policy)
+def count_policies(sender, **kwargs):
+    refresh_policy_counters()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def count_new_user(sender, created, **kwargs):
+    if created:
+        adjust_counters({'users.total': 1})
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def count_deleted_user(sender, **kwargs):
+    adjust_counters({'users.total': -1})
+
+
+# Activity feed (admin_panel/activity.py): one appended row per event
+
+@receiver(post_save, sender=Claim)
+def log_saved_claim(sender, instance, created, **kwargs):
+    if created:
+        owner = instance.owner()
+        record_events([claim_filed_event(instance.claim_id, owner and owner['username'])])
+        return
+
+    loaded = getattr(instance, '_loaded_versioned', None) or {}
+    old_status = loaded.get('status')
+    if old_status is not None and old_status != instance.status:
+        record_events([claim_status_event(instance.claim_id, instance.status, instance.get_status_display())])
+
+
+@receiver(claims_bulk_written)
+def log_bulk_written_claims(sender, claim_ids, created, **kwargs):
+    claim_ids = list(claim_ids)
+    labels = dict(Claim.CLAIM_STATUS_CHOICES)
+    for start in range(0, len(claim_ids), LOOKUP_CHUNK_SIZE):
+        claims = Claim.objects.filter(pk__in=claim_ids[start:start + LOOKUP_CHUNK_SIZE]).order_by('pk')
+        if created:
+            events = [claim_filed_event(claim_id, username) for claim_id, username
+                      in claims.values_list('claim_id', 'user_policy__user__username')]
+        else:
+            events = [claim_status_event(claim_id, status, labels.get(status, status)) for claim_id, status
+                      in claims.values_list('claim_id', 'status')]
+        record_events(events)
+
+
+@receiver(post_save, sender=Feedback)
+def log_opened_ticket(sender, instance, created, **kwargs):
+    if created:
+        record_events([ticket_opened_event(instance.ticket_id, instance.created_by.username)])
+
+
+@receiver(post_save, sender=Policy)
+def log_added_policy(sender, instance, created, **kwargs):
+    if created:
+        record_events([policy_added_event(instance.policy_id, instance.name)])
+
+
+@receiver(post_save, sender=UserPolicy)
+def log_purchased_policy(sender, instance, created, **kwargs):
+    if created:
+        record_events([policy_purchased_event(instance.policy.policy_id, instance.policy.name, instance.user.username)])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def log_registered_user(sender, instance, created, **kwargs):
+    if created:
+        record_events([user_registered_event(instance.username)])
+
+
+# Daily rollups (admin_panel/rollups.py): the facts a write touched, before and after.
+# Only the stored state before a save is read back; everything else comes from the instance.
+
+ROLLUP_SOURCES = {Claim: 'claim', UserPolicy: 'policy'}
+
+
+@receiver(pre_save, sender=Claim)
+@receiver(pre_save, sender=UserPolicy)
+def remember_rollup_facts(sender, instance, **kwargs):
+    rollup = ROLLUPS[ROLLUP_SOURCES[sender]]
+    adding = instance._state.adding or instance.pk is None
+    stored = None if adding else rollup.stored(instance.pk)
+    instance._rollup_facts = rollup.facts_of(stored) if stored else {}
+    if sender is Claim and stored and stored.user_policy_id == instance.user_policy_id:
+        # The owner was loaded with the stored claim; the other handlers reuse it
+        instance._owner = stored._owner
+
+
+@receiver(pre_delete, sender=Claim)
+@receiver(pre_delete, sender=UserPolicy)
+def remember_deleted_rollup_facts(sender, instance, **kwargs):
+    # Before any row of a cascade is gone, so the claim's owner can still be looked up
+    instance._rollup_facts = ROLLUPS[ROLLUP_SOURCES[sender]].facts_of(instance)
+
+
+@receiver(post_save, sender=Claim)
+@receiver(post_save, sender=UserPolicy)
+def roll_up_saved(sender, instance, **kwargs):
+    rollup = ROLLUPS[ROLLUP_SOURCES[sender]]
+    rollup.adjust(difference(rollup.facts_of(instance), getattr(instance, '_rollup_facts', {})))
+
+
+@receiver(post_delete, sender=Claim)
+@receiver(post_delete, sender=UserPolicy)
+def roll_up_deleted(sender, instance, **kwargs):
+    ROLLUPS[ROLLUP_SOURCES[sender]].adjust(difference({}, getattr(instance, '_rollup_facts', {})))
+
+
+@receiver(claims_bulk_written)
+def roll_up_bulk_written_claims(sender, claim_ids, created, old_status=None, **kwargs):
+    rollup = ROLLUPS['claim']
+    claim_ids = list(claim_ids)
+    for start in range(0, len(claim_ids), LOOKUP_CHUNK_SIZE):
+        grouped = rollup.facts_for(claim_ids[start:start + LOOKUP_CHUNK_SIZE])
+        # Bulk moves only leave pending statuses, where no claim has a turnaround yet
+        rollup.adjust(difference(grouped, {}) if created
+                      else moved_status_deltas(grouped, old_status, unset=('turnaround_total',)))
+
+
+@receiver(pre_delete, sender=NetworkProvider)
+def fold_deleted_provider_rollup(sender, instance, **kwargs):
+    # Claim.provider is SET_NULL by a plain UPDATE (no claim signals), and the provider's
+    # rollup rows cascade away; their counts move to the rows without a provider first
+    rollup = ROLLUPS['claim']
+    measures = list(rollup.measures)
+    deltas = {}
+    for row in ClaimDailyRollup.objects.filter(provider=instance).values('day', 'status', 'policy_id', *measures):
+        deltas[(row['day'], row['status'], row['policy_id'], None)] = {measure: row[measure] for measure in measures}
+    rollup.adjust(deltas)
+
+
+# Full-text search index (admin_panel/search.py), updated in the writing transaction
+
+@receiver(post_save, sender=Claim)
+def index_saved_claim(sender, instance, **kwargs):
+    get_search_backend().update('claim', [instance.pk])
+
+
+@receiver(post_delete, sender=Claim)
+def unindex_deleted_claim(sender, instance, **kwargs):
+    get_search_backend().remove('claim', [instance.pk])
+
+
+@receiver(claims_bulk_written)
+def index_bulk_written_claims(sender, claim_ids, **kwargs):
+    backend = get_search_backend()
+    claim_ids = list(claim_ids)
+    for start in range(0, len(claim_ids), LOOKUP_CHUNK_SIZE):
+        backend.update('claim', claim_ids[start:start + LOOKUP_CHUNK_SIZE])
+
+
+@receiver(post_save, sender=Feedback)
+def index_saved_feedback(sender, instance, **kwargs):
+    get_search_backend().update('feedback', [instance.pk])
+
+
+@receiver(post_delete, sender=Feedback)
+def unindex_deleted_feedback(sender, instance, **kwargs):
+    get_search_backend().remove('feedback', [instance.pk])
+
+
+@receiver(post_save, sender=FeedbackComment)
+@receiver(post_delete, sender=FeedbackComment)
+def reindex_commented_feedback(sender, instance, **kwargs):
+    # Comments are indexed as part of their ticket; a ticket deleted along with them is removed
+    get_search_backend().update('feedback', [instance.feedback_id])
+
+
+# Cached report results (admin_panel/report_cache.py), retired when the writing transaction commits
+
+REPORT_CACHE_TAGS = {Claim: 'claims', UserPolicy: 'policies', Policy: 'policies', NetworkProvider: 'providers'}
+
+
+@receiver(post_save, sender=Claim)
+@receiver(post_save, sender=UserPolicy)
+@receiver(post_save, sender=Policy)
+@receiver(post_save, sender=NetworkProvider)
+@receiver(post_delete, sender=Claim)
+@receiver(post_delete, sender=UserPolicy)
+@receiver(post_delete, sender=Policy)
+@receiver(post_delete, sender=NetworkProvider)
+def invalidate_cached_reports(sender, **kwargs):
+    invalidate_report_tags(REPORT_CACHE_TAGS[sender])
+
+
+@receiver(claims_bulk_written)
+def invalidate_reports_for_bulk_written_claims(sender, **kwargs):
+    invalidate_report_tags('claims')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_reports_for_saved_user(sender, update_fields=None, **kwargs):
+    # Reports show usernames only; a login saves last_login alone
+    if update_fields is None or 'username' in update_fields:
+        invalidate_report_tags('users')
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_reports_for_deleted_user(sender, **kwargs):
+    invalidate_report_tags('users')
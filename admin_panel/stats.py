@@ -0,0 +1,107 @@
+# admin_panel/stats.py
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from feedback_support.models import Feedback
+from policy.models import Claim, Policy
+
+from .live import publish_counter_deltas
+from .models import DashboardCounter
+
+# Ticket status that counts as waiting for support
+OPEN_FEEDBACK_STATUS = 'Open'
+
+
+def compute_counters():
+    """
+    Recompute every counter from the source tables: one conditional
+    aggregation query per table instead of one COUNT per number.
+    """
+    claims = Claim.objects.aggregate(
+        total=Count('id'),
+        **{code: Count('id', filter=Q(status=code)) for code in Claim.STATUS_CODES},
+    )
+    policies = Policy.objects.aggregate(total=Count('id'), premium_total=Sum('premium'))
+    feedback = Feedback.objects.aggregate(
+        total=Count('id'), open=Count('id', filter=Q(status=OPEN_FEEDBACK_STATUS)),
+    )
+    users = get_user_model().objects.aggregate(total=Count('pk'))
+
+    counters = {}
+    for prefix, values in (('claims', claims), ('policies', policies), ('feedback', feedback), ('users', users)):
+        for key, value in values.items():
+            counters[f'{prefix}.{key}'] = value or 0
+    return counters
+
+
+def reconcile_counters():
+    """Overwrite the stored counters with freshly computed values. Returns {name: (stored, actual)} for drifted ones."""
+    actual = compute_counters()
+    with transaction.atomic():
+        stored = dict(DashboardCounter.objects.select_for_update().values_list('name', 'value'))
+        DashboardCounter.objects.bulk_create(
+            [DashboardCounter(name=name, value=value, updated_at=timezone.now()) for name, value in actual.items()],
+            update_conflicts=True, unique_fields=['name'], update_fields=['value', 'updated_at'],
+        )
+    return {name: (stored.get(name), value) for name, value in actual.items() if stored.get(name) != value}
+
+
+def dashboard_stats():
+    """
+    The dashboard numbers from the counters table: one small indexed read.
+    Counters are created on first use.
+    """
+    counters = dict(DashboardCounter.objects.values_list('name', 'value'))
+    if not counters:
+        reconcile_counters()
+        counters = dict(DashboardCounter.objects.values_list('name', 'value'))
+
+    def count(name):
+        return int(counters.get(name, 0))
+
+    return {
+        'total_claims': count('claims.total'),
+        'claims_by_status': {code: count(f'claims.{code}') for code in Claim.STATUS_CODES},
+        'active_claims': sum(count(f'claims.{code}') for code in Claim.PENDING_STATUSES),
+        'pending_review_claims': count('claims.SUBMITTED'),
+        'approved_claims': count('claims.APPROVED'),
+        'rejected_claims': count('claims.REJECTED'),
+        'total_policies': count('policies.total'),
+        'total_revenue': counters.get('policies.premium_total', 0),
+        'pending_feedback': count('feedback.open'),
+        'total_feedback': count('feedback.total'),
+        'total_users': count('users.total'),
+    }
+
+
+def adjust_counters(deltas):
+    """
+    Apply {name: delta} inside the current transaction and push the badge
+    changes to live dashboards on commit. Missing counters are left to reconciliation.
+    """
+    now = timezone.now()
+    for name, delta in deltas.items():
+        if delta:
+            DashboardCounter.objects.filter(name=name).update(value=F('value') + delta, updated_at=now)
+    publish_counter_deltas(deltas)
+
+
+def refresh_policy_counters():
+    """Policies are few and their premiums change in place, so their counters are recomputed."""
+    policies = Policy.objects.aggregate(total=Count('id'), premium_total=Sum('premium'))
+    now = timezone.now()
+    for key, value in policies.items():
+        DashboardCounter.objects.filter(name=f'policies.{key}').update(value=value or 0, updated_at=now)
+
+
+def claim_counter_deltas(facet_deltas, total=0):
+    """Claim counters move with the status facets (admin_panel/facets.py), plus the total."""
+    deltas = Counter({'claims.total': total})
+    for (kind, value), delta in facet_deltas.items():
+        if kind == 'status':
+            deltas[f'claims.{value}'] += delta
+    return deltas
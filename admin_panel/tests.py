@@ -1,3 +1,764 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from claims.adjudication import transition_claims
+from claims.models import ClaimStatusChange
+from feedback_support.models import Feedback
+from feedback_support.models import NetworkProvider as FeedbackProvider
+from feedback_support.models import Policy as FeedbackPolicy
+from network_provider.models import NetworkProvider
+from policy.models import Claim, UserPolicy
+from policy.testing import create_policy, create_policy_holder
+
+from .activity import activity_page, prune_activity, record_events, retention_cutoff, user_registered_event
+from .columnar import ColumnarExport, export_chunks, read_columnar
+from .exports import csv_chunks, gzip_chunks
+from .facets import facet_options, rebuild_claim_facets
+from .live import publisher
+from .models import ActivityEvent, ClaimDailyRollup, ClaimFacet, DashboardCounter, ExportCursor
+from .pdf import MARGIN, PAGE_SIZE, rows_that_fit, write_table_pdf
+from .report_cache import cached_report, invalidate_report_tags
+from .report_jobs import expire_report_jobs, report_job_payload, run_report_job, submit_report_job
+from .reports import dashboard_metrics
+from .rollups import ROLLUPS
+from .search import SQLiteFTS5Backend
+from .stats import dashboard_stats, reconcile_counters
+from .trends import bucket_start, bucket_starts, default_range, next_bucket, trend_series
+
+
+class ReportingEngineQueryBudgetTests(TestCase):
+    """The reports read the daily rollups, so their query counts do not grow with the data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder('admin', is_staff=True)
+        cls.admin = cls.user_policy.user
+        cls.providers = [
+            NetworkProvider.objects.create(provider_id=provider_id, hospital_name=name, location='Chennai',
+                                           contact='0440000000', type='Hospital', network_type='Cashless',
+                                           coverage_limit='5 Lakh')
+            for provider_id, name in (('NP1', 'Apollo'), ('NP2', 'Fortis'))
+        ]
+        cls.add_activity(3)
+
+    @classmethod
+    def add_activity(cls, count):
+        for index in range(count):
+            Claim.objects.create(user_policy=cls.user_policy, reason='Checkup', claim_amount=1000 + index,
+                                 provider=cls.providers[index % 2],
+                                 status='APPROVED' if index % 2 else 'SUBMITTED')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_dashboard_metrics_take_one_query_per_table(self):
+        NetworkProvider.objects.create(provider_id='NP3', hospital_name='Manipal', location='Chennai',
+                                       contact='0440000000', type='Hospital', network_type='Cashless',
+                                       coverage_limit='5 Lakh')
+        today = timezone.localdate()
+        with self.assertNumQueries(5):
+            metrics = dashboard_metrics(today - timedelta(days=30), today)
+        self.assertEqual(metrics['total_claims'], 3)
+        self.assertEqual(metrics['approved_claims'], 1)
+        self.assertEqual(metrics['pending_claims'], 2)
+        self.assertEqual(metrics['active_policies'], 1)
+        # Every provider in the network counts, with claims or not
+        self.assertEqual(metrics['total_providers'], 3)
+        self.assertEqual(metrics['provider_approval_rate'], 100.0)
+        apollo, fortis = metrics['top_providers']
+        self.assertEqual((apollo['name'], apollo['total_claims'], apollo['approval_rate']), ('Apollo', 2, None))
+        self.assertEqual((fortis['total_claims'], fortis['approved_amount'], fortis['approval_rate']), (1, 1001, 100.0))
+        self.assertIsNotNone(fortis['avg_turnaround_days'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_activity(20)
+        with self.assertNumQueries(5):
+            metrics = dashboard_metrics(today - timedelta(days=30), today)
+        self.assertEqual(metrics['total_claims'], 23)
+        self.assertEqual(metrics['top_providers'][0]['total_claims'], 12)
+
+    def test_report_views_query_budgets(self):
+        # Two queries per request load the session and the user
+        budgets = [
+            ('/admin_panel/reports/', 7),
+            ('/admin_panel/reports/chart-data/?type=revenue', 3),
+            ('/admin_panel/reports/claims/?format=csv', 3),
+            ('/admin_panel/reports/policy-usage/?format=csv', 4),
+            ('/admin_panel/reports/provider/?format=csv', 3),
+            ('/admin_panel/reports/monthly-trends/?format=csv', 4),
+            ('/admin_panel/reports/claims/', 3),
+        ]
+        for url, queries in budgets:
+            # Measured cold: the dashboard caches the provider performance the provider report reads
+            cache.clear()
+            with self.subTest(url=url), self.assertNumQueries(queries):
+                response = self.client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+
+    def test_cached_reports_skip_the_database(self):
+        self.client.get('/admin_panel/reports/')
+        with self.assertNumQueries(2):
+            response = self.client.get('/admin_panel/reports/')
+        self.assertEqual(response.context['total_claims'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_activity(1)
+        response = self.client.get('/admin_panel/reports/')
+        self.assertEqual(response.context['total_claims'], 4)
+
+
+class ClaimFacetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gold = create_policy_holder('asha')
+        cls.silver = create_policy_holder('ravi', policy=create_policy('POL2', 'Silver Care'))
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        return {(facet.kind, facet.value): facet.claim_count for facet in ClaimFacet.objects.exclude(claim_count=0)}
+
+    def test_claim_writes_keep_the_counts(self):
+        claim = Claim.objects.create(user_policy=self.gold, reason='Checkup', claim_amount=100)
+        Claim.objects.create(user_policy=self.silver, reason='Checkup', claim_amount=100)
+        transition_claims([claim.claim_id], 'UNDER_REVIEW')
+        self.assertEqual(self.counts(), {
+            ('user', 'asha'): 1, ('user', 'ravi'): 1, ('policy', 'Gold Care'): 1, ('policy', 'Silver Care'): 1,
+            ('status', 'SUBMITTED'): 1, ('status', 'UNDER_REVIEW'): 1,
+        })
+
+        claim.refresh_from_db()
+        claim.delete()
+        self.assertEqual(self.counts(), {('user', 'ravi'): 1, ('policy', 'Silver Care'): 1, ('status', 'SUBMITTED'): 1})
+        before = self.counts()
+        rebuild_claim_facets()
+        self.assertEqual(self.counts(), before)
+
+    def test_options_are_cached_until_a_claim_write_commits(self):
+        self.assertEqual(facet_options()['user'], [])
+        with self.assertNumQueries(0):
+            facet_options()
+        with self.captureOnCommitCallbacks(execute=True):
+            Claim.objects.create(user_policy=self.gold, reason='Checkup', claim_amount=100)
+        options = facet_options()
+        self.assertEqual((options['user'], options['policy'], options['status']), (['asha'], ['Gold Care'], ['SUBMITTED']))
+
+
+class AdminClaimsBrowserTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder('admin', is_staff=True)
+        filed = timezone.now() - timedelta(days=5)
+        cls.claims = []
+        for index in range(5):
+            claim = Claim.objects.create(user_policy=cls.user_policy, reason='Checkup', claim_amount=100 + index)
+            # Two claims share each filing time, so pages must break ties on the id
+            Claim.objects.filter(pk=claim.pk).update(filed_date=filed + timedelta(hours=index // 2))
+            cls.claims.append(claim)
+
+    def setUp(self):
+        self.client.force_login(self.user_policy.user)
+
+    def browse(self, **params):
+        pages, cursor = [], None
+        while True:
+            context = self.client.get('/admin_panel/claims/', {**params, **({'cursor': cursor} if cursor else {})}).context
+            pages.append([claim.pk for claim in context['submitted_claims']])
+            cursor = context['next_cursor']
+            if cursor is None:
+                return pages
+
+    @override_settings(ADMIN_CLAIMS_PAGE_SIZE=2)
+    def test_keyset_pages_cover_every_claim_once(self):
+        newest_first = [claim.pk for claim in reversed(self.claims)]
+        self.assertEqual(self.browse(), [newest_first[:2], newest_first[2:4], newest_first[4:]])
+        self.assertEqual(self.browse(amount_min='102'), [newest_first[:2], newest_first[2:3]])
+
+    def test_filters_keep_the_cursor_out_of_the_paging_query(self):
+        with override_settings(ADMIN_CLAIMS_PAGE_SIZE=2):
+            context = self.client.get('/admin_panel/claims/', {'status': 'Submitted', 'cursor': 'x'}).context
+        self.assertEqual(context['filter_query'], 'status=Submitted')
+        self.assertEqual(context['status_list'], ['SUBMITTED'])
+
+
+class DashboardCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder()
+        reconcile_counters()
+
+    def assertInStep(self):
+        self.assertEqual(reconcile_counters(), {})
+
+    def test_claim_writes_move_the_status_counters(self):
+        claims = [Claim.objects.create(user_policy=self.user_policy, reason='Checkup', claim_amount=100)
+                  for _ in range(3)]
+        transition_claims([claim.claim_id for claim in claims[:2]], 'UNDER_REVIEW')
+        transition_claims([claims[0].claim_id], 'APPROVED')
+        Claim.objects.get(pk=claims[2].pk).delete()
+
+        stats = dashboard_stats()
+        self.assertEqual((stats['total_claims'], stats['active_claims'], stats['approved_claims']), (2, 1, 1))
+        self.assertEqual(stats['claims_by_status'], {'SUBMITTED': 0, 'UNDER_REVIEW': 1, 'APPROVED': 1, 'REJECTED': 0})
+        self.assertInStep()
+
+    def test_ticket_user_and_policy_writes_move_their_counters(self):
+        ticket = Feedback.objects.create(
+            category='Billing', description='Overcharged', created_by=self.user_policy.user,
+            policy_name=FeedbackPolicy.objects.create(name='Gold Care'),
+            network_provider=FeedbackProvider.objects.create(name='Apollo'),
+        )
+        self.assertEqual((dashboard_stats()['pending_feedback'], dashboard_stats()['total_feedback']), (1, 1))
+        ticket.status = 'Resolved'
+        ticket.save()
+        create_policy('POL2', 'Silver Care')
+
+        stats = dashboard_stats()
+        self.assertEqual((stats['pending_feedback'], stats['total_feedback']), (0, 1))
+        self.assertEqual((stats['total_policies'], stats['total_revenue'], stats['total_users']), (2, 2400, 1))
+        self.assertInStep()
+
+    def test_reconciliation_reports_and_repairs_drift(self):
+        DashboardCounter.objects.filter(name='users.total').update(value=7)
+        out = io.StringIO()
+        call_command('reconcile_dashboard_counters', stdout=out)
+        self.assertIn('users.total: 7.00 -> 1', out.getvalue())
+        self.assertEqual(dashboard_stats()['total_users'], 1)
+
+
+class ClaimRollupTests(TestCase):
+    """Single-claim writes move their count and amount between daily rollup rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gold, cls.silver = create_policy(), create_policy('POL2', 'Silver Care')
+        cls.gold_holding = create_policy_holder(policy=cls.gold)
+        cls.silver_holding = UserPolicy.objects.create(user=cls.gold_holding.user, policy=cls.silver, status='ACTIVE')
+
+    def setUp(self):
+        claim = Claim.objects.create(user_policy=self.gold_holding, reason='Checkup', claim_amount=250)
+        self.claim = Claim.objects.get(pk=claim.pk)
+        self.today = timezone.localdate(self.claim.filed_date)
+
+    def rollup(self):
+        return {
+            (row.day, row.status, row.policy_id): (row.claim_count, row.amount_total)
+            for row in ClaimDailyRollup.objects.exclude(claim_count=0)
+        }
+
+    def test_a_new_claim_is_counted(self):
+        self.assertEqual(self.rollup(), {(self.today, 'SUBMITTED', self.gold.pk): (1, 250)})
+
+    def test_a_status_change_moves_the_claim(self):
+        self.claim.status = 'UNDER_REVIEW'
+        self.claim.save()
+        self.assertEqual(self.rollup(), {(self.today, 'UNDER_REVIEW', self.gold.pk): (1, 250)})
+
+    def test_a_policy_change_moves_the_claim(self):
+        self.claim.user_policy = self.silver_holding
+        self.claim.claim_amount = 300
+        self.claim.save()
+        self.assertEqual(self.rollup(), {(self.today, 'SUBMITTED', self.silver.pk): (1, 300)})
+
+    def test_a_filing_day_change_moves_the_claim(self):
+        self.claim.filed_date -= timedelta(days=3)
+        self.claim.save()
+        self.assertEqual(self.rollup(), {(self.today - timedelta(days=3), 'SUBMITTED', self.gold.pk): (1, 250)})
+
+    def test_a_deleted_claim_is_uncounted(self):
+        self.claim.delete()
+        self.assertEqual(self.rollup(), {})
+
+    def test_a_provider_change_moves_the_claim(self):
+        apollo = NetworkProvider.objects.create(provider_id='NP1', hospital_name='Apollo', location='Chennai',
+                                                contact='0440000000', type='Hospital', network_type='Cashless',
+                                                coverage_limit='5 Lakh')
+        self.claim.provider = apollo
+        self.claim.save()
+        rows = ClaimDailyRollup.objects.exclude(claim_count=0)
+        self.assertEqual([(row.provider_id, row.claim_count) for row in rows], [(apollo.pk, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apollo.delete()
+        # The deleted provider's claims are folded into the rows without a provider
+        rows = ClaimDailyRollup.objects.all()
+        self.assertEqual([(row.provider_id, row.claim_count, row.amount_total) for row in rows], [(None, 1, 250)])
+
+    def test_a_decision_adds_the_turnaround(self):
+        self.claim.status = 'APPROVED'
+        self.claim.save()
+        row = ClaimDailyRollup.objects.get(status='APPROVED')
+        self.assertEqual(row.turnaround_total, self.claim.decided_at - self.claim.filed_date)
+        self.assertEqual(ClaimDailyRollup.objects.get(status='SUBMITTED').turnaround_total, timedelta(0))
+
+    def test_a_bulk_decision_adds_the_turnaround_to_the_new_status_only(self):
+        transition_claims([self.claim.claim_id], 'UNDER_REVIEW')
+        transition_claims([self.claim.claim_id], 'APPROVED')
+        claim = Claim.objects.get(pk=self.claim.pk)
+        rows = {row.status: (row.claim_count, row.turnaround_total) for row in ClaimDailyRollup.objects.all()}
+        self.assertEqual(rows['UNDER_REVIEW'], (0, timedelta(0)))
+        self.assertEqual(rows['APPROVED'], (1, claim.decided_at - claim.filed_date))
+
+    def test_a_status_change_reads_the_stored_claim_once(self):
+        self.claim.status = 'UNDER_REVIEW'
+        with CaptureQueriesContext(connection) as queries:
+            self.claim.save()
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        # The stored claim with its owner (rollups, facets, summaries), and the search index row
+        self.assertEqual(len(selects), 2, selects)
+
+
+class TrendBucketTests(SimpleTestCase):
+
+    def test_buckets_start_on_mondays_months_and_quarters(self):
+        sunday = date(2026, 2, 1)
+        self.assertEqual(bucket_start(sunday, 'week'), date(2026, 1, 26))
+        self.assertEqual(bucket_start(sunday, 'month'), date(2026, 2, 1))
+        self.assertEqual(bucket_start(date(2026, 12, 31), 'quarter'), date(2026, 10, 1))
+        self.assertEqual(next_bucket(date(2026, 12, 1), 'month'), date(2027, 1, 1))
+        self.assertEqual(next_bucket(date(2026, 10, 1), 'quarter'), date(2027, 1, 1))
+
+    def test_bucket_lists_cover_partial_buckets_at_both_ends(self):
+        self.assertEqual(bucket_starts(date(2026, 1, 31), date(2026, 2, 2), 'week'),
+                         [date(2026, 1, 26), date(2026, 2, 2)])
+        self.assertEqual(bucket_starts(date(2025, 12, 15), date(2026, 1, 15), 'month'),
+                         [date(2025, 12, 1), date(2026, 1, 1)])
+
+    def test_default_range_is_the_last_whole_months(self):
+        self.assertEqual(default_range(periods=6, today=date(2026, 3, 15)), (date(2025, 9, 1), date(2026, 2, 28)))
+
+
+class TrendSeriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user_policy = create_policy_holder()
+        local = timezone.get_current_timezone()
+        # Late on Saturday 31 Jan, early on Sunday 1 Feb and on Monday 2 Feb, local time
+        for filed in ((2026, 1, 31, 23, 30), (2026, 2, 1, 0, 30), (2026, 2, 2, 9, 0)):
+            claim = Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=100)
+            Claim.objects.filter(pk=claim.pk).update(filed_date=datetime(*filed, tzinfo=local))
+        ROLLUPS['claim'].rebuild()
+
+    def claims(self, granularity):
+        return trend_series(date(2026, 1, 31), date(2026, 2, 2), granularity, series=('claims',))['claims']
+
+    def test_claims_fall_in_the_local_day_week_and_month_they_were_filed(self):
+        self.assertEqual(self.claims('day'), [1, 1, 1])
+        # Saturday and Sunday close the week of 26 January
+        self.assertEqual(self.claims('week'), [2, 1])
+        self.assertEqual(self.claims('month'), [1, 2])
+
+    def test_unknown_granularities_are_refused(self):
+        with self.assertRaises(ValueError):
+            trend_series(date(2026, 1, 1), date(2026, 2, 1), 'year')
+
+
+class ReportCacheTagTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.computed = 0
+
+    def compute(self):
+        self.computed += 1
+        return {'computed': self.computed}
+
+    def claims_report(self):
+        return cached_report('claims', {'status': 'all'}, self.compute)
+
+    def test_a_tag_is_retired_only_when_the_transaction_commits(self):
+        self.claims_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_report_tags('claims')
+            self.assertEqual(self.claims_report(), {'computed': 1})
+        self.assertEqual(self.claims_report(), {'computed': 2})
+
+    def test_rolled_back_writes_keep_the_cached_result(self):
+        self.claims_report()
+        with self.captureOnCommitCallbacks(execute=False):
+            invalidate_report_tags('claims')
+        self.assertEqual(self.claims_report(), {'computed': 1})
+
+    def test_only_reports_tagged_with_the_written_table_are_retired(self):
+        self.claims_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_report_tags('providers')
+        self.assertEqual(self.claims_report(), {'computed': 1})
+
+    def test_renaming_a_policy_retires_the_claims_report(self):
+        policy = create_policy()
+        self.claims_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            policy.name = 'Platinum Care'
+            policy.save()
+        self.assertEqual(self.claims_report(), {'computed': 2})
+
+    def test_renaming_a_user_retires_the_claims_report_but_logging_in_does_not(self):
+        user = create_policy_holder().user
+        self.claims_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username=user.username, password='secret')
+        self.assertEqual(self.claims_report(), {'computed': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.username = 'renamed'
+            user.save()
+        self.assertEqual(self.claims_report(), {'computed': 2})
+
+
+@override_settings(REPORT_JOB_WORKERS=0)
+class ReportJobTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder('analyst', is_staff=True)
+        Claim.objects.create(user_policy=cls.user_policy, reason='Checkup', claim_amount=100)
+
+    def setUp(self):
+        cache.clear()
+
+    def submit(self):
+        """Submit the claims CSV job, run inline on commit, and return it as it ended."""
+        with self.captureOnCommitCallbacks(execute=True):
+            job = submit_report_job('claims', 'csv', {'start_date': '2026-01-01', 'ignored': 'x'})
+        job.refresh_from_db()
+        return job
+
+    def test_identical_requests_share_the_job_and_its_artifact(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            queued = submit_report_job('claims', 'csv', {'start_date': '2026-01-01'})
+            self.assertEqual(submit_report_job('claims', 'csv', {'start_date': '2026-01-01', 'ignored': 'x'}), queued)
+        self.assertNotEqual(submit_report_job('claims', 'pdf', {'start_date': '2026-01-01'}), queued)
+
+        self.assertEqual(run_report_job(queued.pk), 'READY')
+        ready = self.submit()
+        self.assertEqual((ready.pk, ready.status), (queued.pk, 'READY'))
+        with ready.artifact.open('rb') as artifact:
+            self.assertTrue(artifact.read().startswith(b'Claim ID,User,Policy'))
+
+    def test_a_write_to_the_reported_tables_retires_the_ready_artifact(self):
+        ready = self.submit()
+        with self.captureOnCommitCallbacks(execute=True):
+            Claim.objects.create(user_policy=self.user_policy, reason='Follow-up', claim_amount=200)
+        rebuilt = self.submit()
+        self.assertNotEqual(rebuilt.pk, ready.pk)
+        self.assertEqual(rebuilt.status, 'READY')
+
+    def test_a_failed_build_is_recorded_and_not_reused(self):
+        with mock.patch('admin_panel.report_jobs.build_report', side_effect=RuntimeError('out of paper')), \
+                self.assertLogs('admin_panel.report_jobs', 'ERROR'):
+            failed = self.submit()
+        self.assertEqual((failed.status, failed.last_error), ('FAILED', 'RuntimeError: out of paper'))
+        self.assertEqual(report_job_payload(failed)['error'], 'RuntimeError: out of paper')
+        self.assertNotEqual(self.submit().pk, failed.pk)
+
+    def test_expiry_deletes_artifacts_and_fails_stuck_jobs(self):
+        ready = self.submit()
+        name = ready.artifact.name
+        with self.captureOnCommitCallbacks(execute=False):
+            stuck = submit_report_job('provider', 'csv', {})
+
+        later = ready.expires_at + timedelta(minutes=1)
+        self.assertEqual(expire_report_jobs(now=later), (1, 1))
+        ready.refresh_from_db()
+        stuck.refresh_from_db()
+        self.assertEqual((ready.status, ready.artifact.name), ('EXPIRED', ''))
+        self.assertFalse(default_storage.exists(name))
+        self.assertEqual(stuck.status, 'FAILED')
+        self.assertNotEqual(self.submit().pk, ready.pk)
+
+
+class UpdateClaimStatusViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user_policy = create_policy_holder('admin', is_staff=True)
+        cls.admin = user_policy.user
+        cls.claim = Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=100)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def update(self, **data):
+        return self.client.post('/admin_panel/update-claim-status/', {'claim_id': self.claim.claim_id, **data})
+
+    def test_an_allowed_move_is_made_and_audited(self):
+        response = self.update(status='Under Review', comment='Looking into it')
+        self.assertEqual(response.json()['status'], 'success')
+        claim = Claim.objects.get(pk=self.claim.pk)
+        self.assertEqual((claim.status, claim.comment), ('UNDER_REVIEW', 'Looking into it'))
+        self.assertEqual(list(ClaimStatusChange.objects.values_list('from_status', 'to_status', 'changed_by')),
+                         [('SUBMITTED', 'UNDER_REVIEW', self.admin.pk)])
+
+    def test_an_illegal_move_is_refused_with_its_reason(self):
+        response = self.update(status='Rejected', comment='No')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Cannot move from SUBMITTED to REJECTED')
+        claim = Claim.objects.get(pk=self.claim.pk)
+        self.assertEqual((claim.status, claim.comment), ('SUBMITTED', None))
+        self.assertFalse(ClaimStatusChange.objects.exists())
+
+    def test_a_comment_alone_keeps_the_status(self):
+        self.assertEqual(self.update(comment='Bill received').json()['status'], 'success')
+        claim = Claim.objects.get(pk=self.claim.pk)
+        self.assertEqual((claim.status, claim.comment), ('SUBMITTED', 'Bill received'))
+        self.assertFalse(ClaimStatusChange.objects.exists())
+
+
+class ActivityFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_policy_holder('admin', is_staff=True).user
+        ActivityEvent.objects.all().delete()
+        cls.events = record_events(user_registered_event(f'member{index}') for index in range(5))
+
+    def ids(self, events):
+        return [event.id for event in events]
+
+    def test_pages_go_back_by_id_until_the_log_is_exhausted(self):
+        newest_first = self.ids(reversed(self.events))
+        page, before = activity_page(limit=2)
+        self.assertEqual(self.ids(page), newest_first[:2])
+        page, before = activity_page(before=before, limit=2)
+        self.assertEqual(self.ids(page), newest_first[2:4])
+        page, before = activity_page(before=before, limit=2)
+        self.assertEqual((self.ids(page), before), (newest_first[4:], None))
+
+    def test_polling_returns_only_unseen_events_oldest_first(self):
+        seen = self.events[2].id
+        page, before = activity_page(after=seen, limit=10)
+        self.assertEqual((self.ids(page), before), ([self.events[3].id, self.events[4].id], None))
+
+    def test_feed_view(self):
+        self.client.force_login(self.admin)
+        data = self.client.get('/admin_panel/activity/', {'after': self.events[3].id}).json()
+        self.assertEqual([event['object_ref'] for event in data['events']], ['member4'])
+        response = self.client.get('/admin_panel/activity/', {'before': 'latest'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pruning_archives_and_deletes_old_events_in_batches(self):
+        old = [event.id for event in self.events[:3]]
+        ActivityEvent.objects.filter(id__in=old).update(created_at=timezone.now() - timedelta(days=100))
+        archive = io.StringIO()
+        self.assertEqual(prune_activity(retention_cutoff(90), archive=archive, batch_size=2), 3)
+        self.assertEqual([json.loads(line)['id'] for line in archive.getvalue().splitlines()], old)
+        self.assertEqual(list(ActivityEvent.objects.order_by('id').values_list('id', flat=True)),
+                         [self.events[3].id, self.events[4].id])
+
+    def test_prune_command_appends_to_a_gzipped_archive(self):
+        ActivityEvent.objects.filter(id=self.events[0].id).update(created_at=timezone.now() - timedelta(days=100))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'activity.jsonl.gz')
+        call_command('prune_activity_events', days=90, archive=path, stdout=io.StringIO())
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            self.assertEqual([json.loads(line)['object_ref'] for line in archive], ['member0'])
+        self.assertEqual(ActivityEvent.objects.count(), 4)
+
+
+class LiveCountersPollTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user('admin', password='secret', is_staff=True)
+        self.client.force_login(admin)
+        self.async_client.force_login(admin)
+
+    def test_wsgi_requests_answer_at_once_and_pace_the_client(self):
+        with override_settings(LIVE_LONG_POLL_SECONDS=60):
+            started = time.monotonic()
+            data = self.client.get('/admin_panel/live/counters/poll/', {'seq': publisher.sequence}).json()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(data['retry_after'], 60)
+        self.assertEqual(data['values']['total_users'], 1)
+
+    async def test_asgi_requests_wait_for_a_change(self):
+        with override_settings(LIVE_LONG_POLL_SECONDS=0.1):
+            response = await self.async_client.get('/admin_panel/live/counters/poll/', {'seq': publisher.sequence})
+        data = response.json()
+        self.assertNotIn('retry_after', data)
+        self.assertEqual(data['seq'], publisher.sequence)
+
+
+class FTS5SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user_policy = create_policy_holder()
+        cls.first = Claim.objects.create(user_policy=user_policy, reason='Knee surgery', claim_amount=100)
+        cls.second = Claim.objects.create(user_policy=user_policy, reason='Claim 0001 follow-up', claim_amount=200)
+        cls.backend = SQLiteFTS5Backend()
+        cls.backend.rebuild('claim')
+
+    def search(self, query):
+        return set(self.backend.filter(Claim.objects.all(), 'claim', query).values_list('claim_id', flat=True))
+
+    def test_words_match_as_prefixes(self):
+        self.assertEqual(self.search('knee surg'), {'CLM0001'})
+        self.assertEqual(self.search('urgery'), set())
+
+    def test_id_fragments_match_anywhere_in_the_id(self):
+        self.assertEqual(self.search('CLM0001'), {'CLM0001'})
+        self.assertEqual(self.search('001'), {'CLM0001'})
+        # The second claim's reason mentions 0001 as a word
+        self.assertEqual(self.search('0001'), {'CLM0001', 'CLM0002'})
+
+        self.assertEqual(self.search('lm000'), {'CLM0001', 'CLM0002'})
+
+    def test_id_matches_rank_first(self):
+        ids = self.backend.ranked_ids('claim', '0001', limit=10)
+        self.assertEqual(ids, [self.first.pk, self.second.pk])
+        within = Claim.objects.filter(pk=self.second.pk)
+        self.assertEqual(self.backend.ranked_ids('claim', '0001', limit=10, within=within), [self.second.pk])
+
+    def test_id_fragments_are_looked_up_in_the_trigram_index(self):
+        queryset = self.backend.filter(Claim.objects.all(), 'claim', '001')
+        self.assertNotIn('LIKE', str(queryset.query))
+        plan = queryset.explain()
+        self.assertIn('SCAN search_claim_id VIRTUAL TABLE', plan)
+        self.assertNotIn('SCAN policy_claim', plan)
+
+
+class CSVExportTests(SimpleTestCase):
+
+    def test_rows_are_encoded_a_chunk_at_a_time(self):
+        read = []
+
+        def rows():
+            for number in range(5):
+                read.append(number)
+                yield [f'CLM{number}', 'Ünal']
+
+        chunks = csv_chunks(['Claim ID', 'User'], rows(), rows_per_chunk=2)
+        self.assertEqual(next(chunks), b'Claim ID,User\r\nCLM0,\xc3\x9cnal\r\n')
+        self.assertEqual(read, [0])
+        self.assertEqual(len(list(chunks)), 2)
+
+    def test_gzip_stream_is_one_member(self):
+        chunks = [b'a,b\r\n' * 1000, b'c,d\r\n']
+        self.assertEqual(gzip.decompress(b''.join(gzip_chunks(iter(chunks)))), b''.join(chunks))
+
+
+class CSVReportResponseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user_policy = create_policy_holder('admin', is_staff=True)
+        cls.admin = user_policy.user
+        for amount in (100, 200):
+            Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=amount)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def download(self, **headers):
+        response = self.client.get('/admin_panel/reports/claims/', {'format': 'csv'}, headers=headers)
+        self.assertTrue(response.streaming)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        return response, b''.join(response.streaming_content)
+
+    def test_gzip_is_used_only_when_the_client_accepts_it(self):
+        response, plain = self.download()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(plain.splitlines()[0], b'Claim ID,User,Policy,Amount,Status,Date Filed')
+        self.assertEqual(len(plain.splitlines()), 3)
+
+        cache.clear()
+        response, body = self.download(accept_encoding='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body), plain)
+
+    @override_settings(REPORT_EXPORT_GZIP=False)
+    def test_gzip_can_be_switched_off(self):
+        response, body = self.download(accept_encoding='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertTrue(body.startswith(b'Claim ID,'))
+
+
+class TablePDFTests(SimpleTestCase):
+
+    def render(self, count):
+        output = io.BytesIO()
+        rows = ([f'CLM{number:04d}', 'member', 'Gold Care', '$100.00'] for number in range(count))
+        pages = write_table_pdf(output, 'Claims Summary Report', ['Claim ID', 'User', 'Policy', 'Amount'], rows,
+                                subtitles=['Date Range: All time to Now'])
+        # One page object per page, besides the /Pages tree
+        self.assertEqual(pages, len(re.findall(rb'/Type /Page\b', output.getvalue())))
+        return pages
+
+    def test_rows_flow_onto_as_many_pages_as_they_need(self):
+        per_page = rows_that_fit(PAGE_SIZE[1] - 2 * MARGIN)
+        self.assertEqual(self.render(0), 1)
+        self.assertEqual(self.render(per_page // 2), 1)
+        # The title takes part of the first page, so three pages of rows need a fourth
+        self.assertEqual(self.render(3 * per_page), 4)
+
+
+class ColumnarExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder('analyst', is_staff=True)
+        for amount in ('100.25', '2500.00', '75.50'):
+            Claim.objects.create(user_policy=cls.user_policy, reason='Checkup', claim_amount=amount)
+
+    def export(self, **kwargs):
+        header, batches = read_columnar(io.BytesIO(b''.join(
+            export_chunks(ColumnarExport('claims', **kwargs), 'columnar', batch_size=2))))
+        columns = {column['name']: [] for column in header['columns']}
+        for batch in batches:
+            for name, values in batch.items():
+                columns[name].extend(values)
+        return columns
+
+    def test_standard_library_format_round_trips_typed_columns(self):
+        columns = self.export()
+        self.assertEqual(columns['claim_amount'], [Decimal('100.25'), Decimal('2500.00'), Decimal('75.50')])
+        self.assertEqual(columns['provider_id'], [None, None, None])
+        claim = Claim.objects.get(pk=columns['id'][0])
+        self.assertEqual((columns['claim_id'][0], columns['filed_date'][0]), (claim.claim_id, claim.filed_date))
+
+    def test_cursor_exports_only_rows_changed_since_its_last_export(self):
+        # Incremental exports stop COLUMNAR_EXPORT_LAG_SECONDS before `now`
+        later = timezone.now() + timedelta(minutes=5)
+        self.assertEqual(len(self.export(cursor='warehouse', now=later)['id']), 3)
+        self.assertTrue(ExportCursor.objects.filter(name='warehouse', dataset='claims').exists())
+
+        changed = Claim.objects.first()
+        Claim.objects.filter(pk=changed.pk).update(status='APPROVED', updated_at=later)
+        columns = self.export(cursor='warehouse', now=later + timedelta(minutes=5))
+        self.assertEqual((columns['id'], columns['status']), ([changed.pk], ['APPROVED']))
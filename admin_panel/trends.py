@@ -0,0 +1,139 @@
+# admin_panel/trends.py
+from datetime import date, timedelta
+
+from django.db.models import DateField, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek
+from django.utils import timezone
+
+from .models import ClaimDailyRollup, PolicyDailyRollup
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+}
+
+# Most buckets one request may ask for, so a wide range at day granularity stays cheap
+MAX_BUCKETS = 400
+
+
+def bucket_start(day, granularity):
+    """The first day of the bucket containing `day` (weeks start on Monday, as TruncWeek does)."""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day.replace(month=3 * ((day.month - 1) // 3) + 1, day=1)
+
+
+def next_bucket(start, granularity):
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    months = 1 if granularity == 'month' else 3
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def bucket_label(start, granularity):
+    if granularity == 'day':
+        return start.strftime('%d %b')
+    if granularity == 'week':
+        return f"Wk {start.strftime('%d %b')}"
+    if granularity == 'month':
+        return start.strftime('%b %Y')
+    return f'Q{(start.month - 1) // 3 + 1} {start.year}'
+
+
+def bucket_starts(start, end, granularity):
+    """Every bucket from the one containing `start` to the one containing `end`."""
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current <= end and len(buckets) < MAX_BUCKETS:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def default_range(periods=6, today=None):
+    """The `periods` whole months before the current one, as the reports have always shown."""
+    today = today or timezone.localdate()
+    end = today.replace(day=1) - timedelta(days=1)
+    start = end.replace(day=1)
+    for _ in range(periods - 1):
+        start = (start - timedelta(days=1)).replace(day=1)
+    return start, end
+
+
+def _bucketed(rollup_model, start, end, granularity, **aggregates):
+    """
+    One grouped query over a daily rollup table (admin_panel/rollups.py):
+    `aggregates` per bucket of its local `day` for days in [start, end].
+    Returns {bucket start date: {name: value}}.
+    """
+    rows = (rollup_model.objects.filter(day__range=[start, end])
+            .annotate(bucket=GRANULARITIES[granularity]('day', output_field=DateField()))
+            .order_by().values('bucket').annotate(**aggregates))
+    return {row.pop('bucket'): row for row in rows}
+
+
+# Series per rollup table; each table is read once per request whatever series it feeds
+CLAIM_SERIES = {
+    'claims': Sum('claim_count'),
+    'approved_claims': Sum('claim_count', filter=Q(status='APPROVED')),
+    # Revenue is the approved claim amount, as the reports have always reported it
+    'revenue': Sum('amount_total', filter=Q(status='APPROVED')),
+}
+POLICY_SERIES = {
+    'policies': Sum('purchase_count'),
+}
+SERIES = tuple(CLAIM_SERIES) + tuple(POLICY_SERIES)
+
+
+def trend_series(start, end, granularity='month', series=SERIES):
+    """
+    Trend data for [start, end] at `granularity` (day, week, month or
+    quarter): {'buckets': [date], 'labels': [str], <series>: [value]} with one
+    value per bucket and zeros for empty buckets. The claim and policy
+    rollups are each read with a single GROUP BY query over at most one row
+    per day, status and policy, and only if a requested series needs them.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Unknown granularity {granularity!r}')
+    buckets = bucket_starts(start, end, granularity)
+    result = {'buckets': buckets, 'labels': [bucket_label(bucket, granularity) for bucket in buckets]}
+
+    for rollup_model, available in ((ClaimDailyRollup, CLAIM_SERIES), (PolicyDailyRollup, POLICY_SERIES)):
+        wanted = {name: aggregate for name, aggregate in available.items() if name in series}
+        if not wanted:
+            continue
+        rows = _bucketed(rollup_model, start, end, granularity, **wanted)
+        for name in wanted:
+            result[name] = [(rows.get(bucket, {}).get(name) or 0) for bucket in buckets]
+    return result
+
+
+def parse_trend_params(params, default_granularity='month'):
+    """
+    (start, end, granularity) from request parameters start_date, end_date
+    (YYYY-MM-DD) and granularity. Without dates, or with malformed ones,
+    the range is default_range().
+    """
+    start, end = default_range()
+    try:
+        if params.get('start_date') or params.get('end_date'):
+            # An open-ended range runs up to today
+            start = date.fromisoformat(params['start_date']) if params.get('start_date') else start
+            end = date.fromisoformat(params['end_date']) if params.get('end_date') else timezone.localdate()
+    except ValueError:
+        start, end = default_range()
+    if start > end:
+        start, end = end, start
+    granularity = params.get('granularity', default_granularity)
+    if granularity not in GRANULARITIES:
+        granularity = default_granularity
+    return start, end, granularity
@@ -6,9 +6,13 @@ app_name = 'admin_panel' # Essential for namespacing
 
 urlpatterns = [
     path('dashboard/', views.AdminDashboardView.as_view(), name='admin_dashboard'),
+    path('activity/', views.activity_feed, name='activity_feed'),
+    path('live/counters/', views.live_counters_stream, name='live_counters_stream'),
+    path('live/counters/poll/', views.live_counters_poll, name='live_counters_poll'),
     path('manage-policies/', PolicyListView.as_view(), name='admin_policy_management'),
     path('claims/', views.admin_claims, name='admin_claims'),
     path('update-claim-status/', views.update_claim_status, name='update_claim_status'),
+    path('update-claim-status/batch/', views.batch_update_claim_status, name='batch_update_claim_status'),
     path('feedback/', views.admin_feedback_dashboard, name='feedback_dashboard'),
     path('feedback/ticket/<str:ticket_id>/', views.admin_view_ticket, name='view_ticket'),
     path('feedback/ticket/<str:ticket_id>/resolve/', views.admin_resolve_ticket, name='resolve_ticket'),
@@ -26,4 +30,7 @@ urlpatterns = [
 
     # API Endpoints
     path('reports/chart-data/', views.ChartDataView.as_view(), name='get_chart_data'),
+    path('reports/jobs/<int:job_id>/', views.report_job_status, name='report_job_status'),
+    path('reports/jobs/<int:job_id>/download/', views.download_report_job, name='download_report_job'),
+    path('reports/export/<str:dataset>/', views.ColumnarExportView.as_view(), name='columnar_export'),
 ]
\ No newline at end of file
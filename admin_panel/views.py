@@ -1,34 +1,48 @@
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, View
 from django.shortcuts import redirect, render, get_object_or_404
-from policy.models import Policy, UserPolicy, Claim
+from policy.models import Policy, UserPolicy, Claim, normalize_claim_status
 from django.views.generic import ListView, TemplateView, View
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import user_passes_test, login_required
 from django.utils import timezone
 from feedback_support.models import Feedback, FeedbackComment
-from django.db.models import Q
+from django.db.models import Q, OuterRef, Subquery
 from django.utils.decorators import method_decorator
-from django.contrib.auth import get_user_model
-from datetime import datetime, timedelta
-from django.db.models import Count, Avg, Sum, Q
-import csv
+from claims.adjudication import transition_claims
+from claims.history import decode_cursor, encode_cursor
+from claims.models import DocumentPreview
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from decimal import Decimal, InvalidOperation
+from .activity import activity_page, serialize_event
+from .columnar import FORMATS as COLUMNAR_FORMATS
+from .columnar import ColumnarExport, ExportError, check_format, default_format, export_chunks, parse_since
+from .exports import attachment_response, csv_chunks, csv_chunks_response
+from .facets import facet_options
+from .live import badge_values, publisher
+from .models import ReportJob
+from .pdf import write_table_pdf
+from .report_cache import cache_chunks, cached_report, get_cached_report, report_cache_stats, store_report
+from .report_jobs import REPORT_PARAM_KEYS, report_job_payload, submit_report_job
+from .reports import (
+    chart_data, claims_report, dashboard_metrics, parse_date_range, policy_usage_report, provider_report,
+    trends_report,
+)
+from .search import get_search_backend
+from .stats import dashboard_stats
+from .trends import SERIES, parse_trend_params
+import asyncio
+import json
+import re
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
 
 
-# Check if NetworkProvider model exists
-try:
-    from providers.models import NetworkProvider
-    HAS_NETWORK_PROVIDER = True
-except ImportError:
-    HAS_NETWORK_PROVIDER = False
-    NetworkProvider = None
+# A complete claim ID such as CLM0042
+CLAIM_ID_RE = re.compile(r'^CLM\d+$', re.IGNORECASE)
 
 class AdminDashboardView(TemplateView):
     template_name = 'admin_panel/admin_dashboard.html'
@@ -47,19 +61,8 @@ class AdminDashboardView(TemplateView):
         from django.utils import timezone
         current_date = timezone.now()
 
-        # Get the custom user model
-        User = get_user_model()
-
-        # Calculate statistics
-        total_policies = Policy.objects.count()
-        active_claims = Claim.objects.filter(
-            status__in=['SUBMITTED', 'UNDER_REVIEW', 'submitted', 'Under Review']
-        ).count()
-        pending_feedback = Feedback.objects.filter(status='Open').count()
-
-        # Calculate total revenue (sum of all policy premiums)
-        from django.db.models import Sum
-        total_revenue = Policy.objects.aggregate(total=Sum('premium'))['total'] or 0
+        # Statistics come from the counters table maintained by admin_panel/signals.py
+        stats = dashboard_stats()
 
         # Get recent claims (last 4)
         recent_claims = Claim.objects.select_related(
@@ -71,74 +74,14 @@ class AdminDashboardView(TemplateView):
             'created_by', 'policy_name'
         ).order_by('-created_on')[:4]
 
-        # Get recent activities
-        recent_activities = []
-
-        # Add recent claim activities
-        recent_claim_updates = Claim.objects.filter(
-            status__in=['APPROVED', 'REJECTED', 'approved', 'rejected']
-        ).order_by('-filed_date')[:3]
-
-        for claim in recent_claim_updates:
-            status_text = 'Approved' if claim.status in ['APPROVED', 'approved'] else 'Rejected'
-            recent_activities.append({
-                'type': 'claim',
-                'title': f'Claim {status_text}',
-                'description': f'Claim #{claim.claim_id} was {status_text.lower()}',
-                'time': claim.filed_date,
-                'icon': 'fa-check-circle' if claim.status in ['APPROVED', 'approved'] else 'fa-times-circle',
-                'color': 'bg-success' if claim.status in ['APPROVED', 'approved'] else 'bg-danger'
-            })
-
-        # Add recent feedback activities
-        for feedback in recent_feedback:
-            recent_activities.append({
-                'type': 'feedback',
-                'title': 'New Support Ticket',
-                'description': f'Ticket #{feedback.ticket_id} submitted by {feedback.created_by.username}',
-                'time': feedback.created_on,
-                'icon': 'fa-headset',
-                'color': 'bg-warning'
-            })
-
-        # Add user registration activities
-        # Get recent user registrations if your CustomUser model has date_joined
-        try:
-            recent_users = User.objects.order_by('-date_joined')[:2]
-            for user in recent_users:
-                recent_activities.append({
-                    'type': 'user',
-                    'title': 'New User Registered',
-                    'description': f'{user.username} registered for insurance',
-                    'time': user.date_joined,
-                    'icon': 'fa-user-plus',
-                    'color': 'bg-info'
-                })
-        except AttributeError:
-            # If date_joined doesn't exist, skip
-            pass
-
-        # Sort activities by time (most recent first)
-        recent_activities.sort(key=lambda x: x['time'], reverse=True)
-        recent_activities = recent_activities[:5]  # Take only 5 most recent
+        # Recent activity: the newest rows of the append-only event log
+        recent_activities, _ = activity_page(limit=5)
 
         # Calculate growth percentages (simplified - adjust based on your business logic)
         policy_growth = 12  # Example growth percentage
 
-        # Pending claims needing review
-        pending_review_claims = Claim.objects.filter(
-            status__in=['SUBMITTED', 'submitted']
-        ).count()
-
-        # Urgent feedback tickets
-        # Check if Feedback model has priority field
-        try:
-            urgent_feedback = Feedback.objects.filter(
-                status='Open',
-                priority='high'
-            ).count()
-        except:
-            urgent_feedback = pending_feedback // 3  # Estimate if no priority field
+        # Urgent feedback tickets: Feedback has no priority field, so estimate
+        urgent_feedback = stats['pending_feedback'] // 3
 
         # Revenue growth (simplified)
         revenue_growth = 18  # Example growth percentage
@@ -148,13 +91,13 @@ class AdminDashboardView(TemplateView):
             'current_date': current_date.strftime('%B %d, %Y'),
 
             # Statistics
-            'total_policies': total_policies,
-            'active_claims': active_claims,
-            'pending_feedback': pending_feedback,
-            'total_revenue': total_revenue,
+            'total_policies': stats['total_policies'],
+            'active_claims': stats['active_claims'],
+            'pending_feedback': stats['pending_feedback'],
+            'total_revenue': stats['total_revenue'],
             'policy_growth': policy_growth,
             'revenue_growth': revenue_growth,
-            'pending_review_claims': pending_review_claims,
+            'pending_review_claims': stats['pending_review_claims'],
             'urgent_feedback': urgent_feedback,
 
             # Recent data
@@ -163,14 +106,10 @@ class AdminDashboardView(TemplateView):
             'recent_activities': recent_activities,
 
             # Additional stats for cards
-            'total_users': User.objects.count(),
-            'total_claims': Claim.objects.count(),
-            'approved_claims': Claim.objects.filter(
-                status__in=['APPROVED', 'approved']
-            ).count(),
-            'rejected_claims': Claim.objects.filter(
-                status__in=['REJECTED', 'rejected']
-            ).count(),
+            'total_users': stats['total_users'],
+            'total_claims': stats['total_claims'],
+            'approved_claims': stats['approved_claims'],
+            'rejected_claims': stats['rejected_claims'],
         })
         return context
 
@@ -290,9 +229,13 @@ class PolicyListView(ListView):
 
 
 def admin_claims(request):
-    # Fetch all claims from the database
-    # select_related improves performance for foreign keys like User or Policy
-    claims = Claim.objects.all().order_by('-filed_date')
+    # One keyset page of claims, newest first, with user and policy joined in
+    claims = Claim.objects.select_related('user_policy__user', 'user_policy__policy').order_by('-filed_date', '-id')
+
+    # Cached thumbnail of each document, so the list never loads the originals
+    claims = claims.annotate(preview_name=Subquery(
+        DocumentPreview.objects.filter(source=OuterRef('document'), status='READY').values('preview')[:1]
+    ))
 
     # Get filter parameters from GET request
     claim_id = request.GET.get('claim_id', '').strip()
@@ -301,85 +244,64 @@ def admin_claims(request):
     status_filter = request.GET.get('status', '').strip()
     amount_min = request.GET.get('amount_min', '').strip()
     amount_max = request.GET.get('amount_max', '').strip()
+    search_query = request.GET.get('q', '').strip()
 
     # Apply filters if they exist
-    if claim_id:
-        claims = claims.filter(claim_id__icontains=claim_id)
+    if search_query:
+        # Full-text match on ID, user, policy, reason and comment; keeps the keyset order
+        claims = get_search_backend().filter(claims, 'claim', search_query)
 
-    if user_search:
-        claims = claims.filter(user_policy__user__username__icontains=user_search)
+    if claim_id:
+        if CLAIM_ID_RE.match(claim_id):
+            # A complete ID uses the unique index instead of a LIKE scan
+            claims = claims.filter(claim_id=claim_id.upper())
+        else:
+            claims = claims.filter(claim_id__icontains=claim_id)
 
-    if policy_name:
-        claims = claims.filter(user_policy__policy__name__icontains=policy_name)
+    if user_search or policy_name:
+        # Match the (small) user/policy tables first, then the indexed claim FK
+        user_policies = UserPolicy.objects.all()
+        if user_search:
+            user_policies = user_policies.filter(user__username__icontains=user_search)
+        if policy_name:
+            user_policies = user_policies.filter(policy__name__icontains=policy_name)
+        claims = claims.filter(user_policy__in=user_policies.values('id'))
 
     if status_filter:
-        # Handle different status formats
-        if status_filter.lower() == 'submitted':
-            claims = claims.filter(status__iexact='submitted')
-        elif status_filter.lower() == 'under review':
-            claims = claims.filter(status__iexact='under review')
-        elif status_filter.lower() == 'approved':
-            claims = claims.filter(status__iexact='approved')
-        elif status_filter.lower() == 'rejected':
-            claims = claims.filter(status__iexact='rejected')
-        else:
-            # Try exact match
-            claims = claims.filter(status__iexact=status_filter)
+        # 'Under Review' and 'UNDER_REVIEW' alike become one indexed equality on the code
+        claims = claims.with_status(status_filter)
 
-    if amount_min:
-        try:
-            amount_min_float = float(amount_min)
-            claims = claims.filter(claim_amount__gte=amount_min_float)
-        except ValueError:
-            pass
+    for value, lookup in ((amount_min, 'claim_amount__gte'), (amount_max, 'claim_amount__lte')):
+        if value:
+            try:
+                claims = claims.filter(**{lookup: Decimal(value)})
+            except InvalidOperation:
+                pass
 
-    if amount_max:
-        try:
-            amount_max_float = float(amount_max)
-            claims = claims.filter(claim_amount__lte=amount_max_float)
-        except ValueError:
-            pass
-
-    # Get unique values for dropdowns from the filtered (or all) claims
-    # For users: get usernames from associated users
-    user_list = (
-        claims
-        .select_related('user_policy__user')
-        .values_list('user_policy__user__username', flat=True)
-        .distinct()
-        .order_by('user_policy__user__username')
-    )
+    position = decode_cursor(request.GET.get('cursor'))
+    if position:
+        filed, pk = position
+        claims = claims.filter(Q(filed_date__lt=filed) | Q(filed_date=filed, id__lt=pk))
 
-    # For policy names
-    policy_list = (
-        claims
-        .select_related('user_policy__policy')
-        .values_list('user_policy__policy__name', flat=True)
-        .distinct()
-        .order_by('user_policy__policy__name')
-    )
+    # One extra row tells us whether another page exists
+    page_size = settings.ADMIN_CLAIMS_PAGE_SIZE
+    page = list(claims[:page_size + 1])
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    page = page[:page_size]
 
-    # For statuses
-    status_list = (
-        claims
-        .values_list('status', flat=True)
-        .distinct()
-        .order_by('status')
-    )
+    # Filters without the cursor, for the paging links
+    filter_query = request.GET.copy()
+    filter_query.pop('cursor', None)
 
-    # If you want to show all possible values regardless of current filters,
-    # you can get them from the unfiltered queryset
-    all_statuses = Claim.objects.values_list('status', flat=True).distinct().order_by('status')
-    all_users = Claim.objects.select_related('user_policy__user').values_list(
-        'user_policy__user__username', flat=True
-    ).distinct().order_by('user_policy__user__username')
-    all_policies = Claim.objects.select_related('user_policy__policy').values_list(
-        'user_policy__policy__name', flat=True
-    ).distinct().order_by('user_policy__policy__name')
+    # Dropdown options come from the facet table, not DISTINCT scans over claims
+    facets = facet_options()
 
     context = {
         # This key MUST match the name used in your {% for claim in ... %} loop
-        'submitted_claims': claims,
+        'submitted_claims': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not position,
+        'filter_query': filter_query.urlencode(),
 
         # Current filter values for preserving in the form
         'current_filters': {
@@ -389,17 +311,13 @@ def admin_claims(request):
             'status': status_filter,
             'amount_min': amount_min,
             'amount_max': amount_max,
+            'q': search_query,
         },
 
         # Dropdown options
-        'user_list': user_list,
-        'policy_list': policy_list,
-        'status_list': status_list,
-
-        # All possible options (useful if you want dropdowns to show all options)
-        'all_statuses': all_statuses,
-        'all_users': all_users,
-        'all_policies': all_policies,
+        'user_list': facets['user'],
+        'policy_list': facets['policy'],
+        'status_list': facets['status'],
     }
     return render(request, 'admin_panel/admin_claims.html', context)
 
@@ -408,6 +326,8 @@ def admin_claims(request):
 def update_claim_status(request):
     """
     Updates the status and admin comments for a claim in the policy app.
+    Status changes go through claims.adjudication.transition_claims, so an
+    illegal move is refused with its reason.
     """
     claim_id_val = request.POST.get('claim_id')
     new_status = request.POST.get('status')
@@ -415,41 +335,155 @@ def update_claim_status(request):
 
     claim = get_object_or_404(Claim, claim_id=claim_id_val)
 
+    if new_status and normalize_claim_status(new_status) != claim.status:
+        # Moves the claim, records the comment and writes the audit row
+        _, rejected = transition_claims([claim.claim_id], new_status, user=request.user, comment=admin_comment)
+        if rejected:
+            return JsonResponse({'status': 'error', 'message': rejected[0]['reason']}, status=400)
+    elif admin_comment is not None:
+        claim.comment = admin_comment
+        claim.save(update_fields=['comment'])
+
+    return JsonResponse({
+        'status': 'success',
+        'message': f'Claim {claim_id_val} has been updated successfully.'
+    })
+
+
+def is_admin(user):
+    return user.is_authenticated and user.is_staff
+
+
+@user_passes_test(is_admin)
+@require_POST
+def batch_update_claim_status(request):
+    """
+    Moves many claims to one status in a single request.
+    Accepts JSON {"claim_ids": [...], "status": "...", "comment": "..."} or the
+    same fields as form data (claim_ids comma-separated). Only the moves in
+    claims.adjudication.ALLOWED_TRANSITIONS are applied.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid JSON body.'}, status=400)
+        claim_ids = payload.get('claim_ids') or []
+        new_status = payload.get('status')
+        admin_comment = payload.get('comment')
+    else:
+        claim_ids = [value.strip() for value in request.POST.get('claim_ids', '').split(',') if value.strip()]
+        new_status = request.POST.get('status')
+        admin_comment = request.POST.get('comment')
+
+    if not claim_ids or not new_status:
+        return JsonResponse({'status': 'error', 'message': 'claim_ids and status are required.'}, status=400)
+
+    moved, rejected = transition_claims(claim_ids, new_status, user=request.user, comment=admin_comment)
+
+    return JsonResponse({
+        'status': 'success',
+        'message': f'{len(moved)} claim(s) updated, {len(rejected)} rejected.',
+        'moved': moved,
+        'rejected': rejected,
+    })
+
+
+@user_passes_test(is_admin)
+def activity_feed(request):
+    """
+    Pages of the admin activity feed as JSON. ?before=<id> returns older
+    events; ?after=<id> returns only events newer than the last one seen.
+    """
     try:
-        # Update status if provided
-        if new_status:
-            # Convert status string to match model choices
-            status_map = {
-                'Submitted': 'SUBMITTED',
-                'Under Review': 'UNDER_REVIEW',
-                'Approved': 'APPROVED',
-                'Rejected': 'REJECTED'
-            }
+        before = int(request.GET['before']) if request.GET.get('before') else None
+        after = int(request.GET['after']) if request.GET.get('after') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'before and after must be event ids.'}, status=400)
 
-            formatted_status = status_map.get(new_status, new_status.upper().replace(" ", "_"))
+    events, next_before = activity_page(before=before, after=after)
+    return JsonResponse({
+        'status': 'success',
+        'events': [serialize_event(event) for event in events],
+        'next_before': next_before,
+    })
 
-            # Validate status
-            valid_statuses = [choice[0] for choice in Claim.CLAIM_STATUS_CHOICES]
-            if formatted_status in valid_statuses:
-                claim.status = formatted_status
 
-        # Update comment if provided
-        if admin_comment is not None:
-            claim.comment = admin_comment
+def _sse(event, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {json.dumps(data)}']
+    return '\n'.join(lines) + '\n\n'
 
-        claim.save()
 
-        return JsonResponse({
-            'status': 'success',
-            'message': f'Claim {claim_id_val} has been updated successfully.'
-        })
+async def _live_badge_values():
+    return badge_values(await sync_to_async(dashboard_stats)())
+
+
+async def _counter_events(queue):
+    try:
+        # Reconnecting clients wait 5s; every (re)connection starts from fresh values
+        yield 'retry: 5000\n' + _sse('snapshot', {'seq': publisher.sequence, 'values': await _live_badge_values()})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield ': keepalive\n\n'
+                continue
+            if event.get('resync'):
+                yield _sse('snapshot', {'seq': event['seq'], 'values': await _live_badge_values()}, event['seq'])
+            else:
+                yield _sse('delta', event, event['seq'])
+    finally:
+        publisher.unsubscribe(queue)
+
+
+async def live_counters_stream(request):
+    """
+    Server-Sent Events stream of the admin badges (open tickets, pending
+    claims, users): a snapshot on connect, then a delta event whenever a
+    committed write moves one. Needs an ASGI server; under WSGI clients are
+    told to fall back to live_counters_poll.
+    """
+    if not is_admin(await request.auser()):
+        return JsonResponse({'status': 'error', 'message': 'Permission denied.'}, status=403)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'status': 'error', 'message': 'Streaming needs ASGI; use the long-poll endpoint.'},
+                            status=501)
 
-    except Exception as e:
-        return JsonResponse
+    response = StreamingHttpResponse(_counter_events(publisher.subscribe()), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
-def is_admin(user):
-    return user.is_authenticated and user.is_staff
+async def live_counters_poll(request):
+    """
+    Long-poll fallback for live_counters_stream. With ?seq=<last seq seen>
+    the request waits up to LIVE_LONG_POLL_SECONDS for a change before
+    answering with the current badge values and the new seq.
+
+    Under WSGI the wait would hold a worker thread, so the answer is
+    immediate and carries retry_after: the seconds the client should wait
+    before polling again.
+    """
+    if not is_admin(await request.auser()):
+        return JsonResponse({'status': 'error', 'message': 'Permission denied.'}, status=403)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'status': 'success', 'seq': publisher.sequence, 'values': await _live_badge_values(),
+                             'retry_after': settings.LIVE_LONG_POLL_SECONDS})
+
+    # Subscribe before comparing, so a change in between is not missed
+    queue = publisher.subscribe()
+    try:
+        if request.GET.get('seq') == str(publisher.sequence):
+            try:
+                await asyncio.wait_for(queue.get(), settings.LIVE_LONG_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        publisher.unsubscribe(queue)
+    return JsonResponse({'status': 'success', 'seq': publisher.sequence, 'values': await _live_badge_values()})
 
 
 @user_passes_test(is_admin)
@@ -459,12 +493,12 @@ def admin_feedback_dashboard(request):
     category_filter = request.GET.get('category', '')
     search_query = request.GET.get('q', '')
 
-    # Check if JSON response is requested (for badge count)
+    # Check if JSON response is requested (for badge count); live pages use live_counters_stream instead
     if request.GET.get('json') == 'true':
-        open_tickets_count = Feedback.objects.filter(status='Open').count()
+        stats = dashboard_stats()
         return JsonResponse({
-            'open_tickets': open_tickets_count,
-            'total_tickets': Feedback.objects.count()
+            'open_tickets': stats['pending_feedback'],
+            'total_tickets': stats['total_feedback']
         })
 
     # Get all feedback tickets
@@ -478,12 +512,8 @@ def admin_feedback_dashboard(request):
     if category_filter:
         tickets = tickets.filter(category=category_filter)
     if search_query:
-        tickets = tickets.filter(
-            Q(ticket_id__icontains=search_query) |
-            Q(created_by__username__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(policy_name__name__icontains=search_query)
-        )
+        # Best matches first (ticket ID, user, policy, category, description and comments)
+        tickets = get_search_backend().rank(tickets, 'feedback', search_query)
 
     # Add admin comment count to each ticket
     for ticket in tickets:
@@ -494,7 +524,7 @@ def admin_feedback_dashboard(request):
     statuses = Feedback.objects.values_list('status', flat=True).distinct()
 
     # Get open tickets count for badge
-    open_tickets_count = Feedback.objects.filter(status='Open').count()
+    open_tickets_count = dashboard_stats()['pending_feedback']
 
     context = {
         'tickets': tickets,
@@ -679,193 +709,27 @@ class ReportsDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         """Only staff users can access"""
         return self.request.user.is_staff
 
-    def get_date_range(self, start_date_str, end_date_str):
-        """Get date range from request parameters"""
-        if not start_date_str:
-            start_date = (timezone.now() - timedelta(days=30)).date()
-        else:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-
-        if not end_date_str:
-            end_date = timezone.now().date()
-        else:
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-
-        return start_date, end_date
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get filter parameters
-        start_date_str = self.request.GET.get('start_date')
-        end_date_str = self.request.GET.get('end_date')
+        # Get filter parameters (the last 30 days by default)
+        start_date, end_date = parse_date_range(self.request.GET)
         report_type = self.request.GET.get('report_type', 'all')
 
-        # Set default date range using the correct method name
-        start_date, end_date = self.get_date_range(start_date_str, end_date_str)
-
-        # Calculate all statistics
+        # Calculate all statistics, or reuse them while claims, policies and providers are unchanged
+        stats = cached_report('dashboard', {'start_date': start_date, 'end_date': end_date},
+                              lambda: dashboard_metrics(start_date, end_date))
         context.update({
             'page_title': 'Reports & Analytics',
             'start_date': start_date,
             'end_date': end_date,
             'report_type': report_type,
-            **self._get_claims_summary(start_date, end_date),
-            **self._get_policy_usage_stats(start_date, end_date),
-            **self._get_provider_performance(),
-            'monthly_growth': self._get_monthly_growth(),
-            'top_providers': self._get_top_providers(),
+            **stats,
+            'report_cache_stats': report_cache_stats(),
         })
 
         return context
 
-    def _get_claims_summary(self, start_date, end_date):
-        """Get claims summary statistics"""
-        claims = Claim.objects.filter(
-            filed_date__date__range=[start_date, end_date]
-        )
-
-        total_claims = claims.count()
-
-        approved_claims = claims.filter(
-            Q(status__iexact='approved') | Q(status__iexact='APPROVED')
-        ).count()
-
-        pending_claims = claims.filter(
-            Q(status__iexact='submitted') | Q(status__iexact='SUBMITTED') |
-            Q(status__iexact='under review') | Q(status__iexact='UNDER_REVIEW')
-        ).count()
-
-        return {
-            'total_claims': total_claims,
-            'approved_claims': approved_claims,
-            'pending_claims': pending_claims,
-        }
-
-    def _get_policy_usage_stats(self, start_date, end_date):
-        """Get policy usage statistics - using UserPolicy model with correct fields"""
-        # Get active user policies (assuming 'active' or 'Active' status)
-        # Using application_date as the date field
-        active_policies = UserPolicy.objects.filter(
-            Q(status__iexact='active') | Q(status__iexact='Active'),
-            application_date__date__range=[start_date, end_date]
-        ).count()
-
-        total_policies = Policy.objects.count()
-        policy_utilization = round(
-            (active_policies / total_policies * 100) if total_policies > 0 else 0,
-            1
-        )
-
-        return {
-            'active_policies': active_policies,
-            'policy_utilization': policy_utilization,
-        }
-
-    def _get_provider_performance(self):
-        """Get provider performance statistics"""
-        # Try to get provider data
-        total_providers = 0
-        avg_provider_rating = 4.2  # Default value
-
-        if HAS_NETWORK_PROVIDER and NetworkProvider:
-            total_providers = NetworkProvider.objects.count()
-            if total_providers > 0:
-                avg_provider_rating = NetworkProvider.objects.aggregate(
-                    avg_rating=Avg('rating')
-                )['avg_rating'] or 4.2
-        else:
-            # Try to get unique providers from Feedback
-            try:
-                total_providers = Feedback.objects.filter(
-                    network_provider__isnull=False
-                ).values('network_provider__name').distinct().count()
-            except:
-                total_providers = 0
-
-        avg_provider_rating = round(avg_provider_rating, 1)
-        rating_percentage = (avg_provider_rating / 5) * 100
-
-        return {
-            'total_providers': total_providers,
-            'avg_provider_rating': avg_provider_rating,
-            'rating_percentage': rating_percentage,
-        }
-
-    def _get_monthly_growth(self):
-        """Calculate monthly claims growth"""
-        last_month = timezone.now() - timedelta(days=30)
-
-        current_month_claims = Claim.objects.filter(
-            filed_date__gte=last_month
-        ).count()
-
-        previous_month_claims = Claim.objects.filter(
-            filed_date__gte=last_month - timedelta(days=30),
-            filed_date__lt=last_month
-        ).count()
-
-        monthly_growth = round(
-            ((current_month_claims - previous_month_claims) / previous_month_claims * 100)
-            if previous_month_claims > 0 else 0,
-            1
-        )
-
-        return monthly_growth
-
-    def _get_top_providers(self):
-        """Get top 5 providers"""
-        providers = []
-
-        if HAS_NETWORK_PROVIDER and NetworkProvider:
-            try:
-                network_providers = NetworkProvider.objects.annotate(
-                    claim_count=Count('claim')
-                ).order_by('-claim_count')[:5]
-
-                for provider in network_providers:
-                    providers.append({
-                        'name': provider.name,
-                        'total_claims': provider.claim_count,
-                        'rating': provider.rating or 4.0
-                    })
-            except:
-                pass
-
-        # If no network providers found or model doesn't exist, try from feedback
-        if not providers:
-            try:
-                # Get providers from feedback
-                from django.db.models import Count
-                feedback_providers = Feedback.objects.filter(
-                    network_provider__isnull=False
-                ).values(
-                    'network_provider__name'
-                ).annotate(
-                    feedback_count=Count('id')
-                ).order_by('-feedback_count')[:5]
-
-                for item in feedback_providers:
-                    providers.append({
-                        'name': item['network_provider__name'],
-                        'total_claims': item['feedback_count'],
-                        'rating': 4.0  # Default rating
-                    })
-            except:
-                pass
-
-        # If still no providers, add some sample data for demonstration
-        if not providers:
-            providers = [
-                {'name': 'City Hospital', 'total_claims': 45, 'rating': 4.5},
-                {'name': 'General Clinic', 'total_claims': 32, 'rating': 4.2},
-                {'name': 'Specialty Center', 'total_claims': 28, 'rating': 4.7},
-                {'name': 'Urgent Care', 'total_claims': 22, 'rating': 4.1},
-                {'name': 'Family Practice', 'total_claims': 18, 'rating': 4.3}
-            ]
-
-        return providers
-
 
 class BaseReportView(LoginRequiredMixin, UserPassesTestMixin, View):
     """Base class for report views"""
@@ -874,319 +738,125 @@ class BaseReportView(LoginRequiredMixin, UserPassesTestMixin, View):
         """Only staff users can access"""
         return self.request.user.is_staff
 
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        # Reports read their parameters from here, so report jobs can build them without a request
+        self.report_params = request.GET
+
     def get_date_range(self):
         """Get date range from request parameters"""
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-
-        if not start_date:
-            start_date = (timezone.now() - timedelta(days=30)).date()
-        else:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-
-        if not end_date:
-            end_date = timezone.now().date()
-        else:
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-
-        return start_date, end_date
+        return parse_date_range(self.report_params)
 
 
 class SimpleReportMixin:
-    """Simplified mixin for report generation"""
-
-    def generate_pdf_report(self, title, headers, data_rows):
-        """Generate simple PDF report"""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Add title
-        title_style = styles['Heading1']
-        title_style.alignment = 1
-        story.append(Paragraph(title, title_style))
-        story.append(Paragraph(f"Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-        story.append(Paragraph(
-            f"Date Range: {self.request.GET.get('start_date', 'All time')} to {self.request.GET.get('end_date', 'Now')}",
-            styles['Normal']))
-        story.append(Paragraph("<br/><br/>", styles['Normal']))
-
-        # Create table
-        table_data = [headers]
-        table_data.extend(data_rows)
-
-        if len(table_data) > 1:
-            table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 14),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
-        else:
-            story.append(Paragraph("No data available for the selected criteria.", styles['Normal']))
-
-        doc.build(story)
-
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{title.lower().replace(" ", "_")}.pdf"'
-        return response
-
-    def generate_csv_report(self, report_type, headers, data_rows):
-        """Generate simple CSV report"""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{report_type}_report.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(headers)
-        for row in data_rows:
-            writer.writerow(row)
-
-        return response
-
+    """
+    Simplified mixin for report generation. Subclasses implement
+    build_report(); ?async=1 queues the build as a ReportJob instead of
+    running it in the request (admin_panel/report_jobs.py).
+    """
+    # Name the report is registered under in report_jobs.REPORT_VIEWS
+    report_name = None
 
-class ProviderReportView(SimpleReportMixin, BaseReportView):
-    """Generate Provider Performance Report"""
+    def build_report(self):
+        """Return {'title', 'report_type', 'headers', 'rows'}; rows may be a lazy iterable"""
+        raise NotImplementedError
 
     def get(self, request, *args, **kwargs):
         format = request.GET.get('format', 'pdf')
 
-        # Get provider data
-        providers = self.get_provider_data()
-
-        # Prepare headers and data rows
-        headers = ['Provider Name', 'Total Claims', 'Average Rating', 'Status']
-        data_rows = []
-
-        for provider in providers:
-            data_rows.append([
-                provider.get('name', 'N/A'),
-                provider.get('total_claims', 0),
-                f"{provider.get('rating', 0)}/5",
-                provider.get('status', 'Active')
-            ])
-
+        if request.GET.get('async'):
+            try:
+                job = submit_report_job(self.report_name, format, request.GET, user=request.user)
+            except ValueError as e:
+                return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+            return JsonResponse(report_job_payload(job), status=202)
+
+        # Identical requests are answered from the report cache until a table the report reads changes
+        format = 'csv' if format == 'csv' else 'pdf'
+        params = {key: request.GET[key] for key in REPORT_PARAM_KEYS if request.GET.get(key)}
+        cache_key, cached = get_cached_report(self.report_name, {**params, 'format': format})
+        if cached is not None:
+            return self.cached_report_response(cached)
+
+        report = self.build_report()
         if format == 'csv':
-            return self.generate_csv_report('provider_performance', headers, data_rows)
+            return self.generate_csv_report(report['report_type'], report['headers'], report['rows'],
+                                            cache_key=cache_key)
         else:
-            return self.generate_pdf_report('Provider Performance Report', headers, data_rows)
+            return self.generate_pdf_report(report['title'], report['headers'], report['rows'],
+                                            cache_key=cache_key)
 
-    def get_provider_data(self):
-        """Get provider data from available sources"""
-        providers = []
+    def write_pdf(self, output, title, headers, data_rows):
+        """Write the PDF to `output` (a path or binary file), one page-sized table at a time; returns the page count"""
+        date_range = (f"Date Range: {self.report_params.get('start_date', 'All time')} "
+                      f"to {self.report_params.get('end_date', 'Now')}")
+        return write_table_pdf(output, title, headers, data_rows, subtitles=[date_range])
 
-        # Try NetworkProvider model first
-        if HAS_NETWORK_PROVIDER and NetworkProvider:
-            try:
-                network_providers = NetworkProvider.objects.annotate(
-                    claim_count=Count('claim')
-                ).all()
-
-                for provider in network_providers:
-                    providers.append({
-                        'name': provider.name,
-                        'total_claims': provider.claim_count,
-                        'rating': provider.rating or 4.0,
-                        'status': 'Active' if getattr(provider, 'is_active', True) else 'Inactive'
-                    })
-            except Exception as e:
-                print(f"Error fetching NetworkProvider data: {e}")
+    def render_pdf(self, title, headers, data_rows):
+        """Build the PDF and return its bytes"""
+        buffer = BytesIO()
+        self.write_pdf(buffer, title, headers, data_rows)
+        return buffer.getvalue()
+
+    def generate_pdf_report(self, title, headers, data_rows, cache_key=None):
+        """Generate simple PDF report"""
+        content = self.render_pdf(title, headers, data_rows)
+        filename = f'{title.lower().replace(" ", "_")}.pdf'
+        if cache_key and len(content) <= settings.REPORT_CACHE_MAX_BYTES:
+            store_report(cache_key, {'filename': filename, 'content': content})
+        return self.pdf_response(filename, content)
+
+    def generate_csv_report(self, report_type, headers, data_rows, cache_key=None):
+        """Stream a CSV report; data_rows may be any iterable, consumed lazily"""
+        filename = f'{report_type}_report.csv'
+        chunks = csv_chunks(headers, data_rows)
+        if cache_key:
+            chunks = cache_chunks(cache_key, chunks, meta={'filename': filename})
+        return csv_chunks_response(filename, chunks, request=self.request)
+
+    def pdf_response(self, filename, content):
+        response = HttpResponse(content, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def cached_report_response(self, cached):
+        if cached['filename'].endswith('.csv'):
+            return csv_chunks_response(cached['filename'], [cached['content']], request=self.request)
+        return self.pdf_response(cached['filename'], cached['content'])
 
-        # Try Feedback model as fallback
-        if not providers:
-            try:
-                from django.db.models import Count
-                feedback_providers = Feedback.objects.filter(
-                    network_provider__isnull=False
-                ).values(
-                    'network_provider__name'
-                ).annotate(
-                    feedback_count=Count('id')
-                ).order_by('-feedback_count')
-
-                for item in feedback_providers:
-                    providers.append({
-                        'name': item['network_provider__name'],
-                        'total_claims': item['feedback_count'],
-                        'rating': 4.0,
-                        'status': 'Active'
-                    })
-            except Exception as e:
-                print(f"Error fetching Feedback provider data: {e}")
 
-        # If still no data, use sample data
-        if not providers:
-            providers = [
-                {'name': 'City Hospital', 'total_claims': 45, 'rating': 4.5, 'status': 'Active'},
-                {'name': 'General Clinic', 'total_claims': 32, 'rating': 4.2, 'status': 'Active'},
-                {'name': 'Specialty Center', 'total_claims': 28, 'rating': 4.7, 'status': 'Active'},
-                {'name': 'Urgent Care', 'total_claims': 22, 'rating': 4.1, 'status': 'Active'},
-                {'name': 'Family Practice', 'total_claims': 18, 'rating': 4.3, 'status': 'Active'},
-                {'name': 'Dental Care', 'total_claims': 15, 'rating': 4.6, 'status': 'Active'},
-                {'name': 'Eye Center', 'total_claims': 12, 'rating': 4.4, 'status': 'Active'},
-                {'name': 'Physical Therapy', 'total_claims': 8, 'rating': 4.8, 'status': 'Active'}
-            ]
+class ProviderReportView(SimpleReportMixin, BaseReportView):
+    """Generate Provider Performance Report"""
+    report_name = 'provider'
 
-        return providers
+    def build_report(self):
+        return provider_report()
 
 
 class ClaimsReportView(SimpleReportMixin, BaseReportView):
     """Generate Claims Summary Report"""
+    report_name = 'claims'
 
-    def get(self, request, *args, **kwargs):
-        format = request.GET.get('format', 'pdf')
+    def build_report(self):
         start_date, end_date = self.get_date_range()
-
-        claims = Claim.objects.filter(
-            filed_date__date__range=[start_date, end_date]
-        ).select_related('user_policy__user', 'user_policy__policy')
-
-        headers = ['Claim ID', 'User', 'Policy', 'Amount', 'Status', 'Date Filed']
-        data_rows = []
-
-        for claim in claims:
-            user_name = 'N/A'
-            if hasattr(claim.user_policy, 'user') and hasattr(claim.user_policy.user, 'username'):
-                user_name = claim.user_policy.user.username
-
-            policy_name = 'N/A'
-            if hasattr(claim.user_policy, 'policy') and hasattr(claim.user_policy.policy, 'name'):
-                policy_name = claim.user_policy.policy.name
-
-            data_rows.append([
-                claim.claim_id or 'N/A',
-                user_name,
-                policy_name,
-                f"${claim.claim_amount:.2f}" if claim.claim_amount else '$0.00',
-                claim.status.title() if claim.status else 'N/A',
-                claim.filed_date.strftime('%Y-%m-%d') if claim.filed_date else 'N/A'
-            ])
-
-        if format == 'csv':
-            return self.generate_csv_report('claims_summary', headers, data_rows)
-        else:
-            return self.generate_pdf_report('Claims Summary Report', headers, data_rows)
+        return claims_report(start_date, end_date)
 
 
 class PolicyUsageReportView(SimpleReportMixin, BaseReportView):
     """Generate Policy Usage Report"""
+    report_name = 'policy_usage'
 
-    def get(self, request, *args, **kwargs):
-        format = request.GET.get('format', 'pdf')
-
-        # Get UserPolicy statistics by Policy
-        policies = Policy.objects.annotate(
-            total_purchases=Count('userpolicy'),
-            active_purchases=Count('userpolicy', filter=Q(userpolicy__status__iexact='active'))
-        )
-
-        headers = ['Policy Name', 'Policy ID', 'Premium', 'Total Purchases', 'Active Policies', 'Utilization Rate']
-        data_rows = []
-
-        for policy in policies:
-            total = policy.total_purchases or 0
-            active = policy.active_purchases or 0
-            utilization = round((active / total * 100) if total > 0 else 0, 1)
-
-            data_rows.append([
-                policy.name,
-                policy.policy_id or 'N/A',
-                f"${policy.premium:.2f}" if policy.premium else '$0.00',
-                total,
-                active,
-                f"{utilization}%"
-            ])
-
-        if format == 'csv':
-            return self.generate_csv_report('policy_usage', headers, data_rows)
-        else:
-            return self.generate_pdf_report('Policy Usage Report', headers, data_rows)
+    def build_report(self):
+        return policy_usage_report()
 
 
 class MonthlyTrendsReportView(SimpleReportMixin, BaseReportView):
     """Generate Monthly Trends Report"""
+    report_name = 'monthly_trends'
 
-    def get(self, request, *args, **kwargs):
-        format = request.GET.get('format', 'pdf')
-
-        # Get data for last 6 months
-        trends_data = self.get_trends_data()
-
-        headers = ['Month', 'Claims', 'New Policies', 'Approved Claims', 'Revenue ($)']
-        data_rows = []
-
-        for i in range(len(trends_data['months'])):
-            data_rows.append([
-                trends_data['months'][i],
-                trends_data['claims'][i],
-                trends_data['policies'][i],
-                trends_data['approved_claims'][i],
-                f"${trends_data['revenue'][i]:,.2f}"
-            ])
-
-        if format == 'csv':
-            return self.generate_csv_report('monthly_trends', headers, data_rows)
-        else:
-            return self.generate_pdf_report('Monthly Trends Report', headers, data_rows)
-
-    def get_trends_data(self):
-        """Get trends data for last 6 months"""
-        months = []
-        claims_data = []
-        policies_data = []
-        approved_claims_data = []
-        revenue_data = []
-
-        for i in range(6, 0, -1):
-            month_date = timezone.now() - timedelta(days=30 * i)
-            month = month_date.strftime('%b %Y')
-            months.append(month)
-
-            # Query actual data for each month
-            claims_count = Claim.objects.filter(
-                filed_date__month=month_date.month,
-                filed_date__year=month_date.year
-            ).count()
-
-            # Count UserPolicy applications for the month
-            policies_count = UserPolicy.objects.filter(
-                application_date__month=month_date.month,
-                application_date__year=month_date.year
-            ).count()
-
-            # Count approved claims for the month
-            approved_claims_count = Claim.objects.filter(
-                filed_date__month=month_date.month,
-                filed_date__year=month_date.year,
-                status__iexact='approved'
-            ).count()
-
-            # Calculate revenue (sum of claim amounts for approved claims in the month)
-            monthly_revenue = Claim.objects.filter(
-                filed_date__month=month_date.month,
-                filed_date__year=month_date.year,
-                status__iexact='approved'
-            ).aggregate(total=Sum('claim_amount'))['total'] or 0
-
-            claims_data.append(claims_count)
-            policies_data.append(policies_count)
-            approved_claims_data.append(approved_claims_count)
-            revenue_data.append(monthly_revenue)
-
-        return {
-            'months': months,
-            'claims': claims_data,
-            'policies': policies_data,
-            'approved_claims': approved_claims_data,
-            'revenue': revenue_data
-        }
+    def build_report(self):
+        # Last 6 months by default; start_date, end_date and granularity pick any range
+        return trends_report(self.report_params)
 
 
 class ChartDataView(LoginRequiredMixin, UserPassesTestMixin, View):
@@ -1198,44 +868,62 @@ class ChartDataView(LoginRequiredMixin, UserPassesTestMixin, View):
 
     def get(self, request, *args, **kwargs):
         chart_type = request.GET.get('type', 'claims')
+        if chart_type not in SERIES:
+            return JsonResponse({'labels': [], 'data': []})
 
-        # Last 6 months data
-        months = []
-        data = []
-
-        for i in range(6, 0, -1):
-            month_date = timezone.now() - timedelta(days=30 * i)
-            month = month_date.strftime('%b')
-            months.append(month)
-
-            if chart_type == 'claims':
-                count = Claim.objects.filter(
-                    filed_date__month=month_date.month,
-                    filed_date__year=month_date.year
-                ).count()
-                data.append(count)
-
-            elif chart_type == 'policies':
-                # Count UserPolicy applications for the month
-                count = UserPolicy.objects.filter(
-                    application_date__month=month_date.month,
-                    application_date__year=month_date.year
-                ).count()
-                data.append(count)
-
-            elif chart_type == 'revenue':
-                # Calculate revenue for the month
-                revenue = Claim.objects.filter(
-                    filed_date__month=month_date.month,
-                    filed_date__year=month_date.year,
-                    status__iexact='approved'
-                ).aggregate(total=Sum('claim_amount'))['total'] or 0
-                data.append(float(revenue))
+        # Last 6 months by default; start_date, end_date and granularity pick any range
+        start, end, granularity = parse_trend_params(request.GET)
+        params = {'type': chart_type, 'start_date': start, 'end_date': end, 'granularity': granularity}
+        return JsonResponse(cached_report('chart', params, lambda: chart_data(chart_type, request.GET)))
 
-        return JsonResponse({
-            'labels': months,
-            'data': data
-        })
+
+class ColumnarExportView(BaseReportView):
+    """
+    Analytics export of claims, user policies, tickets or providers in column
+    batches (admin_panel/columnar.py). ?format=arrow, parquet or columnar
+    (Arrow when pyarrow is installed, columnar otherwise); ?since= an ISO
+    date or datetime, or ?cursor= a consumer name, for only the rows changed
+    since then or since that consumer's last complete export.
+    """
+
+    def get(self, request, dataset):
+        format = request.GET.get('format') or default_format()
+        try:
+            check_format(format)
+            since = parse_since(request.GET['since']) if request.GET.get('since') else None
+            export = ColumnarExport(dataset, since=since, cursor=request.GET.get('cursor') or None)
+        except ExportError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+        response = attachment_response(
+            f"{dataset}_export.{COLUMNAR_FORMATS[format]['extension']}", export_chunks(export, format),
+            COLUMNAR_FORMATS[format]['content_type'], request=request, gzip=format != 'parquet',
+        )
+        # The window exported, for clients keeping their own watermark
+        for header, value in (('X-Export-Since', export.since), ('X-Export-Until', export.until)):
+            if value is not None:
+                response[header] = value.isoformat()
+        return response
+
+
+@user_passes_test(is_admin)
+def report_job_status(request, job_id):
+    """Status of a queued report; includes download_url once the artifact is ready"""
+    job = get_object_or_404(ReportJob, pk=job_id)
+    return JsonResponse(report_job_payload(job))
+
+
+@user_passes_test(is_admin)
+def download_report_job(request, job_id):
+    """The stored artifact of a finished report job"""
+    job = get_object_or_404(ReportJob, pk=job_id)
+    if job.status == 'EXPIRED' or (job.status == 'READY' and job.expires_at <= timezone.now()):
+        return JsonResponse({'status': 'error', 'message': 'This report has expired; request it again.'}, status=410)
+    if job.status != 'READY':
+        return JsonResponse(report_job_payload(job), status=409)
+    content_type = 'application/pdf' if job.format == 'pdf' else 'text/csv'
+    filename = f'{job.report}_report.{job.format}'
+    return FileResponse(job.artifact.open('rb'), as_attachment=True, filename=filename, content_type=content_type)
 
 
 # ================================================
@@ -0,0 +1,102 @@
+# claims/adjudication.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from policy.models import Claim, normalize_claim_status
+
+from .ingest import LOOKUP_CHUNK_SIZE, chunked
+from .models import ClaimStatusChange
+from .signals import claims_bulk_written
+
+# Every legal status move, by adjudicators and the rules engine (claims/rules.py) alike
+ALLOWED_TRANSITIONS = {
+    'SUBMITTED': {'UNDER_REVIEW'},
+    'UNDER_REVIEW': {'APPROVED', 'REJECTED'},
+}
+
+
+def transition_path(from_status, to_status):
+    """
+    The statuses a claim passes through from `from_status` to `to_status`
+    (the target included) along the fewest ALLOWED_TRANSITIONS, or None
+    when the target cannot be reached.
+    """
+    paths = {from_status: []}
+    frontier = [from_status]
+    while frontier and to_status not in paths:
+        following = []
+        for status in frontier:
+            for target in sorted(ALLOWED_TRANSITIONS.get(status, ())):
+                if target not in paths:
+                    paths[target] = paths[status] + [target]
+                    following.append(target)
+        frontier = following
+    return paths.get(to_status) or None
+
+
+def transition_claims(claim_ids, to_status, user=None, comment=None):
+    """
+    Move the claims with the given claim_ids (e.g. 'CLM0001') to `to_status`.
+
+    Each claim is checked against ALLOWED_TRANSITIONS; the allowed ones are
+    moved with one UPDATE per source status, guarded on that status so a
+    concurrent change is never overwritten, and an audit row is bulk-written
+    for each. Returns (moved, rejected): a list of claim_ids and a list of
+    {'claim_id', 'reason'} dicts.
+    """
+    target = normalize_claim_status(to_status)
+    claim_ids = list(dict.fromkeys(claim_ids))
+    if target is None:
+        return [], [{'claim_id': claim_id, 'reason': f"Unknown status '{to_status}'"} for claim_id in claim_ids]
+
+    moved, rejected = [], []
+    with transaction.atomic():
+        current = {}
+        for chunk in chunked(claim_ids, LOOKUP_CHUNK_SIZE):
+            current.update(
+                (claim_id, (pk, status)) for pk, claim_id, status in
+                Claim.objects.select_for_update().filter(claim_id__in=chunk).values_list('pk', 'claim_id', 'status')
+            )
+
+        # Group by the stored value so each UPDATE can be guarded on it
+        by_status = defaultdict(list)
+        for claim_id in claim_ids:
+            if claim_id not in current:
+                rejected.append({'claim_id': claim_id, 'reason': 'Claim not found'})
+                continue
+            pk, status = current[claim_id]
+            if target not in ALLOWED_TRANSITIONS.get(status, ()):
+                rejected.append({'claim_id': claim_id, 'reason': f"Cannot move from {status} to {target}"})
+                continue
+            by_status[status].append((pk, claim_id))
+
+        # QuerySet.update() skips Claim.save(), so the details version is bumped here
+        now = timezone.now()
+        changes = {'status': target, 'version': F('version') + 1, 'updated_at': now}
+        if target in Claim.DECIDED_STATUSES:
+            changes['decided_at'] = now
+        if comment is not None:
+            changes['comment'] = comment
+
+        audit = []
+        for status, claims in by_status.items():
+            moved_pks = []
+            for chunk in chunked(claims, LOOKUP_CHUNK_SIZE):
+                pks = [pk for pk, _ in chunk]
+                Claim.objects.filter(pk__in=pks, status=status).update(**changes)
+                moved_pks.extend(pks)
+                moved.extend(claim_id for _, claim_id in chunk)
+
+            audit.extend(
+                ClaimStatusChange(claim_id=pk, from_status=status, to_status=target,
+                                  comment=comment or '', changed_by=user)
+                for pk in moved_pks
+            )
+            claims_bulk_written.send(sender=Claim, claim_ids=moved_pks, created=False, old_status=status)
+
+        ClaimStatusChange.objects.bulk_create(audit, batch_size=500)
+
+    return moved, rejected
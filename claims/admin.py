@@ -1,3 +1,43 @@
 from django.contrib import admin
+from .models import ClaimFingerprint, ClaimStatusChange, DocumentBlob, DocumentPreview, IngestToken
 
 # Register your models here.
+
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'file', 'size', 'content_type', 'ref_count', 'created_at')
+    search_fields = ('sha256', 'file')
+    readonly_fields = ('sha256', 'file', 'size', 'content_type', 'ref_count', 'created_at')
+
+
+@admin.register(DocumentPreview)
+class DocumentPreviewAdmin(admin.ModelAdmin):
+    list_display = ('source', 'status', 'attempts', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('source',)
+
+
+@admin.register(ClaimStatusChange)
+class ClaimStatusChangeAdmin(admin.ModelAdmin):
+    list_display = ('claim', 'from_status', 'to_status', 'changed_by', 'changed_at')
+    list_filter = ('to_status', 'changed_at')
+    search_fields = ('claim__claim_id',)
+
+
+@admin.register(ClaimFingerprint)
+class ClaimFingerprintAdmin(admin.ModelAdmin):
+    list_display = ('claim', 'user_policy', 'amount', 'window', 'document_sha256', 'duplicate_of')
+    list_filter = (('duplicate_of', admin.EmptyFieldListFilter),)
+    search_fields = ('claim__claim_id', 'document_sha256')
+    raw_id_fields = ('claim', 'user_policy', 'duplicate_of')
+
+
+@admin.register(IngestToken)
+class IngestTokenAdmin(admin.ModelAdmin):
+    # Tokens are issued by the create_ingest_token command, which shows the key once
+    list_display = ('name', 'is_active', 'created_at', 'last_used_at')
+    list_filter = ('is_active',)
+    readonly_fields = ('created_at', 'last_used_at')
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,156 @@
+# claims/delivery.py
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from django.utils.module_loading import import_string
+
+CHUNK_SIZE = 64 * 1024
+
+# Content-addressed documents carry their SHA-256 in the file name
+DIGEST_RE = re.compile(r'([0-9a-f]{64})(\.[^/]*)?$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def document_digest(name):
+    """Return the SHA-256 embedded in a content-addressed document name, if any."""
+    match = DIGEST_RE.search(name or '')
+    return match.group(1) if match else None
+
+
+def make_etag(name, size, mtime):
+    digest = document_digest(name)
+    if digest:
+        return quote_etag(digest)
+    return quote_etag(f'{int(mtime):x}-{size:x}')
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range "Range: bytes=..." header into an inclusive
+    (start, end) pair. Returns None when the whole file should be sent
+    (no header, or a multi-range/malformed request, which RFC 9110 lets us
+    ignore) and raises RangeNotSatisfiable for ranges outside the file.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def range_not_satisfiable(size):
+    response = HttpResponse(status=416)
+    response['Content-Range'] = f'bytes */{size}'
+    return response
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class DocumentDelivery:
+    """
+    Base class for sending a stored claim document to the client.
+    `handles_ranges` tells the view whether it must slice the file itself or
+    whether the web server applies the Range header after the hand-off.
+    """
+    handles_ranges = False
+
+    def serve(self, request, name, path, size, byte_range=None):
+        raise NotImplementedError
+
+    def finalize(self, response, name, etag, last_modified):
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        response['Content-Disposition'] = content_disposition_header(True, os.path.basename(name))
+        content_type, _ = mimetypes.guess_type(name)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        return response
+
+
+class DjangoDelivery(DocumentDelivery):
+    """Streams the file through the worker (the original behaviour)."""
+    handles_ranges = True
+
+    def serve(self, request, name, path, size, byte_range=None):
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'))
+            response['Content-Length'] = size
+            return response
+
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+        return response
+
+
+class XSendfileDelivery(DocumentDelivery):
+    """Apache mod_xsendfile / lighttpd: the server reads the absolute path itself."""
+
+    def serve(self, request, name, path, size, byte_range=None):
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+
+
+class XAccelRedirectDelivery(DocumentDelivery):
+    """
+    nginx: redirect internally to an `internal` location that maps
+    CLAIM_DOCUMENT_ACCEL_PREFIX onto MEDIA_ROOT.
+    """
+
+    def serve(self, request, name, path, size, byte_range=None):
+        prefix = settings.CLAIM_DOCUMENT_ACCEL_PREFIX.rstrip('/')
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = f'{prefix}/{quote(name)}'
+        return response
+
+
+DELIVERY_BACKENDS = {
+    'django': DjangoDelivery,
+    'x-sendfile': XSendfileDelivery,
+    'x-accel-redirect': XAccelRedirectDelivery,
+}
+
+
+def get_delivery_backend():
+    """Return the backend named by CLAIM_DOCUMENT_DELIVERY (an alias or a dotted path)."""
+    backend = getattr(settings, 'CLAIM_DOCUMENT_DELIVERY', 'django')
+    backend_class = DELIVERY_BACKENDS.get(backend) or import_string(backend)
+    return backend_class()
@@ -0,0 +1,71 @@
+# claims/details.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.http import quote_etag
+
+from policy.models import Claim
+
+
+def details_cache_key(pk, version):
+    # The version is part of the key, so a status/comment change never needs a delete
+    return f'claims:details:{pk}:v{version}'
+
+
+def details_etag(pairs):
+    """ETag over (pk, version) pairs; a single claim gets a readable tag."""
+    if len(pairs) == 1:
+        pk, version = pairs[0]
+        return quote_etag(f'claim-{pk}-v{version}')
+    digest = hashlib.sha1(','.join(f'{pk}:{version}' for pk, version in sorted(pairs)).encode())
+    return quote_etag(f'claims-{digest.hexdigest()[:20]}')
+
+
+def serialize_claim(claim):
+    """The details payload; document_url is relative and made absolute per request."""
+    return {
+        'claim_id': claim.claim_id,
+        'version': claim.version,
+        'status': claim.get_status_display(),
+        'status_raw': claim.status,  # Add raw status for JS
+        'amount': f"{claim.claim_amount:,}",
+        'reason': claim.reason,
+        'comment': claim.comment if claim.comment else "No comments from admin yet.",
+        'filed_date': claim.filed_date.strftime('%B %d, %Y'),
+        'has_document': bool(claim.document),
+        'document_url': reverse('claims:download_claim_document', args=[claim.pk]) if claim.document else "",
+    }
+
+
+def claim_versions(user, pks):
+    """
+    {pk: (version, updated_at)} for those of `pks` that belong to `user`.
+    This is the only query a conditional request needs.
+    """
+    return {
+        pk: (version, updated_at)
+        for pk, version, updated_at in Claim.objects.filter(pk__in=pks, user_policy__user=user)
+        .values_list('pk', 'version', 'updated_at')
+    }
+
+
+def claim_payloads(versions):
+    """
+    Payloads for the claims in `versions` ({pk: (version, updated_at)}),
+    served from the cache where possible. Misses are loaded in one query and
+    cached under their current version.
+    """
+    keys = {pk: details_cache_key(pk, version) for pk, (version, _) in versions.items()}
+    cached = cache.get_many(keys.values())
+    payloads = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+    missing = [pk for pk in keys if pk not in payloads]
+    if missing:
+        fresh = {claim.pk: serialize_claim(claim) for claim in Claim.objects.filter(pk__in=missing)}
+        # Cache under the version the payload was built from, which may be newer than the one requested
+        cache.set_many({details_cache_key(pk, payload['version']): payload for pk, payload in fresh.items()},
+                       settings.CLAIM_DETAILS_CACHE_TIMEOUT)
+        payloads.update(fresh)
+    return payloads
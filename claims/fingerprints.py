@@ -0,0 +1,83 @@
+# claims/fingerprints.py
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from policy.models import Claim
+
+from .delivery import document_digest
+from .models import ClaimFingerprint
+
+FINGERPRINT_FIELDS = ('user_policy_id', 'document_sha256', 'amount', 'window')
+
+
+def normalize_amount(amount):
+    try:
+        return Decimal(str(amount)).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    except (InvalidOperation, ValueError):
+        return Decimal('0')
+
+
+def filing_window(filed_date):
+    filed = timezone.localdate(filed_date) if filed_date else timezone.localdate()
+    return filed.toordinal() // settings.CLAIM_DUPLICATE_WINDOW_DAYS
+
+
+def fingerprint_values(user_policy_id, document_name, amount, filed_date, document_sha256=None):
+    """
+    The fingerprint fields for one claim. Content-addressed documents carry
+    their hash in the file name; older uploads only get one when the
+    backfill command hashes them (pass document_sha256).
+    """
+    return {
+        'user_policy_id': user_policy_id,
+        'document_sha256': document_sha256 or document_digest(document_name) or '',
+        'amount': normalize_amount(amount),
+        'window': filing_window(filed_date),
+    }
+
+
+def claim_fingerprint_values(claim):
+    return fingerprint_values(claim.user_policy_id, claim.document.name if claim.document else '',
+                              claim.claim_amount, claim.filed_date)
+
+
+def find_probable_duplicates(values, exclude_claim=None):
+    """
+    Claims on the same policy with the same document, or with the same
+    rounded amount filed in this or the previous window. One query, served by
+    the two ClaimFingerprint indexes.
+    """
+    same_amount = Q(amount=values['amount'], window__in=[values['window'] - 1, values['window']])
+    if values['document_sha256']:
+        same_amount |= Q(document_sha256=values['document_sha256'])
+
+    matches = ClaimFingerprint.objects.filter(Q(user_policy_id=values['user_policy_id']) & same_amount)
+    if exclude_claim is not None:
+        matches = matches.exclude(claim_id=exclude_claim)
+    return list(matches.order_by('claim_id').values_list('claim_id', flat=True))
+
+
+def sync_claim_fingerprint(claim, created):
+    values = claim_fingerprint_values(claim)
+    if created:
+        ClaimFingerprint.objects.create(claim_id=claim.pk, **values)
+        return
+
+    if not values['document_sha256']:
+        # Keep a hash the backfill command computed from a legacy file
+        values.pop('document_sha256')
+    if not ClaimFingerprint.objects.filter(claim_id=claim.pk).update(**values):
+        ClaimFingerprint.objects.create(claim_id=claim.pk, **values)
+
+
+def create_fingerprints_for(claim_pks, batch_size=500):
+    """Fingerprint claims inserted with bulk_create(), which skips post_save."""
+    rows = Claim.objects.filter(pk__in=claim_pks).values_list(
+        'pk', 'user_policy_id', 'document', 'claim_amount', 'filed_date')
+    ClaimFingerprint.objects.bulk_create(
+        [ClaimFingerprint(claim_id=pk, **fingerprint_values(*fields)) for pk, *fields in rows],
+        batch_size=batch_size, ignore_conflicts=True,
+    )
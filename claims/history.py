@@ -0,0 +1,91 @@
+# claims/history.py
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from policy.models import Claim
+
+STATUS_LABELS = dict(Claim.CLAIM_STATUS_CHOICES)
+
+
+def encode_cursor(claim):
+    """Opaque token pointing just past `claim` in newest-first order."""
+    raw = f'{claim.filed_date.isoformat()}|{claim.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (filed_date, pk) from a cursor, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        filed, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(filed), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def claim_history_page(user, cursor=None, page_size=None):
+    """
+    One page of the user's claims, newest first, with the policy joined in.
+
+    Keyset pagination on (filed_date, id): the next page starts strictly after
+    the last row of this one, so the cost does not grow with the page number
+    and claims filed in the meantime do not shift rows between pages.
+    Returns (claims, next_cursor); next_cursor is None on the last page.
+    """
+    page_size = page_size or settings.CLAIM_HISTORY_PAGE_SIZE
+    claims = (Claim.objects.filter(user_policy__user=user)
+              .select_related('user_policy__policy')
+              .order_by('-filed_date', '-id'))
+
+    position = decode_cursor(cursor)
+    if position:
+        filed, pk = position
+        claims = claims.filter(Q(filed_date__lt=filed) | Q(filed_date=filed, id__lt=pk))
+
+    # One extra row tells us whether another page exists
+    rows = list(claims[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def summary_cache_key(user_id):
+    return f'claims:summary:{user_id}'
+
+
+def claim_summary(user_id):
+    """Claim counts and amounts per status for one user, cached until their claims change."""
+    key = summary_cache_key(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = _build_summary(user_id)
+        cache.set(key, summary, settings.CLAIM_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def _build_summary(user_id):
+    rows = (Claim.objects.filter(user_policy__user_id=user_id)
+            .values('status').annotate(count=Count('id'), total=Sum('claim_amount')))
+    by_status = {
+        row['status']: {'status': row['status'], 'label': STATUS_LABELS.get(row['status'], row['status']),
+                        'count': row['count'], 'total': row['total'] or 0}
+        for row in rows
+    }
+
+    statuses = [by_status[code] for code in STATUS_LABELS if code in by_status]
+    statuses += [entry for code, entry in by_status.items() if code not in STATUS_LABELS]
+    return {
+        'by_status': statuses,
+        'count': sum(entry['count'] for entry in statuses),
+        'total': sum(entry['total'] for entry in statuses),
+    }
+
+
+def invalidate_claim_summaries(user_ids):
+    cache.delete_many([summary_cache_key(user_id) for user_id in set(user_ids)])
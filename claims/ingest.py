@@ -0,0 +1,220 @@
+# claims/ingest.py
+import csv
+import hashlib
+import json
+import secrets
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from network_provider.models import NetworkProvider
+from policy.models import CLAIM_IDS, Claim, UserPolicy
+
+from .models import IngestToken
+from .signals import claims_bulk_written
+
+# Rows per IN (...) lookup, below SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 900
+INSERT_BATCH_SIZE = 500
+
+MAX_CLAIM_AMOUNT = Decimal('99999999.99')  # Claim.claim_amount is DECIMAL(10, 2)
+
+
+class IngestError(Exception):
+    pass
+
+
+def key_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue_ingest_token(name):
+    """Create a token for `name`. Returns (token, key); the key is not stored and cannot be shown again."""
+    key = secrets.token_urlsafe(32)
+    return IngestToken.objects.create(name=name, key_digest=key_digest(key)), key
+
+
+def authenticate_ingest_token(request):
+    """The active IngestToken named by the request's "Authorization: Token <key>" header, or None."""
+    scheme, _, key = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'token' or not key.strip():
+        return None
+    token = IngestToken.objects.filter(key_digest=key_digest(key.strip()), is_active=True).first()
+    if token is not None:
+        IngestToken.objects.filter(pk=token.pk).update(last_used_at=timezone.now())
+    return token
+
+
+def read_jsonl(lines):
+    """Yield one dict per non-blank JSON line; unparsable lines yield their error."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {'_error': f"Invalid JSON: {exc}"}
+            continue
+        yield record if isinstance(record, dict) else {'_error': 'Each line must be a JSON object'}
+
+
+def read_csv(lines):
+    """Yield one dict per CSV row, using the header row for field names."""
+    decoded = (line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    yield from csv.DictReader(decoded)
+
+
+READERS = {
+    'jsonl': read_jsonl,
+    'csv': read_csv,
+}
+
+
+def chunked(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class ClaimBatchIngestor:
+    """
+    Validates a batch of claim records against UserPolicy with set-based
+    lookups and inserts the valid ones with bulk_create() in one transaction.
+
+    Each record needs user_policy_id, claim_amount and reason, and may name
+    the treating network provider by provider_id (its primary key). run() returns
+    one result per input row, in input order. In strict mode nothing is
+    inserted unless every row is valid.
+    """
+
+    def __init__(self, records, strict=False):
+        self.records = records
+        self.strict = strict
+
+    def run(self):
+        results, candidates = self._validate_fields()
+
+        policy_ids = {claim.user_policy_id for _, claim in candidates}
+        statuses = self._user_policy_statuses(policy_ids)
+        providers = self._active_providers({claim.provider_id for _, claim in candidates if claim.provider_id})
+
+        valid = []
+        for result, claim in candidates:
+            status = statuses.get(claim.user_policy_id)
+            if status is None:
+                result['errors'].append(f"User policy {claim.user_policy_id} does not exist")
+            elif status != 'ACTIVE':
+                result['errors'].append(f"User policy {claim.user_policy_id} is not active ({status})")
+            elif claim.provider_id and claim.provider_id not in providers:
+                result['errors'].append(f"Provider {claim.provider_id} does not exist or is not active")
+            else:
+                valid.append((result, claim))
+
+        rejected = [result for result in results if result['errors']]
+        if self.strict and rejected:
+            valid = []
+
+        if valid:
+            self._insert(valid)
+
+        for result in results:
+            if result['errors']:
+                result['status'] = 'rejected'
+            elif 'claim_id' not in result:
+                result['status'] = 'skipped'  # Valid, but the strict batch was rejected
+            else:
+                result['status'] = 'created'
+        return results
+
+    def _validate_fields(self):
+        results, candidates = [], []
+        max_rows = settings.CLAIM_INGEST_MAX_ROWS
+
+        for row_number, record in enumerate(self.records, start=1):
+            if row_number > max_rows:
+                raise IngestError(f"A batch may contain at most {max_rows} claims")
+
+            result = {'row': row_number, 'errors': []}
+            results.append(result)
+
+            if '_error' in record:
+                result['errors'].append(record['_error'])
+                continue
+
+            try:
+                user_policy_id = int(record.get('user_policy_id'))
+            except (TypeError, ValueError):
+                result['errors'].append("user_policy_id must be an integer")
+                user_policy_id = None
+
+            try:
+                amount = Decimal(str(record.get('claim_amount'))).quantize(Decimal('0.01'))
+                if not Decimal('0') < amount <= MAX_CLAIM_AMOUNT:
+                    raise InvalidOperation
+            except (InvalidOperation, ValueError):
+                result['errors'].append("claim_amount must be a positive amount")
+                amount = None
+
+            reason = (record.get('reason') or '').strip()
+            if not reason:
+                result['errors'].append("reason is required")
+
+            provider_id = record.get('provider_id')
+            if provider_id in (None, ''):
+                provider_id = None
+            else:
+                try:
+                    provider_id = int(provider_id)
+                except (TypeError, ValueError):
+                    result['errors'].append("provider_id must be an integer")
+
+            if not result['errors']:
+                candidates.append((result, Claim(
+                    user_policy_id=user_policy_id,
+                    claim_amount=amount,
+                    reason=reason,
+                    provider_id=provider_id,
+                    status='SUBMITTED',
+                )))
+
+        return results, candidates
+
+    @staticmethod
+    def _user_policy_statuses(policy_ids):
+        statuses = {}
+        for chunk in chunked(policy_ids, LOOKUP_CHUNK_SIZE):
+            statuses.update(UserPolicy.objects.filter(id__in=chunk).values_list('id', 'status'))
+        return statuses
+
+    @staticmethod
+    def _active_providers(provider_ids):
+        active = set()
+        for chunk in chunked(provider_ids, LOOKUP_CHUNK_SIZE):
+            active.update(NetworkProvider.objects.filter(id__in=chunk, status='Active')
+                          .values_list('id', flat=True))
+        return active
+
+    @staticmethod
+    def _insert(valid):
+        with transaction.atomic():
+            # bulk_create() skips Claim.save(), so IDs are reserved up front
+            claim_ids = CLAIM_IDS.reserve_ids(len(valid))
+            for (result, claim), claim_id in zip(valid, claim_ids):
+                claim.claim_id = claim_id
+                result['claim_id'] = claim_id
+
+            created = Claim.objects.bulk_create([claim for _, claim in valid], batch_size=INSERT_BATCH_SIZE)
+
+            pks = [claim.pk for claim in created]
+            if None in pks:
+                # Backends that cannot return primary keys from bulk inserts
+                pks = []
+                for chunk in chunked(claim_ids, LOOKUP_CHUNK_SIZE):
+                    pks.extend(Claim.objects.filter(claim_id__in=chunk).values_list('pk', flat=True))
+
+            claims_bulk_written.send(sender=Claim, claim_ids=pks, created=True, old_status=None)
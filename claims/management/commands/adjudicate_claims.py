@@ -0,0 +1,27 @@
+# claims/management/commands/adjudicate_claims.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from claims.rules import RulesEngine
+
+
+class Command(BaseCommand):
+    help = "Run the auto-adjudication rules over every pending (SUBMITTED) claim."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Claims evaluated per batch (default: CLAIM_RULES_BATCH_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Evaluate without writing decisions')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        totals = RulesEngine().run(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        processed = sum(totals.values())
+        summary = ', '.join(f"{decision}={count}" for decision, count in sorted(totals.items())) or 'nothing pending'
+        verb = 'Evaluated' if options['dry_run'] else 'Adjudicated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {processed} claim(s) in {elapsed:.2f}s ({summary})"
+        ))
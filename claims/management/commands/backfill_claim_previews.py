@@ -0,0 +1,41 @@
+# claims/management/commands/backfill_claim_previews.py
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from claims.models import DocumentPreview
+from claims.previews import preview_queue
+from policy.models import Claim
+
+
+class Command(BaseCommand):
+    help = "Generate previews for claim documents that do not have one yet (including queued jobs lost to a restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.CLAIM_PREVIEW_WORKERS)
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Also retry documents whose previews failed permanently')
+
+    def handle(self, *args, **options):
+        finished = ['READY', 'UNSUPPORTED']
+        if not options['retry_failed']:
+            finished.append('FAILED')
+        else:
+            DocumentPreview.objects.filter(status='FAILED').update(status='PENDING', attempts=0)
+
+        sources = (
+            Claim.objects.exclude(document='').exclude(document__isnull=True)
+            .exclude(document__in=DocumentPreview.objects.filter(status__in=finished).values('source'))
+            .values_list('document', flat=True).distinct().iterator()
+        )
+
+        counts = {}
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for preview in pool.map(preview_queue.run, sources):
+                counts[preview.status] = counts.get(preview.status, 0) + 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{preview.source}: {preview.status}")
+
+        summary = ', '.join(f"{status.lower()}={count}" for status, count in sorted(counts.items())) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f"Previews backfilled: {summary}"))
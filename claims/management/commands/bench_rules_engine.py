@@ -0,0 +1,97 @@
+# claims/management/commands/bench_rules_engine.py
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from claims.rules import RulesEngine
+from policy.models import CLAIM_IDS, Claim, Policy, UserPolicy
+
+COVERAGE_LIMITS = ['3 Lakh', '5 Lakh', '10 Lakh', '20 Lakh', '1 Cr', '5,00,000', 'N/A']
+REASONS = ['Hospitalisation', 'Day care procedure', 'Diagnostics', 'Maternity', 'Accident']
+SEED_BATCH_SIZE = 20_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure rules engine throughput (claims/second) end to end: seed synthetic pending "
+        "claims into a throwaway test database, run RulesEngine.run() over them and report the "
+        "load, evaluate and write phases separately. The configured database is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--claims', type=int, default=1_000_000, help='Synthetic pending claims to seed')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Claims per engine batch (default: CLAIM_RULES_BATCH_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Load and evaluate without writing decisions')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            started = time.perf_counter()
+            self._seed(random.Random(options['seed']), options['claims'])
+            self.stdout.write(f"Seeded {options['claims']:,} claims in {time.perf_counter() - started:.2f}s")
+
+            timings = Counter()
+            started = time.perf_counter()
+            totals = RulesEngine().run(batch_size=options['batch_size'], dry_run=options['dry_run'],
+                                       timings=timings)
+            elapsed = time.perf_counter() - started
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        processed = sum(totals.values())
+        rate = processed / elapsed if elapsed else float('inf')
+        self.stdout.write(f"Adjudicated {processed:,} claims in {elapsed:.2f}s: {rate:,.0f} claims/s")
+        for phase in ('load', 'evaluate', 'write'):
+            if phase in timings:
+                share = timings[phase] / elapsed * 100 if elapsed else 0
+                self.stdout.write(f"  {phase:<9} {timings[phase]:>8.2f}s  {share:5.1f}%")
+        for decision, count in sorted(totals.items()):
+            self.stdout.write(f"  {decision:<13} {count:>10,}")
+
+    def _seed(self, rng, total):
+        """Policies, one user policy per member (about 20 claims each) and the pending claims."""
+        policies = Policy.objects.bulk_create([
+            Policy(policy_id=f'BEN{number:03d}', name=f'Bench Plan {number}', description='Benchmark',
+                   premium=Decimal(1000 + number), coverage_limit=limit, validity='1 Year')
+            for number, limit in enumerate(COVERAGE_LIMITS, start=1)
+        ])
+
+        members = max(total // 20, 1)
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f'bench{number}', role='policy_holder')
+                                  for number in range(members)], batch_size=SEED_BATCH_SIZE)
+        today = timezone.localdate()
+        user_policies = []
+        for user_id in User.objects.filter(username__startswith='bench').values_list('pk', flat=True).iterator():
+            start = today - timedelta(days=rng.randint(0, 500))
+            user_policies.append(UserPolicy(
+                user_id=user_id, policy=rng.choice(policies), start_date=start, end_date=start + timedelta(days=365),
+                status=rng.choices(['ACTIVE', 'EXPIRED', 'WITHDRAWN'], weights=[90, 7, 3])[0],
+            ))
+        UserPolicy.objects.bulk_create(user_policies, batch_size=SEED_BATCH_SIZE)
+        user_policy_ids = list(UserPolicy.objects.values_list('pk', flat=True))
+
+        recent = []
+        for offset in range(0, total, SEED_BATCH_SIZE):
+            size = min(SEED_BATCH_SIZE, total - offset)
+            claims = []
+            for claim_id in CLAIM_IDS.reserve_ids(size):
+                if recent and rng.random() < 0.02:
+                    # Roughly 2% of claims repeat an earlier one
+                    user_policy_id, amount, reason = rng.choice(recent)
+                else:
+                    user_policy_id = rng.choice(user_policy_ids)
+                    amount, reason = Decimal(rng.randint(1_000, 400_000)), rng.choice(REASONS)
+                    recent = (recent + [(user_policy_id, amount, reason)])[-50:]
+                claims.append(Claim(claim_id=claim_id, user_policy_id=user_policy_id, claim_amount=amount,
+                                    reason=reason, status='SUBMITTED'))
+            Claim.objects.bulk_create(claims, batch_size=SEED_BATCH_SIZE)
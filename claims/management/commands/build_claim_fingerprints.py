@@ -0,0 +1,73 @@
+# claims/management/commands/build_claim_fingerprints.py
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from claims.delivery import document_digest
+from claims.fingerprints import fingerprint_values
+from claims.models import ClaimFingerprint
+from policy.models import Claim
+
+UPDATE_FIELDS = ['user_policy', 'document_sha256', 'amount', 'window']
+# Without a hash from this run, keep any an earlier --hash-legacy run stored
+UNHASHED_UPDATE_FIELDS = ['user_policy', 'amount', 'window']
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the duplicate-detection fingerprint index for all existing claims "
+        "in one streaming pass. Safe to re-run; existing fingerprints are refreshed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Fingerprints written per INSERT')
+        parser.add_argument('--hash-legacy', action='store_true',
+                            help='Read and hash documents uploaded before content-addressed storage')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rows = Claim.objects.order_by('pk').values_list(
+            'pk', 'user_policy_id', 'document', 'claim_amount', 'filed_date',
+        ).iterator(chunk_size=batch_size)
+
+        written = hashed = 0
+        batch = []
+        for pk, user_policy_id, document, amount, filed_date in rows:
+            sha256 = None
+            if document and options['hash_legacy'] and not document_digest(document):
+                sha256 = self._hash_file(document)
+                hashed += sha256 is not None
+            batch.append(ClaimFingerprint(
+                claim_id=pk, **fingerprint_values(user_policy_id, document, amount, filed_date, sha256)
+            ))
+            if len(batch) >= batch_size:
+                written += self._write(batch)
+                batch = []
+        written += self._write(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fingerprinted {written} claim(s); hashed {hashed} legacy document(s)."
+        ))
+
+    @staticmethod
+    def _write(batch):
+        hashed = [fingerprint for fingerprint in batch if fingerprint.document_sha256]
+        unhashed = [fingerprint for fingerprint in batch if not fingerprint.document_sha256]
+        for fingerprints, update_fields in ((hashed, UPDATE_FIELDS), (unhashed, UNHASHED_UPDATE_FIELDS)):
+            if fingerprints:
+                ClaimFingerprint.objects.bulk_create(
+                    fingerprints, update_conflicts=True, unique_fields=['claim'], update_fields=update_fields,
+                )
+        return len(batch)
+
+    def _hash_file(self, name):
+        digest = hashlib.sha256()
+        try:
+            with default_storage.open(name, 'rb') as handle:
+                for chunk in iter(lambda: handle.read(64 * 1024), b''):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            self.stderr.write(f"Missing document: {name}")
+            return None
+        return digest.hexdigest()
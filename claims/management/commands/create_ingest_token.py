@@ -0,0 +1,19 @@
+# claims/management/commands/create_ingest_token.py
+from django.core.management.base import BaseCommand
+
+from claims.ingest import issue_ingest_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Issue an API token for the bulk claim ingestion endpoint (claims/bulk/). "
+        "The key is printed once; revoke it by deactivating the token in the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='The hospital or TPA integration the token is for')
+
+    def handle(self, *args, **options):
+        token, key = issue_ingest_token(options['name'])
+        self.stdout.write(self.style.SUCCESS(f"Created ingest token {token.pk} for {token.name}."))
+        self.stdout.write(f"Send it as: Authorization: Token {key}")
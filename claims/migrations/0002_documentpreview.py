@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:34
+
+import claims.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentPreview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True)),
+                ('preview', models.FileField(blank=True, max_length=255, upload_to=claims.models.preview_upload_to)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('READY', 'Ready'), ('FAILED', 'Failed'), ('UNSUPPORTED', 'Unsupported')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
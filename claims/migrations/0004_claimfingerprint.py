@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0003_claimstatuschange'),
+        ('policy', '0005_claim_version_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaimFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_sha256', models.CharField(blank=True, max_length=64)),
+                ('amount', models.DecimalField(decimal_places=0, max_digits=10)),
+                ('window', models.PositiveIntegerField()),
+                ('claim', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='policy.claim')),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='policy.claim')),
+                ('user_policy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='policy.userpolicy')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_policy', 'document_sha256'], name='claims_fp_policy_doc_idx'), models.Index(fields=['user_policy', 'amount', 'window'], name='claims_fp_policy_amount_idx')],
+            },
+        ),
+    ]
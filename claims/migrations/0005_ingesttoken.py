@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0004_claimfingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The hospital or TPA integration using the token', max_length=100)),
+                ('key_digest', models.CharField(editable=False, max_length=64, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, editable=False, null=True)),
+            ],
+        ),
+    ]
@@ -1,3 +1,118 @@
+import os
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+def blob_upload_to(instance, filename):
+    """Content-addressed path: claim_documents/ab/cd/<sha256><ext>"""
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    digest = instance.sha256
+    return f'claim_documents/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+class DocumentBlob(models.Model):
+    """
+    A claim document stored once under its SHA-256 digest.
+    ref_count is the number of claims pointing at the file; the blob and its
+    file are removed when the last of those claims is deleted.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=blob_upload_to, max_length=255)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
+def preview_upload_to(instance, filename):
+    """Previews live in their own namespace, next to (not inside) claim_documents/."""
+    return f'claim_previews/{filename}'
+
+
+class DocumentPreview(models.Model):
+    """
+    Small cached rendering of a claim document, also used as the work queue
+    for the preview generator (claims/previews.py). Keyed on the document's
+    storage name, so identical content-addressed uploads share one preview.
+    """
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('READY', 'Ready'),
+        ('FAILED', 'Failed'),
+        ('UNSUPPORTED', 'Unsupported'),  # e.g. PDFs, or Pillow is not installed
+    )
+
+    source = models.CharField(max_length=255, unique=True)
+    preview = models.FileField(upload_to=preview_upload_to, max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Preview of {self.source} ({self.status})"
+
+
+class ClaimStatusChange(models.Model):
+    """Audit trail entry for one claim status transition."""
+    claim = models.ForeignKey('policy.Claim', on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    comment = models.TextField(blank=True)
+    # Null for automated decisions
+    changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-changed_at']
+
+    def __str__(self):
+        return f"{self.claim_id}: {self.from_status} -> {self.to_status}"
+
+
+class ClaimFingerprint(models.Model):
+    """
+    What makes two claims the same bill: the document hash, and the amount on
+    the same policy within a filing window. Kept in step with Claim writes
+    (claims/fingerprints.py) so duplicates are found with one indexed lookup.
+    """
+    claim = models.OneToOneField('policy.Claim', on_delete=models.CASCADE, related_name='fingerprint')
+    user_policy = models.ForeignKey('policy.UserPolicy', on_delete=models.CASCADE, related_name='+')
+    document_sha256 = models.CharField(max_length=64, blank=True)
+    # Claim amount rounded to whole rupees
+    amount = models.DecimalField(max_digits=10, decimal_places=0)
+    # Filing date bucket: local date ordinal // CLAIM_DUPLICATE_WINDOW_DAYS
+    window = models.PositiveIntegerField()
+    # Set at submission when an earlier claim matched
+    duplicate_of = models.ForeignKey('policy.Claim', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_policy', 'document_sha256'], name='claims_fp_policy_doc_idx'),
+            models.Index(fields=['user_policy', 'amount', 'window'], name='claims_fp_policy_amount_idx'),
+        ]
+
+    def __str__(self):
+        return f"Fingerprint of {self.claim_id}"
+
+
+class IngestToken(models.Model):
+    """
+    API token for the bulk claim ingestion endpoint (claims/bulk/), sent as
+    "Authorization: Token <key>". Only the key's SHA-256 digest is stored; the
+    key itself is shown once, by the create_ingest_token command.
+    """
+    name = models.CharField(max_length=100, help_text="The hospital or TPA integration using the token")
+    key_digest = models.CharField(max_length=64, unique=True, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True, editable=False)
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.name} ({'active' if self.is_active else 'revoked'})"
@@ -0,0 +1,151 @@
+# claims/previews.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import DocumentPreview
+
+# Pillow is optional: without it every preview is marked unsupported
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+PREVIEWABLE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff'}
+
+
+class UnsupportedDocument(Exception):
+    pass
+
+
+def render_preview(source):
+    """Render `source` (a storage name) to JPEG thumbnail bytes."""
+    extension = os.path.splitext(source)[1].lower()
+    if not HAS_PIL or extension not in PREVIEWABLE_EXTENSIONS:
+        raise UnsupportedDocument(f"No preview renderer for '{extension or source}'")
+
+    with default_storage.open(source, 'rb') as handle:
+        image = Image.open(handle)
+        # Decode at reduced size where the format allows it (JPEG)
+        image.draft('RGB', settings.CLAIM_PREVIEW_SIZE)
+        image.thumbnail(settings.CLAIM_PREVIEW_SIZE)
+        output = BytesIO()
+        image.convert('RGB').save(output, 'JPEG', quality=75, optimize=True)
+    return output.getvalue()
+
+
+def generate_preview(source):
+    """
+    Build the preview for one document and record the outcome. Raises on
+    transient failures while attempts remain, so callers can retry.
+    """
+    preview, _ = DocumentPreview.objects.get_or_create(source=source)
+    if preview.status in ('READY', 'UNSUPPORTED'):
+        return preview
+
+    preview.attempts += 1
+    try:
+        content = render_preview(source)
+    except UnsupportedDocument as exc:
+        preview.status = 'UNSUPPORTED'
+        preview.last_error = str(exc)
+    except FileNotFoundError as exc:
+        # Retrying will not bring the original back
+        preview.status = 'FAILED'
+        preview.last_error = str(exc)
+    except Exception as exc:
+        preview.last_error = f"{type(exc).__name__}: {exc}"
+        exhausted = preview.attempts >= settings.CLAIM_PREVIEW_MAX_ATTEMPTS
+        preview.status = 'FAILED' if exhausted else 'PENDING'
+        preview.save(update_fields=['attempts', 'status', 'last_error', 'updated_at'])
+        if exhausted:
+            return preview
+        raise
+    else:
+        name = hashlib.sha256(source.encode()).hexdigest() + '.jpg'
+        if preview.preview:
+            preview.preview.delete(save=False)
+        preview.preview.save(name, ContentFile(content), save=False)
+        preview.status = 'READY'
+        preview.last_error = ''
+
+    preview.save()
+    return preview
+
+
+def mark_preview_failed(source, exc):
+    """Give up on a preview whose generation keeps failing; backfill_claim_previews --retry-failed retries it."""
+    try:
+        (DocumentPreview.objects.filter(source=source).exclude(status__in=('READY', 'UNSUPPORTED'))
+         .update(status='FAILED', last_error=f"{type(exc).__name__}: {exc}", updated_at=timezone.now()))
+    except Exception:
+        logger.exception("Could not mark the preview of %s as failed", source)
+
+
+class PreviewQueue:
+    """
+    In-process worker pool for preview generation. Failed jobs are retried
+    with exponential backoff up to CLAIM_PREVIEW_MAX_ATTEMPTS; jobs lost to
+    a restart stay PENDING in the table and are picked up by the
+    backfill_claim_previews command.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, source):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers or settings.CLAIM_PREVIEW_WORKERS,
+                    thread_name_prefix='claim-preview',
+                )
+        return self._executor.submit(self.run, source)
+
+    def run(self, source):
+        # Bounded here too: failures before generate_preview() records an attempt
+        # (a locked database, a storage error) would otherwise retry forever
+        max_attempts = settings.CLAIM_PREVIEW_MAX_ATTEMPTS
+        delay = 1
+        try:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return generate_preview(source)
+                except Exception as exc:
+                    if attempt == max_attempts:
+                        logger.exception("Preview of %s failed after %s attempts", source, attempt)
+                        mark_preview_failed(source, exc)
+                        return None
+                    logger.warning("Preview of %s failed, retrying in %ss", source, delay, exc_info=True)
+                    time.sleep(delay)
+                    delay *= 2
+        finally:
+            close_old_connections()
+
+
+preview_queue = PreviewQueue()
+
+
+def enqueue_preview(source):
+    """Queue a preview for `source` once the surrounding transaction commits."""
+    if not source:
+        return
+    _, created = DocumentPreview.objects.get_or_create(source=source)
+    if created:
+        transaction.on_commit(lambda: preview_queue.submit(source))
@@ -0,0 +1,216 @@
+# claims/rules.py
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from network_provider.utils import convert_to_int
+from policy.models import Claim
+
+from .adjudication import transition_path
+from .ingest import LOOKUP_CHUNK_SIZE, chunked
+from .models import ClaimStatusChange
+from .signals import claims_bulk_written
+
+# Claims nobody has looked at yet
+PENDING_STATUSES = ('SUBMITTED',)
+
+APPROVED, REJECTED, UNDER_REVIEW = 'APPROVED', 'REJECTED', 'UNDER_REVIEW'
+
+
+@lru_cache(maxsize=1024)
+def coverage_amount(coverage_limit):
+    """Policy.coverage_limit is free text ('5 Lakh', '3,00,000'); only a handful of distinct values exist."""
+    return convert_to_int(coverage_limit)
+
+
+def duplicate_key(user_policy_id, amount, reason):
+    return user_policy_id, amount, ' '.join((reason or '').lower().split())
+
+
+class ClaimBatch:
+    """
+    A batch of claims held column by column (one list per field) so each rule
+    runs as a single pass over a column instead of once per Claim object.
+    """
+    COLUMNS = ('pk', 'status', 'user_policy_id', 'amount', 'filed_on',
+               'policy_status', 'start_date', 'end_date', 'coverage', 'first_seen')
+
+    def __init__(self, **columns):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.pk)
+
+    @classmethod
+    def load(cls, after_pk=0, limit=5000):
+        """
+        Load the next `limit` pending claims (pk > after_pk) with their
+        UserPolicy/Policy coverage in one joined query, plus one query per
+        chunk of user policies for the duplicate check. Returns None when
+        nothing is left.
+        """
+        rows = list(
+            Claim.objects.with_status(*PENDING_STATUSES).filter(pk__gt=after_pk).order_by('pk').values_list(
+                'pk', 'status', 'user_policy_id', 'claim_amount', 'reason', 'filed_date',
+                'user_policy__status', 'user_policy__start_date', 'user_policy__end_date',
+                'user_policy__policy__coverage_limit',
+            )[:limit]
+        )
+        if not rows:
+            return None
+
+        pk, status, user_policy_id, amount, reason, filed, policy_status, start, end, coverage_limit = zip(*rows)
+
+        # Earliest claim (by pk) for each duplicate key, among all live claims on these policies
+        earliest = {}
+        for chunk in chunked(set(user_policy_id), LOOKUP_CHUNK_SIZE):
+            existing = Claim.objects.filter(user_policy_id__in=chunk).exclude(status=REJECTED).values_list(
+                'pk', 'user_policy_id', 'claim_amount', 'reason')
+            for other_pk, other_policy, other_amount, other_reason in existing.iterator():
+                key = duplicate_key(other_policy, other_amount, other_reason)
+                if other_pk < earliest.get(key, other_pk + 1):
+                    earliest[key] = other_pk
+
+        return cls(
+            pk=list(pk),
+            status=list(status),
+            user_policy_id=list(user_policy_id),
+            amount=list(amount),
+            filed_on=[timezone.localdate(value) if value else None for value in filed],
+            policy_status=list(policy_status),
+            start_date=list(start),
+            end_date=list(end),
+            coverage=[coverage_amount(value) for value in coverage_limit],
+            first_seen=[earliest.get(duplicate_key(*key), 0)
+                        for key in zip(user_policy_id, amount, reason)],
+        )
+
+
+class Rule:
+    """A named check evaluated over a whole ClaimBatch; `test` returns one bool per claim."""
+
+    def __init__(self, code, decision, message, test):
+        self.code = code
+        self.decision = decision
+        self.message = message
+        self.test = test
+
+
+def default_rules(auto_approve_limit=None):
+    """The built-in rules, in priority order: the first rule that fires decides the claim."""
+    if auto_approve_limit is None:
+        auto_approve_limit = settings.CLAIM_AUTO_APPROVE_LIMIT
+    limit = Decimal(auto_approve_limit)
+
+    return [
+        Rule('policy_inactive', REJECTED, "Policy is not active.",
+             lambda b: [status != 'ACTIVE' for status in b.policy_status]),
+        Rule('outside_coverage_period', REJECTED, "Claim was filed outside the policy coverage period.",
+             lambda b: [not (start and end and filed and start <= filed <= end)
+                        for filed, start, end in zip(b.filed_on, b.start_date, b.end_date)]),
+        Rule('exceeds_coverage', REJECTED, "Claim amount exceeds the policy coverage limit.",
+             lambda b: [0 < coverage < amount for amount, coverage in zip(b.amount, b.coverage)]),
+        Rule('unknown_coverage', UNDER_REVIEW, "Policy coverage limit could not be read.",
+             lambda b: [coverage <= 0 for coverage in b.coverage]),
+        Rule('possible_duplicate', UNDER_REVIEW, "Possible duplicate of an earlier claim on this policy.",
+             lambda b: [0 < first < pk for pk, first in zip(b.pk, b.first_seen)]),
+        Rule('above_auto_approve_limit', UNDER_REVIEW, "Amount is above the auto-approval limit.",
+             lambda b: [amount > limit for amount in b.amount]),
+    ]
+
+
+class RulesEngine:
+    """
+    Decides pending claims in batches: every rule is evaluated over the whole
+    batch, then the decisions are written with one guarded UPDATE per
+    (stored status, decision, rule) group and bulk-inserted audit rows.
+
+    Decisions follow the adjudicators' ALLOWED_TRANSITIONS: a submitted claim
+    the rules approve or reject passes through UNDER_REVIEW, with one audit
+    row per step.
+    """
+    APPROVE_MESSAGE = "Automatically approved."
+
+    def __init__(self, rules=None):
+        self.rules = rules if rules is not None else default_rules()
+
+    def evaluate(self, batch):
+        """Return one (decision, rule code or None) per claim in the batch."""
+        n = len(batch)
+        decided = [None] * n
+        for rule in self.rules:
+            pending = [i for i in range(n) if decided[i] is None]
+            if not pending:
+                break
+            fired = rule.test(batch)
+            for i in pending:
+                if fired[i]:
+                    decided[i] = rule
+        return [(rule.decision, rule.code) if rule else (APPROVED, None) for rule in decided]
+
+    def run(self, batch_size=None, dry_run=False, timings=None):
+        """
+        Adjudicate every pending claim. Returns a Counter of decisions; a
+        `timings` Counter, if given, accumulates the seconds spent in the
+        'load', 'evaluate' and 'write' phases.
+        """
+        batch_size = batch_size or settings.CLAIM_RULES_BATCH_SIZE
+        timings = timings if timings is not None else Counter()
+        totals = Counter()
+        last_pk = 0
+        while True:
+            started = time.perf_counter()
+            batch = ClaimBatch.load(after_pk=last_pk, limit=batch_size)
+            loaded = time.perf_counter()
+            timings['load'] += loaded - started
+            if batch is None:
+                return totals
+            last_pk = batch.pk[-1]
+            decisions = self.evaluate(batch)
+            evaluated = time.perf_counter()
+            timings['evaluate'] += evaluated - loaded
+            totals.update(decision for decision, _ in decisions)
+            if not dry_run:
+                self.write(batch, decisions)
+                timings['write'] += time.perf_counter() - evaluated
+
+    def write(self, batch, decisions):
+        messages = {rule.code: rule.message for rule in self.rules}
+        groups = defaultdict(list)
+        for pk, status, (decision, code) in zip(batch.pk, batch.status, decisions):
+            groups[status, decision, code].append(pk)
+
+        with transaction.atomic():
+            now = timezone.now()
+            audit = []
+            for (status, decision, code), pks in groups.items():
+                path = transition_path(status, decision)
+                if path is None:
+                    # Not a move ALLOWED_TRANSITIONS permits; left for an adjudicator
+                    continue
+                comment = messages[code] if code else self.APPROVE_MESSAGE
+                moved = []
+                for chunk in chunked(pks, LOOKUP_CHUNK_SIZE):
+                    # Only rows still in the status we read: an admin's decision in the meantime wins
+                    still_pending = list(Claim.objects.select_for_update().filter(pk__in=chunk, status=status)
+                                         .values_list('pk', flat=True))
+                    Claim.objects.filter(pk__in=still_pending).update(
+                        status=decision, comment=comment, version=F('version') + 1, updated_at=now,
+                        decided_at=now if decision in Claim.DECIDED_STATUSES else None)
+                    moved.extend(still_pending)
+                # One audit row per step; the rule's message goes on the final one
+                steps = list(zip([status, *path], path))
+                audit.extend(
+                    ClaimStatusChange(claim_id=pk, from_status=source, to_status=target, changed_at=now,
+                                      comment=comment if target == decision else '')
+                    for pk in moved for source, target in steps
+                )
+                claims_bulk_written.send(sender=Claim, claim_ids=moved, created=False, old_status=status)
+            ClaimStatusChange.objects.bulk_create(audit, batch_size=500)
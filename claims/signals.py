@@ -0,0 +1,66 @@
+# claims/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from policy.models import Claim
+
+from .fingerprints import create_fingerprints_for, sync_claim_fingerprint
+from .history import invalidate_claim_summaries
+from .storage import release_claim_document
+
+# Sent after claims are written with bulk_create() or QuerySet.update(), which
+# skip post_save. Arguments: claim_ids, created (bool) and old_status (the
+# status the claims had before an update, None for inserts).
+claims_bulk_written = Signal()
+
+# Rows per IN (...) lookup when resolving bulk-written claims
+LOOKUP_CHUNK_SIZE = 900
+
+# Claim fields the duplicate fingerprint is built from
+FINGERPRINTED_FIELDS = {'user_policy', 'user_policy_id', 'document', 'claim_amount', 'filed_date'}
+
+
+@receiver(post_delete, sender=Claim)
+def release_deleted_claim_document(sender, instance, **kwargs):
+    """Drop the deleted claim's reference to its stored document."""
+    if instance.document:
+        release_claim_document(instance.document.name)
+
+
+@receiver(post_save, sender=Claim)
+@receiver(post_delete, sender=Claim)
+def invalidate_owner_summary(sender, instance, **kwargs):
+    """The owner's cached claim summary is stale once any of their claims changes."""
+    owner = instance.owner()
+    if owner is not None:
+        user_id = owner['user_id']
+        # After commit, so a concurrent request cannot re-cache the old totals
+        transaction.on_commit(lambda: invalidate_claim_summaries([user_id]))
+
+
+@receiver(claims_bulk_written)
+def invalidate_bulk_owner_summaries(sender, claim_ids, **kwargs):
+    claim_ids = list(claim_ids)
+    user_ids = set()
+    for start in range(0, len(claim_ids), LOOKUP_CHUNK_SIZE):
+        chunk = claim_ids[start:start + LOOKUP_CHUNK_SIZE]
+        user_ids.update(Claim.objects.filter(pk__in=chunk).values_list('user_policy__user_id', flat=True).distinct())
+    if user_ids:
+        transaction.on_commit(lambda: invalidate_claim_summaries(user_ids))
+
+
+@receiver(post_save, sender=Claim)
+def update_claim_fingerprint(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the duplicate-detection fingerprint in step with the claim."""
+    if created or update_fields is None or FINGERPRINTED_FIELDS.intersection(update_fields):
+        sync_claim_fingerprint(instance, created)
+
+
+@receiver(claims_bulk_written)
+def fingerprint_bulk_created_claims(sender, claim_ids, created, **kwargs):
+    # Bulk updates only ever change status/comment, which are not fingerprinted
+    if created:
+        claim_ids = list(claim_ids)
+        for start in range(0, len(claim_ids), LOOKUP_CHUNK_SIZE):
+            create_fingerprints_for(claim_ids[start:start + LOOKUP_CHUNK_SIZE])
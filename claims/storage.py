@@ -0,0 +1,70 @@
+# claims/storage.py
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+
+from .models import DocumentBlob, blob_upload_to
+
+
+def file_sha256(uploaded_file):
+    """Hash a file in chunks (for files that did not come through the upload handler)."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def store_claim_document(uploaded_file):
+    """
+    Store an uploaded claim document under its SHA-256 digest and return its
+    DocumentBlob. A document that is already stored is not written again;
+    every call adds one reference to the blob.
+    """
+    digest = getattr(uploaded_file, 'sha256', None) or file_sha256(uploaded_file)
+
+    with transaction.atomic():
+        blob, created = DocumentBlob.objects.select_for_update().get_or_create(
+            sha256=digest,
+            defaults={
+                'size': uploaded_file.size,
+                'content_type': getattr(uploaded_file, 'content_type', '') or '',
+            },
+        )
+        if created:
+            name = blob_upload_to(blob, uploaded_file.name)
+            if default_storage.exists(name):
+                # Left behind by a blob that was released mid-way; same content
+                blob.file.name = name
+            else:
+                # Temporary uploads are moved into place, not copied
+                blob.file.save(uploaded_file.name, uploaded_file, save=False)
+            blob.save(update_fields=['file'])
+
+        DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+
+    return blob
+
+
+def release_claim_document(name):
+    """
+    Drop one reference to the blob stored at `name`, deleting the blob and
+    its file once nothing refers to it. Documents uploaded before
+    content-addressed storage have no blob and are left alone.
+    """
+    if not name:
+        return
+
+    with transaction.atomic():
+        blob = DocumentBlob.objects.select_for_update().filter(file=name).first()
+        if blob is None:
+            return
+
+        if blob.ref_count > 1:
+            DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return
+
+        blob.delete()
+        transaction.on_commit(lambda: default_storage.delete(name))
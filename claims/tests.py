@@ -1,3 +1,476 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+
+from policy.models import Claim
+from policy.testing import create_policy_holder
+
+from .adjudication import transition_claims, transition_path
+from .delivery import RangeNotSatisfiable, parse_range
+from .fingerprints import claim_fingerprint_values, find_probable_duplicates
+from .history import claim_history_page, claim_summary, decode_cursor
+from .ingest import issue_ingest_token
+from .models import ClaimFingerprint, ClaimStatusChange, DocumentBlob, IngestToken
+from .rules import ClaimBatch, RulesEngine, default_rules
+from .storage import release_claim_document, store_claim_document
+
+
+class ParseRangeTests(SimpleTestCase):
+
+    def test_satisfiable_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=990-2000', 1000), (990, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+
+    def test_ignored_ranges_send_the_whole_file(self):
+        for header in (None, '', 'bytes=-', 'bytes=0-1,5-9', 'items=0-1', 'bytes=a-b'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable_ranges(self):
+        for header, size in (('bytes=1000-', 1000), ('bytes=5-2', 1000), ('bytes=-0', 1000),
+                             ('bytes=-10', 0), ('bytes=0-', 0)):
+            with self.subTest(header=header, size=size), self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, size)
+
+
+class ClaimHistoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder()
+        cls.user = cls.user_policy.user
+        filed = timezone.now() - timedelta(days=10)
+        cls.claims = []
+        for days in (0, 1, 1, 1, 2):
+            claim = Claim.objects.create(user_policy=cls.user_policy, reason='Checkup', claim_amount=100)
+            Claim.objects.filter(pk=claim.pk).update(filed_date=filed + timedelta(days=days))
+            cls.claims.append(claim)
+        create_policy_holder('other', policy=cls.user_policy.policy)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, page_size):
+        pages, cursor = [], None
+        while True:
+            page, cursor = claim_history_page(self.user, cursor=cursor, page_size=page_size)
+            pages.append([claim.pk for claim in page])
+            if cursor is None:
+                return pages
+
+    def test_pages_run_newest_first_with_ties_broken_by_id(self):
+        newest_first = [claim.pk for claim in reversed(self.claims)]
+        self.assertEqual(self.walk(2), [newest_first[:2], newest_first[2:4], newest_first[4:]])
+        self.assertEqual(self.walk(5), [newest_first])
+
+    def test_claims_filed_meanwhile_do_not_shift_later_pages(self):
+        first, cursor = claim_history_page(self.user, page_size=2)
+        Claim.objects.create(user_policy=self.user_policy, reason='New', claim_amount=100)
+        second, _ = claim_history_page(self.user, cursor=cursor, page_size=2)
+        self.assertEqual([claim.pk for claim in second], [self.claims[2].pk, self.claims[1].pk])
+
+    def test_a_malformed_cursor_starts_from_the_top(self):
+        self.assertIsNone(decode_cursor('not a cursor'))
+        page, _ = claim_history_page(self.user, cursor='not a cursor', page_size=1)
+        self.assertEqual([claim.pk for claim in page], [self.claims[-1].pk])
+
+    def test_summary_is_cached_until_the_owners_claims_change(self):
+        self.assertEqual(claim_summary(self.user.pk)['count'], 5)
+        with self.assertNumQueries(0):
+            claim_summary(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Claim.objects.create(user_policy=self.user_policy, reason='Checkup', claim_amount=50)
+        summary = claim_summary(self.user.pk)
+        self.assertEqual((summary['count'], summary['total']), (6, Decimal('550')))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_claims([self.claims[0].claim_id], 'UNDER_REVIEW')
+        by_status = {entry['status']: entry['count'] for entry in claim_summary(self.user.pk)['by_status']}
+        self.assertEqual(by_status, {'SUBMITTED': 5, 'UNDER_REVIEW': 1})
+
+
+class ClaimDetailsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder()
+        cls.claims = [Claim.objects.create(user_policy=cls.user_policy, reason='Checkup', claim_amount=amount)
+                      for amount in (100, 2500)]
+        other = create_policy_holder('other', policy=cls.user_policy.policy)
+        cls.foreign = Claim.objects.create(user_policy=other, reason='Checkup', claim_amount=300)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user_policy.user)
+
+    def details(self, claim, **headers):
+        return self.client.get(f'/claims/details/{claim.pk}/', headers=headers)
+
+    def test_a_current_etag_gets_a_304_from_one_query(self):
+        claim = self.claims[0]
+        response = self.details(claim)
+        self.assertEqual(response.json()['amount'], '100.00')
+        self.assertEqual(response['ETag'], f'"claim-{claim.pk}-v1"')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # The session and user, then the claim's version
+        with self.assertNumQueries(3):
+            response = self.details(claim, if_none_match=response['ETag'])
+        self.assertEqual((response.status_code, response.content), (304, b''))
+
+    def test_a_status_change_invalidates_the_etag(self):
+        claim = self.claims[0]
+        etag = self.details(claim)['ETag']
+        transition_claims([claim.claim_id], 'UNDER_REVIEW')
+        response = self.details(claim, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['status_raw'], response['ETag']), ('UNDER_REVIEW', f'"claim-{claim.pk}-v2"'))
+
+    def test_other_users_claims_are_not_found(self):
+        self.assertEqual(self.details(self.foreign).status_code, 404)
+
+    def test_batch_lists_payloads_and_missing_ids(self):
+        ids = f'{self.claims[0].pk},{self.claims[1].pk},{self.foreign.pk},{self.claims[0].pk}'
+        response = self.client.get('/claims/details/batch/', {'ids': ids})
+        data = response.json()
+        self.assertEqual(sorted(data['claims']), sorted(str(claim.pk) for claim in self.claims))
+        self.assertEqual(data['missing'], [self.foreign.pk])
+        self.assertEqual(data['claims'][str(self.claims[1].pk)]['amount'], '2,500.00')
+
+        response = self.client.get('/claims/details/batch/', {'ids': ids}, headers={'if_none_match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_batch_rejects_bad_or_oversized_id_lists(self):
+        self.assertEqual(self.client.get('/claims/details/batch/', {'ids': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get('/claims/details/batch/').status_code, 400)
+        with override_settings(CLAIM_DETAILS_BATCH_MAX=1):
+            ids = ','.join(str(claim.pk) for claim in self.claims)
+            self.assertEqual(self.client.get('/claims/details/batch/', {'ids': ids}).status_code, 400)
+
+
+class DocumentStorageTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+
+    def store(self, content=b'hospital bill', name='bill.PDF'):
+        return store_claim_document(SimpleUploadedFile(name, content, content_type='application/pdf'))
+
+    def test_identical_uploads_share_one_content_addressed_blob(self):
+        first = self.store()
+        second = self.store(name='copy.pdf')
+        self.assertEqual(first.pk, second.pk)
+        blob = DocumentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        digest = blob.sha256
+        self.assertEqual(blob.file.name, f'claim_documents/{digest[:2]}/{digest[2:4]}/{digest}.pdf')
+        self.assertEqual(default_storage.open(blob.file.name).read(), b'hospital bill')
+
+        self.store(b'another bill')
+        self.assertEqual(DocumentBlob.objects.count(), 2)
+
+    def test_the_file_is_deleted_with_its_last_reference(self):
+        name = self.store().file.name
+        self.store()
+
+        release_claim_document(name)
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            release_claim_document(name)
+        self.assertFalse(DocumentBlob.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_deleting_a_claim_releases_its_document(self):
+        name = self.store().file.name
+        claim = Claim.objects.create(user_policy=create_policy_holder(), reason='Checkup', claim_amount=100,
+                                     document=name)
+        with self.captureOnCommitCallbacks(execute=True):
+            claim.delete()
+        self.assertFalse(default_storage.exists(name))
+
+    def test_legacy_documents_without_a_blob_are_left_alone(self):
+        release_claim_document('claim_documents/legacy.pdf')
+        release_claim_document('')
+        self.assertFalse(DocumentBlob.objects.exists())
+
+
+class DocumentDownloadRangeTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root, CLAIM_DOCUMENT_DELIVERY='django'))
+
+    @classmethod
+    def setUpTestData(cls):
+        user_policy = create_policy_holder()
+        cls.user = user_policy.user
+        cls.claim = Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=100,
+                                         document='claim_documents/bill.txt')
+
+    def setUp(self):
+        os.makedirs(os.path.join(self.media_root, 'claim_documents'), exist_ok=True)
+        with open(os.path.join(self.media_root, 'claim_documents', 'bill.txt'), 'wb') as handle:
+            handle.write(bytes(range(100)))
+        self.client.force_login(self.user)
+        self.url = f'/claims/download/{self.claim.pk}/'
+
+    def download(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_range_is_served_as_partial_content(self):
+        response, body = self.download(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(body, bytes(range(10, 20)))
+
+    def test_unsatisfiable_range_is_416(self):
+        response, _ = self.download(HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        etag = self.download()[0]['ETag']
+        response, body = self.download(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual((response.status_code, len(body)), (206, 10))
+
+        for validator in ('"stale"', http_date(0)):
+            with self.subTest(validator=validator):
+                response, body = self.download(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=validator)
+                self.assertEqual((response.status_code, len(body)), (200, 100))
+
+
+class TransitionClaimsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder('adjudicator', is_staff=True)
+        cls.adjudicator = cls.user_policy.user
+
+    def claim(self, status):
+        return Claim.objects.create(user_policy=self.user_policy, reason='Checkup', claim_amount=100, status=status)
+
+    def test_allowed_transitions_move_claims_and_write_audit_rows(self):
+        submitted, in_review = self.claim('SUBMITTED'), self.claim('UNDER_REVIEW')
+
+        moved, rejected = transition_claims([submitted.claim_id], 'Under Review', user=self.adjudicator)
+        self.assertEqual((moved, rejected), ([submitted.claim_id], []))
+        moved, rejected = transition_claims([in_review.claim_id], 'APPROVED', user=self.adjudicator, comment='OK')
+        self.assertEqual((moved, rejected), ([in_review.claim_id], []))
+
+        submitted.refresh_from_db()
+        in_review.refresh_from_db()
+        self.assertEqual((submitted.status, submitted.version), ('UNDER_REVIEW', 2))
+        self.assertEqual((in_review.status, in_review.comment), ('APPROVED', 'OK'))
+        self.assertIsNotNone(in_review.decided_at)
+        self.assertEqual(
+            list(ClaimStatusChange.objects.order_by('id').values_list('claim', 'from_status', 'to_status', 'changed_by')),
+            [(submitted.pk, 'SUBMITTED', 'UNDER_REVIEW', self.adjudicator.pk),
+             (in_review.pk, 'UNDER_REVIEW', 'APPROVED', self.adjudicator.pk)],
+        )
+
+    def test_disallowed_transitions_are_rejected_without_audit_rows(self):
+        submitted, approved = self.claim('SUBMITTED'), self.claim('APPROVED')
+        moved, rejected = transition_claims([submitted.claim_id, approved.claim_id, 'CLM9999'], 'REJECTED')
+
+        self.assertEqual(moved, [])
+        self.assertEqual(rejected, [
+            {'claim_id': submitted.claim_id, 'reason': 'Cannot move from SUBMITTED to REJECTED'},
+            {'claim_id': approved.claim_id, 'reason': 'Cannot move from APPROVED to REJECTED'},
+            {'claim_id': 'CLM9999', 'reason': 'Claim not found'},
+        ])
+        self.assertEqual(Claim.objects.get(pk=submitted.pk).status, 'SUBMITTED')
+        self.assertFalse(ClaimStatusChange.objects.exists())
+
+    def test_unknown_status_rejects_every_claim(self):
+        claim = self.claim('SUBMITTED')
+        self.assertEqual(transition_claims([claim.claim_id], 'Lost'),
+                         ([], [{'claim_id': claim.claim_id, 'reason': "Unknown status 'Lost'"}]))
+
+
+class RulesEngineTests(TestCase):
+
+    def batch(self, **overrides):
+        today = timezone.localdate()
+        columns = {
+            'pk': [10], 'status': ['SUBMITTED'], 'user_policy_id': [1], 'amount': [Decimal('1000')],
+            'filed_on': [today], 'policy_status': ['ACTIVE'], 'start_date': [today - timedelta(days=10)],
+            'end_date': [today + timedelta(days=355)], 'coverage': [500000], 'first_seen': [10],
+        }
+        columns.update({name: [value] for name, value in overrides.items()})
+        return ClaimBatch(**columns)
+
+    def decide(self, **overrides):
+        return RulesEngine(default_rules(auto_approve_limit=50000)).evaluate(self.batch(**overrides))[0]
+
+    def test_the_first_rule_that_fires_decides(self):
+        today = timezone.localdate()
+        self.assertEqual(self.decide(), ('APPROVED', None))
+        self.assertEqual(self.decide(amount=Decimal('60000')), ('UNDER_REVIEW', 'above_auto_approve_limit'))
+        self.assertEqual(self.decide(first_seen=3), ('UNDER_REVIEW', 'possible_duplicate'))
+        self.assertEqual(self.decide(coverage=0), ('UNDER_REVIEW', 'unknown_coverage'))
+        self.assertEqual(self.decide(amount=Decimal('600000')), ('REJECTED', 'exceeds_coverage'))
+        # Rejections outrank reviews, and earlier rejections outrank later ones
+        self.assertEqual(self.decide(amount=Decimal('600000'), first_seen=3), ('REJECTED', 'exceeds_coverage'))
+        self.assertEqual(self.decide(end_date=today - timedelta(days=1), amount=Decimal('600000')),
+                         ('REJECTED', 'outside_coverage_period'))
+        self.assertEqual(self.decide(policy_status='EXPIRED', end_date=today - timedelta(days=1)),
+                         ('REJECTED', 'policy_inactive'))
+
+    def test_decisions_follow_the_allowed_transitions(self):
+        self.assertEqual(transition_path('SUBMITTED', 'APPROVED'), ['UNDER_REVIEW', 'APPROVED'])
+        self.assertEqual(transition_path('SUBMITTED', 'UNDER_REVIEW'), ['UNDER_REVIEW'])
+        self.assertIsNone(transition_path('APPROVED', 'REJECTED'))
+
+        today = timezone.localdate()
+        user_policy = create_policy_holder(start_date=today - timedelta(days=10), end_date=today + timedelta(days=355))
+        approved = Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=1000)
+        reviewed = Claim.objects.create(user_policy=user_policy, reason='Surgery', claim_amount=90000)
+
+        totals = RulesEngine(default_rules(auto_approve_limit=50000)).run()
+        self.assertEqual(totals, {'APPROVED': 1, 'UNDER_REVIEW': 1})
+        self.assertEqual(Claim.objects.get(pk=approved.pk).status, 'APPROVED')
+        self.assertCountEqual(
+            ClaimStatusChange.objects.values_list('claim', 'from_status', 'to_status', 'comment'),
+            [(reviewed.pk, 'SUBMITTED', 'UNDER_REVIEW', 'Amount is above the auto-approval limit.'),
+             (approved.pk, 'SUBMITTED', 'UNDER_REVIEW', ''),
+             (approved.pk, 'UNDER_REVIEW', 'APPROVED', 'Automatically approved.')],
+        )
+
+
+class FingerprintTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_policy = create_policy_holder()
+        cls.other_policy = create_policy_holder('other', policy=cls.user_policy.policy)
+
+    def claim(self, amount, user_policy=None, document=None):
+        return Claim.objects.create(user_policy=user_policy or self.user_policy, reason='Checkup',
+                                    claim_amount=amount, document=document)
+
+    def test_same_rounded_amount_on_the_same_policy_is_a_probable_duplicate(self):
+        first = self.claim('1000.40')
+        self.claim('1000.00', user_policy=self.other_policy)
+        self.claim('2500.00')
+        second = self.claim('999.60')
+        self.assertEqual(find_probable_duplicates(claim_fingerprint_values(second), exclude_claim=second.pk),
+                         [first.pk])
+
+    def test_same_document_matches_whatever_the_amount(self):
+        digest = 'a' * 64
+        first = self.claim('100.00', document=f'claim_documents/{digest}.pdf')
+        second = self.claim('900.00', document=f'claim_documents/{digest}.pdf')
+        self.assertEqual(find_probable_duplicates(claim_fingerprint_values(second), exclude_claim=second.pk),
+                         [first.pk])
+
+    def test_rebuild_keeps_legacy_hashes_from_an_earlier_run(self):
+        os.makedirs(os.path.join(self.media_root, 'claim_documents'), exist_ok=True)
+        with open(os.path.join(self.media_root, 'claim_documents', 'legacy.pdf'), 'wb') as handle:
+            handle.write(b'legacy bill')
+        claim = self.claim('100.00', document='claim_documents/legacy.pdf')
+
+        call_command('build_claim_fingerprints', '--hash-legacy', stdout=io.StringIO())
+        digest = ClaimFingerprint.objects.get(claim=claim).document_sha256
+        self.assertEqual(len(digest), 64)
+
+        Claim.objects.filter(pk=claim.pk).update(claim_amount=200)
+        call_command('build_claim_fingerprints', stdout=io.StringIO())
+        fingerprint = ClaimFingerprint.objects.get(claim=claim)
+        self.assertEqual((fingerprint.document_sha256, fingerprint.amount), (digest, 200))
+
+
+class BulkClaimIngestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.active = create_policy_holder()
+        cls.lapsed = create_policy_holder('lapsed', policy=cls.active.policy, status='EXPIRED')
+        cls.token, cls.key = issue_ingest_token('City Hospital')
+
+    def setUp(self):
+        # Integrations send no CSRF token
+        self.client = Client(enforce_csrf_checks=True)
+
+    def post(self, body, key=None, query='', content_type='application/jsonl'):
+        headers = {'Authorization': f'Token {key or self.key}'}
+        return self.client.post(f'/claims/bulk/{query}', body, content_type=content_type, headers=headers)
+
+    def jsonl(self, *records):
+        return '\n'.join(json.dumps(record) for record in records)
+
+    def claim(self, **fields):
+        return {'user_policy_id': self.active.pk, 'claim_amount': '1500.50', 'reason': 'Fracture', **fields}
+
+    def test_requests_without_an_active_token_are_refused(self):
+        body = self.jsonl(self.claim())
+        self.assertEqual(self.client.post('/claims/bulk/', body, content_type='application/jsonl').status_code, 401)
+        self.assertEqual(self.post(body, key='not-a-key').status_code, 401)
+        IngestToken.objects.filter(pk=self.token.pk).update(is_active=False)
+        response = self.post(body)
+        self.assertEqual((response.status_code, response['WWW-Authenticate']), (401, 'Token'))
+        self.assertFalse(Claim.objects.exists())
+
+    def test_a_batch_creates_the_valid_rows_and_reports_the_rest(self):
+        response = self.post(self.jsonl(
+            self.claim(),
+            self.claim(claim_amount='-5'),
+            self.claim(user_policy_id=self.lapsed.pk),
+            self.claim(reason='', provider_id='x'),
+        ) + '\n{not json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created'], data['rejected']), (1, 4))
+        created, negative, lapsed, incomplete, garbled = data['results']
+        self.assertEqual(created['status'], 'created')
+        self.assertEqual(negative['errors'], ['claim_amount must be a positive amount'])
+        self.assertEqual(lapsed['errors'], [f'User policy {self.lapsed.pk} is not active (EXPIRED)'])
+        self.assertEqual(incomplete['errors'], ['reason is required', 'provider_id must be an integer'])
+        self.assertTrue(garbled['errors'][0].startswith('Invalid JSON'))
+        claim = Claim.objects.get()
+        self.assertEqual((claim.claim_id, claim.claim_amount, claim.status),
+                         (created['claim_id'], Decimal('1500.50'), 'SUBMITTED'))
+        self.assertIsNotNone(IngestToken.objects.get(pk=self.token.pk).last_used_at)
+
+    def test_a_strict_batch_is_all_or_nothing(self):
+        response = self.post(self.jsonl(self.claim(), self.claim(claim_amount='abc')), query='?strict=1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([row['status'] for row in response.json()['results']], ['skipped', 'rejected'])
+        self.assertFalse(Claim.objects.exists())
+
+    def test_csv_batches_and_bad_formats(self):
+        body = f'user_policy_id,claim_amount,reason\n{self.active.pk},200,Checkup\n'
+        self.assertEqual(self.post(body, content_type='text/csv').json()['created'], 1)
+        response = self.post(body, query='?format=xml')
+        self.assertEqual((response.status_code, response.json()['error']), (400, "Unsupported format 'xml'"))
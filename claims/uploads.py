@@ -0,0 +1,40 @@
+# claims/uploads.py
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+
+
+class ClaimDocumentUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded documents to a temporary file chunk by chunk while
+    computing their SHA-256, and stops reading as soon as a file grows past
+    CLAIM_DOCUMENT_MAX_SIZE instead of after it has been fully received.
+    The unread remainder of the request body is never consumed, so a client
+    still sending may see the connection reset instead of the error page.
+    """
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or settings.CLAIM_DOCUMENT_MAX_SIZE
+        self.too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.too_large = True
+            self.file.close()
+            # Abandon the rest of the body rather than letting the parser read and discard it
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.sha256 = self.digest.hexdigest()
+        return uploaded_file
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ClaimDashboardView, SubmitClaimView
+from .views import BulkClaimIngestView, ClaimDashboardView, SubmitClaimView
 from . import views
 
 app_name = 'claims'
@@ -8,6 +8,8 @@ urlpatterns = [
     path('dashboard/', ClaimDashboardView.as_view(), name='claim_dashboard'),
     path('submit/', SubmitClaimView.as_view(), name='submit_claim'),
     path('details/<int:claim_id>/', views.get_claim_details, name='get_claim_details'),
+    path('details/batch/', views.get_claim_details_batch, name='get_claim_details_batch'),
     path('download/<int:claim_id>/', views.download_claim_document, name='download_claim_document'),
+    path('bulk/', BulkClaimIngestView.as_view(), name='bulk_ingest'),
 
 ]
\ No newline at end of file
@@ -1,90 +1,285 @@
-import uuid
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from policy.models import UserPolicy, Claim
+from network_provider.models import NetworkProvider
+from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from django.conf import settings
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .delivery import (
+    RangeNotSatisfiable, document_digest, get_delivery_backend, make_etag, parse_range, range_not_satisfiable,
+)
+from .details import claim_payloads, claim_versions, details_etag
+from .fingerprints import claim_fingerprint_values, find_probable_duplicates
+from .history import claim_history_page, claim_summary
+from .ingest import READERS, ClaimBatchIngestor, IngestError, authenticate_ingest_token
+from .models import ClaimFingerprint, DocumentBlob
+from .previews import enqueue_preview
+from .storage import store_claim_document
+from .uploads import ClaimDocumentUploadHandler
+import csv
 import os
 
 
 class ClaimDashboardView(LoginRequiredMixin, View):
     def get(self, request):
         # Fetch policies belonging to the user
-        user_policies = UserPolicy.objects.filter(user=request.user, status='ACTIVE')
+        user_policies = UserPolicy.objects.filter(user=request.user, status='ACTIVE').select_related('policy')
 
-        # FIX: Filter claims by reaching the user through the user_policy relationship
-        submitted_claims = Claim.objects.filter(user_policy__user=request.user)
+        # One keyset page of the history, with each claim's policy joined in
+        cursor = request.GET.get('cursor')
+        submitted_claims, next_cursor = claim_history_page(request.user, cursor=cursor)
 
         context = {
             'user_policies': user_policies,
+            'providers': NetworkProvider.objects.filter(status='Active').order_by('hospital_name')
+                                                .values('pk', 'hospital_name', 'location'),
             'submitted_claims': submitted_claims,
+            'next_cursor': next_cursor,
+            'is_first_page': not cursor,
+            'claim_summary': claim_summary(request.user.pk),
         }
         return render(request, 'claims/claim_dashboard.html', context)
 
 
+@login_required
 def get_claim_details(request, claim_id):
     # Ensure the user can only see their own claims
-    claim = get_object_or_404(Claim, id=claim_id, user_policy__user=request.user)
-
-    # Get document URL safely
-    document_url = ""
-    if claim.document and hasattr(claim.document, 'url'):
-        document_url = request.build_absolute_uri(claim.document.url)
-
-    data = {
-        'claim_id': claim.claim_id,
-        'status': claim.get_status_display(),
-        'status_raw': claim.status,  # Add raw status for JS
-        'amount': f"{claim.claim_amount:,}",
-        'reason': claim.reason,
-        'comment': claim.comment if claim.comment else "No comments from admin yet.",
-        'filed_date': claim.filed_date.strftime('%B %d, %Y'),
-        'has_document': bool(claim.document),
-        'document_url': document_url
-    }
-    return JsonResponse(data)
+    versions = claim_versions(request.user, [claim_id])
+    if claim_id not in versions:
+        raise Http404("Claim not found")
 
+    version, updated_at = versions[claim_id]
+    response = _conditional_details_response(request, [(claim_id, version)], updated_at)
+    if response is not None:
+        return response
 
-def download_claim_document(request, claim_id):
+    data = dict(claim_payloads(versions)[claim_id])
+    if data['document_url']:
+        data['document_url'] = request.build_absolute_uri(data['document_url'])
+    return _finalize_details_response(JsonResponse(data), [(claim_id, version)], updated_at)
+
+
+@login_required
+def get_claim_details_batch(request):
+    """Details for several claims at once: ?ids=1,2,3. Unknown or foreign IDs are listed under 'missing'."""
     try:
-        claim = Claim.objects.get(id=claim_id, user_policy__user=request.user)
+        pks = list(dict.fromkeys(int(value) for value in request.GET.get('ids', '').split(',') if value.strip()))
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma-separated list of claim IDs'}, status=400)
+    if not pks:
+        return JsonResponse({'error': 'No claim IDs given'}, status=400)
+    if len(pks) > settings.CLAIM_DETAILS_BATCH_MAX:
+        return JsonResponse({'error': f'At most {settings.CLAIM_DETAILS_BATCH_MAX} claims per request'}, status=400)
 
-        if claim.document and claim.document.name:
-            file_path = os.path.join(settings.MEDIA_ROOT, str(claim.document.name))
+    versions = claim_versions(request.user, pks)
+    pairs = [(pk, version) for pk, (version, _) in versions.items()]
+    last_modified = max((updated_at for _, updated_at in versions.values()), default=None)
+    missing = [pk for pk in pks if pk not in versions]
 
-            if os.path.exists(file_path):
-                response = FileResponse(open(file_path, 'rb'))
-                response['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
-                return response
-            else:
-                raise Http404("File not found")
-        else:
-            raise Http404("No document available")
+    # The missing IDs are part of the representation, so they are part of the ETag too
+    response = _conditional_details_response(request, pairs + [(pk, 0) for pk in missing], last_modified)
+    if response is not None:
+        return response
+
+    payloads = claim_payloads(versions)
+    claims = {}
+    for pk in pks:
+        if pk in payloads:
+            data = claims[str(pk)] = dict(payloads[pk])
+            if data['document_url']:
+                data['document_url'] = request.build_absolute_uri(data['document_url'])
+    response = JsonResponse({'claims': claims, 'missing': missing})
+    return _finalize_details_response(response, pairs + [(pk, 0) for pk in missing], last_modified)
+
+
+def _conditional_details_response(request, pairs, last_modified):
+    """304 when the client's copy is current; polling then costs one indexed query."""
+    etag = details_etag(pairs)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return _finalize_details_response(response, pairs, last_modified)
+    return None
+
+
+def _finalize_details_response(response, pairs, last_modified):
+    response['ETag'] = details_etag(pairs)
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Always revalidate: the status can change at any moment
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
-    except Claim.DoesNotExist:
+
+@login_required
+def download_claim_document(request, claim_id):
+    claim = Claim.objects.filter(id=claim_id, user_policy__user=request.user).only('document').first()
+    if claim is None:
         raise Http404("Claim not found")
+    if not claim.document or not claim.document.name:
+        raise Http404("No document available")
+
+    name = claim.document.name
+    path = claim.document.path
+
+    # Content-addressed documents are validated from the database alone;
+    # only older uploads need a stat() to build their validators
+    digest = document_digest(name)
+    blob = DocumentBlob.objects.filter(sha256=digest).values('size', 'created_at').first() if digest else None
+    if blob:
+        size, last_modified = blob['size'], int(blob['created_at'].timestamp())
+    else:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise Http404("File not found")
+        size, last_modified = stat.st_size, int(stat.st_mtime)
+
+    backend = get_delivery_backend()
+    etag = make_etag(name, size, last_modified)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        # 304 Not Modified / 412 Precondition Failed
+        return backend.finalize(response, name, etag, last_modified)
+
+    byte_range = None
+    if backend.handles_ranges and 'HTTP_RANGE' in request.META and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except RangeNotSatisfiable:
+            return range_not_satisfiable(size)
+
+    try:
+        response = backend.serve(request, name, path, size, byte_range)
+    except FileNotFoundError:
+        raise Http404("File not found")
+    return backend.finalize(response, name, etag, last_modified)
+
 
+def _if_range_matches(request, etag, last_modified):
+    """A Range request only applies if its If-Range validator (if any) is still current."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+@method_decorator(csrf_exempt, name='dispatch')
 class SubmitClaimView(LoginRequiredMixin, View):
+    def dispatch(self, request, *args, **kwargs):
+        # The upload handler has to be installed before anything reads
+        # request.POST, so CSRF is checked on post() instead of by the middleware
+        self.upload_handler = ClaimDocumentUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return super().dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
     def post(self, request):
-        import uuid
         user_policy_id = request.POST.get('user_policy_id')
         reason = request.POST.get('reason')
         claim_amount = request.POST.get('claim_amount')
         document = request.FILES.get('document')
+        # Optional: the network hospital or clinic that treated the claimant
+        provider_id = request.POST.get('provider_id')
+
+        if self.upload_handler.too_large:
+            max_mb = self.upload_handler.max_size // (1024 * 1024)
+            messages.error(request, f"The document is larger than the {max_mb} MB limit.")
+            return redirect('claims:claim_dashboard')
 
         user_policy = UserPolicy.objects.get(id=user_policy_id)
+        provider = NetworkProvider.objects.filter(pk=provider_id, status='Active').first() if provider_id else None
+
+        with transaction.atomic():
+            # Identical documents are stored once and shared between claims
+            blob = store_claim_document(document) if document else None
 
-        # Create the claim using your specific model fields
-        Claim.objects.create(
-            user_policy=user_policy,
-            claim_id=f"CLM{uuid.uuid4().hex[:4].upper()}",
-            reason=reason,
-            claim_amount=claim_amount,
-            document=document,
-            status='Submitted'  # Default status from your wireframe
-        )
+            # Create the claim using your specific model fields
+            claim = Claim.objects.create(
+                user_policy=user_policy,
+                reason=reason,
+                claim_amount=claim_amount,
+                provider=provider,
+                document=blob.file.name if blob else None,
+                status='SUBMITTED'  # Default status from your wireframe
+            )
+
+            # Same document, or same amount on this policy recently: flag it for the adjudicator
+            duplicates = find_probable_duplicates(claim_fingerprint_values(claim), exclude_claim=claim.pk)
+            if duplicates:
+                ClaimFingerprint.objects.filter(claim=claim).update(duplicate_of_id=duplicates[0])
+
+            # Admins see a generated thumbnail instead of the original
+            if blob:
+                enqueue_preview(blob.file.name)
+
+        if duplicates:
+            earlier = Claim.objects.get(pk=duplicates[0]).claim_id
+            messages.warning(request, f"Your claim was submitted, but it looks like a duplicate of claim "
+                                      f"{earlier}. It will be checked before processing.")
+            return redirect('claims:claim_dashboard')
 
         messages.success(request, "Your claim has been submitted successfully!")
-        return redirect('claims:claim_dashboard')
\ No newline at end of file
+        return redirect('claims:claim_dashboard')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BulkClaimIngestView(View):
+    """
+    Batch claim submission for hospital/TPA integrations.
+
+    Callers authenticate with an API token (claims.models.IngestToken) in an
+    "Authorization: Token <key>" header rather than a session, so the
+    endpoint is exempt from CSRF checks.
+
+    POST either a multipart 'file' field or a raw body in JSON lines
+    (default) or CSV (?format=csv or a text/csv content type), one claim per
+    record with user_policy_id, claim_amount, reason and an optional
+    provider_id (network provider primary key). Returns a per-row
+    report; with ?strict=1 nothing is inserted unless every row is valid.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if authenticate_ingest_token(request) is None:
+            response = JsonResponse({'error': 'A valid API token is required'}, status=401)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request):
+        format = request.GET.get('format') or ('csv' if 'csv' in request.content_type else 'jsonl')
+        reader = READERS.get(format)
+        if reader is None:
+            return JsonResponse({'error': f"Unsupported format '{format}'"}, status=400)
+
+        if request.content_type == 'multipart/form-data':
+            upload = request.FILES.get('file')
+            if upload is None:
+                return JsonResponse({'error': "Missing 'file' upload"}, status=400)
+            lines = upload
+        else:
+            # Iterating the request reads the body line by line from the socket
+            lines = request
+
+        strict = request.GET.get('strict') in ('1', 'true')
+        try:
+            results = ClaimBatchIngestor(reader(lines), strict=strict).run()
+        except (IngestError, UnicodeDecodeError, csv.Error) as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+
+        created = sum(1 for result in results if result['status'] == 'created')
+        return JsonResponse({
+            'created': created,
+            'rejected': sum(1 for result in results if result['status'] == 'rejected'),
+            'results': results,
+        }, status=400 if strict and created < len(results) else 200)
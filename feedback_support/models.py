@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from policy.models import Policy as PolicyModel
+from policy.sequences import SequenceAllocator, max_numeric_suffix
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -58,21 +59,19 @@ class Feedback(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.ticket_id:
-            last_feedback = Feedback.objects.order_by('-id').first()
-            if last_feedback and last_feedback.ticket_id:
-                try:
-                    last_number = int(last_feedback.ticket_id[4:])
-                    new_number = last_number + 1
-                except (ValueError, IndexError):
-                    new_number = 1
-            else:
-                new_number = 1
-            self.ticket_id = f"TCKT{new_number:03d}"
+            self.ticket_id = TICKET_IDS.next_id()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.ticket_id} - {self.category}"
 
+
+TICKET_IDS = SequenceAllocator(
+    'feedback_support.feedback.ticket_id', prefix='TCKT', width=3,
+    seed=lambda: max_numeric_suffix(Feedback.objects.all(), 'ticket_id', 'TCKT'),
+)
+
+
 class Policy(models.Model):
     policy_ref = models.ForeignKey(PolicyModel, on_delete=models.PROTECT, null=True, blank=True)
     name = models.CharField(max_length=200)
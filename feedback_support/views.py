@@ -5,9 +5,9 @@ from django.contrib import messages
 from django.views import View
 from django.views.generic import ListView, DetailView
 from django.http import JsonResponse
-from django.db.models import Q
 from .models import Feedback, Policy, FeedbackComment
 from django.utils import timezone
+from admin_panel.search import get_search_backend
 
 # Import network providers from external network_provider app
 try:
@@ -72,21 +72,16 @@ class FeedbackListView(LoginRequiredMixin, ListView):
         # Base queryset
         feedbacks = Feedback.objects.filter(created_by=self.request.user)
 
-        # Apply search filter
-        if search_query:
-            feedbacks = feedbacks.filter(
-                Q(ticket_id__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(category__icontains=search_query) |
-                Q(policy_name__name__icontains=search_query)
-            )
-
         # Apply status filter
         if status_filter:
             feedbacks = feedbacks.filter(status=status_filter)
 
-        # Order by created date (newest first)
-        feedbacks = feedbacks.order_by('-created_on')
+        if search_query:
+            # Full-text search over the user's own tickets, best matches first
+            feedbacks = get_search_backend().rank(feedbacks, 'feedback', search_query)
+        else:
+            # Order by created date (newest first)
+            feedbacks = feedbacks.order_by('-created_on')
 
         # Prefetch admin comments for each feedback
         feedbacks = feedbacks.prefetch_related('feedback_comments')
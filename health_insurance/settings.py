@@ -49,6 +49,101 @@ import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Largest claim document accepted; uploads are cut off as soon as they exceed it
+CLAIM_DOCUMENT_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
+
+# How claim documents are downloaded: 'django' streams them through the worker,
+# 'x-sendfile' (Apache/lighttpd) or 'x-accel-redirect' (nginx) hand the transfer
+# to the web server. For nginx, map the prefix below to MEDIA_ROOT as an internal location.
+CLAIM_DOCUMENT_DELIVERY = 'django'
+CLAIM_DOCUMENT_ACCEL_PREFIX = '/protected-media/'
+
+# Thumbnails shown to admins instead of the original documents (claims/previews.py)
+CLAIM_PREVIEW_SIZE = (320, 320)
+CLAIM_PREVIEW_WORKERS = 2
+CLAIM_PREVIEW_MAX_ATTEMPTS = 3
+
+# Largest batch accepted by the bulk claim ingestion endpoint (claims/bulk/)
+CLAIM_INGEST_MAX_ROWS = 20000
+
+# Automatic adjudication (claims/rules.py): claims above this amount always go to
+# manual review, and pending claims are evaluated this many at a time
+CLAIM_AUTO_APPROVE_LIMIT = 50000
+CLAIM_RULES_BATCH_SIZE = 5000
+
+# Claim history on the user dashboard: rows per page, and how long the per-user
+# summary block may be cached (it is also invalidated whenever the claims change)
+CLAIM_HISTORY_PAGE_SIZE = 20
+CLAIM_SUMMARY_CACHE_TIMEOUT = 60 * 60
+
+# Cached claim-details payloads (keyed on Claim.version, so they never go stale)
+# and the most claims the batch details endpoint returns in one request
+CLAIM_DETAILS_CACHE_TIMEOUT = 24 * 60 * 60
+CLAIM_DETAILS_BATCH_MAX = 100
+
+# Claims on the same policy for the same rounded amount filed within this many
+# days of each other are flagged as probable duplicates (claims/fingerprints.py)
+CLAIM_DUPLICATE_WINDOW_DAYS = 30
+
+# Admin claims browser: rows per keyset page, and how long the filter dropdown
+# facets are cached (they are also invalidated on every claim write)
+ADMIN_CLAIMS_PAGE_SIZE = 50
+CLAIM_FACETS_CACHE_TIMEOUT = 60 * 60
+
+# Full-text search for claims and tickets (admin_panel/search.py): 'sqlite-fts5'
+# on SQLite, 'icontains' (unindexed) elsewhere, or a dotted path to a SearchBackend.
+# Rebuild with `manage.py rebuild_search_index` after changing backends.
+SEARCH_BACKEND = 'sqlite-fts5'
+SEARCH_MAX_RESULTS = 500
+
+# Admin activity feed (admin_panel/activity.py): events per page, and how many
+# days of events prune_activity_events keeps
+ACTIVITY_FEED_PAGE_SIZE = 20
+ACTIVITY_RETENTION_DAYS = 180
+
+# Live dashboard badges (admin_panel/live.py): seconds between SSE keepalive
+# comments, and how long a long-poll request waits for a change before answering.
+# Under WSGI a long-poll answers at once and the client waits this long instead.
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_LONG_POLL_SECONDS = 25
+
+# Report CSV exports (admin_panel/exports.py): rows fetched and encoded per
+# chunk, and whether to gzip the stream for clients that accept it
+REPORT_EXPORT_CHUNK_SIZE = 2000
+REPORT_EXPORT_GZIP = True
+
+# Queued report builds (admin_panel/report_jobs.py): worker processes (0 runs jobs
+# inline after commit), hours a finished artifact is kept and reused, and minutes
+# after which a job still queued or running is given up by expire_report_jobs
+REPORT_JOB_WORKERS = 2
+REPORT_ARTIFACT_TTL_HOURS = 24
+REPORT_JOB_TIMEOUT_MINUTES = 30
+
+# Cached report results (admin_panel/report_cache.py): seconds a result is kept
+# (writes to claims, policies, providers and usernames retire results sooner), and
+# the largest rendered CSV or PDF body kept in the cache. Invalidation bumps tag versions in
+# CACHES, which is per process here: see the note on CACHES below.
+REPORT_CACHE_TIMEOUT = 15 * 60
+REPORT_CACHE_MAX_BYTES = 5 * 1024 * 1024
+
+# Columnar analytics exports (admin_panel/columnar.py): rows per column batch, and
+# how far behind the clock an incremental export stops, so rows whose transactions
+# are still committing are left for the next run rather than skipped
+COLUMNAR_EXPORT_BATCH_SIZE = 10_000
+COLUMNAR_EXPORT_LAG_SECONDS = 60
+
+# The local-memory cache is private to each process. That is fine under runserver
+# or a single worker, but with several workers a write only retires the cached
+# reports, facets and claim summaries of the process that made it, and the report
+# hit counters are per worker. Point 'default' at a shared backend (Redis,
+# Memcached, or DatabaseCache after `manage.py createcachetable`) before running
+# more than one.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -0,0 +1,95 @@
+# policy/management/commands/benchmark_claim_ids.py
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, OperationalError, connection
+
+from policy.models import CLAIM_IDS, Claim, Policy, UserPolicy
+from policy.sequences import SequenceAllocator
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent claim inserts using the old read-last-row claim IDs "
+        "against the block sequence allocator. Writes real rows (removed "
+        "afterwards), so run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Parallel submitters')
+        parser.add_argument('--per-worker', type=int, default=50, help='Claims inserted by each submitter')
+        parser.add_argument('--block-size', type=int, default=CLAIM_IDS.block_size,
+                            help='Values reserved per sequence round-trip')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f'id-benchmark-{tag}')
+        policy = Policy.objects.create(
+            policy_id=f'B{tag[:6]}', name=f'ID benchmark {tag}', description='Benchmark fixture',
+            premium=0, coverage_limit='0', validity='0',
+        )
+        user_policy = UserPolicy.objects.create(user=user, policy=policy, status='ACTIVE')
+
+        allocator = SequenceAllocator(
+            CLAIM_IDS.name, CLAIM_IDS.prefix, CLAIM_IDS.width,
+            block_size=options['block_size'], seed=CLAIM_IDS.seed,
+        )
+        strategies = [
+            ('read-last-row', self._legacy_claim_id),
+            (f'sequence (block={options["block_size"]})', allocator.next_id),
+        ]
+
+        try:
+            for label, next_id in strategies:
+                result = self._run(user_policy, next_id, options['workers'], options['per_worker'])
+                self.stdout.write(
+                    f"{label:<24} inserted={result['inserted']:<6} collisions={result['collisions']:<6} "
+                    f"lock_errors={result['lock_errors']:<4} {result['rate']:,.0f} inserts/s"
+                )
+        finally:
+            user.delete()
+            policy.delete()
+
+    def _run(self, user_policy, next_id, workers, per_worker):
+        def submit(_):
+            inserted = collisions = lock_errors = 0
+            try:
+                for _ in range(per_worker):
+                    try:
+                        Claim.objects.create(
+                            user_policy=user_policy, claim_id=next_id(),
+                            reason='benchmark', claim_amount=1,
+                        )
+                        inserted += 1
+                    except IntegrityError:
+                        collisions += 1
+                    except OperationalError:
+                        lock_errors += 1
+            finally:
+                connection.close()
+            return inserted, collisions, lock_errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            totals = [sum(column) for column in zip(*pool.map(submit, range(workers)))]
+        elapsed = time.perf_counter() - started
+
+        return {
+            'inserted': totals[0],
+            'collisions': totals[1],
+            'lock_errors': totals[2],
+            'rate': totals[0] / elapsed if elapsed else 0,
+        }
+
+    @staticmethod
+    def _legacy_claim_id():
+        # The ID scheme Claim.save() used before the sequence allocator
+        last_claim = Claim.objects.all().order_by('id').last()
+        match = re.match(r'^CLM(\d+)$', last_claim.claim_id) if last_claim else None
+        new_id_int = int(match.group(1)) + 1 if match else 1
+        return f'CLM{new_id_int:04d}'
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy', '0003_userpolicy_activation_date_userpolicy_payment_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+            ],
+        ),
+    ]
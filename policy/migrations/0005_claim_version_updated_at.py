@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:52
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy', '0004_idsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='claim',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='claim',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
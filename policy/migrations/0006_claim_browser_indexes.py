@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy', '0005_claim_version_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['filed_date', 'id'], name='policy_claim_filed_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['status', 'filed_date', 'id'], name='policy_claim_status_filed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['claim_amount'], name='policy_claim_amount_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:20
+
+from django.db import migrations
+from django.db.models import Value
+from django.db.models.functions import Replace, Trim, Upper
+
+STATUS_CODES = ('SUBMITTED', 'UNDER_REVIEW', 'APPROVED', 'REJECTED')
+
+
+def normalize_statuses(apps, schema_editor):
+    """Rewrite legacy spellings ('Submitted', 'under review') to the status codes, one UPDATE per code."""
+    Claim = apps.get_model('policy', 'Claim')
+    ClaimStatusChange = apps.get_model('claims', 'ClaimStatusChange')
+
+    for model, field in ((Claim, 'status'), (ClaimStatusChange, 'from_status'), (ClaimStatusChange, 'to_status')):
+        rows = model.objects.annotate(normalized=Upper(Replace(Trim(field), Value(' '), Value('_'))))
+        for code in STATUS_CODES:
+            rows.filter(normalized=code).exclude(**{field: code}).update(**{field: code})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0004_claimfingerprint'),
+        ('policy', '0006_claim_browser_indexes'),
+    ]
+
+    operations = [
+        # The (status, filed_date, id) index from 0006 serves status filters and counts
+        migrations.RunPython(normalize_statuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+DECIDED_STATUSES = ('APPROVED', 'REJECTED')
+
+
+def backfill_decided_at(apps, schema_editor):
+    """Decided claims take the time of their last audited decision, or their last update without one."""
+    Claim = apps.get_model('policy', 'Claim')
+    ClaimStatusChange = apps.get_model('claims', 'ClaimStatusChange')
+
+    decision = (ClaimStatusChange.objects.filter(claim=OuterRef('pk'), to_status=OuterRef('status'))
+                .order_by('-changed_at').values('changed_at')[:1])
+    Claim.objects.filter(status__in=DECIDED_STATUSES, decided_at__isnull=True).update(
+        decided_at=Coalesce(Subquery(decision), 'updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('claims', '0004_claimfingerprint'),
+        ('network_provider', '0005_networkprovider_created_by'),
+        ('policy', '0007_normalize_claim_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='claim',
+            name='decided_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='claim',
+            name='provider',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claims', to='network_provider.networkprovider'),
+        ),
+        migrations.RunPython(backfill_decided_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing policies were last changed when activated, or when applied for."""
+    UserPolicy = apps.get_model('policy', 'UserPolicy')
+    UserPolicy.objects.update(updated_at=Coalesce('activation_date', 'application_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network_provider', '0005_networkprovider_created_by'),
+        ('policy', '0008_claim_provider_decided_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userpolicy',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['updated_at', 'id'], name='policy_claim_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userpolicy',
+            index=models.Index(fields=['updated_at', 'id'], name='policy_userpolicy_updated_idx'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
+from .sequences import SequenceAllocator, max_numeric_suffix
 # Get the User model based on settings (assuming settings.AUTH_USER_MODEL is used)
 User = settings.AUTH_USER_MODEL
 
@@ -48,11 +49,16 @@ class UserPolicy(models.Model):
     end_date = models.DateField(null=True, blank=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='APPLIED')
+    # Incremental analytics exports read rows changed since their last run (admin_panel/columnar.py)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "User Policies"
         # Prevents duplicate active applications for the same policy
         unique_together = ('user', 'policy')
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='policy_userpolicy_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s {self.policy.name} ({self.status})"
@@ -70,6 +76,42 @@ class UserPolicy(models.Model):
         # Example logic: set end date based on policy validity (e.g., 365 days)
         self.end_date = self.start_date + timedelta(days=365)
         self.save()
+
+
+def normalize_claim_status(value):
+    """
+    Map any spelling of a claim status ('Under Review', 'submitted',
+    'UNDER_REVIEW') to its canonical code, or None if it is not a status.
+    """
+    code = (value or '').strip().upper().replace(' ', '_')
+    return code if code in Claim.STATUS_CODES else None
+
+
+class ClaimQuerySet(models.QuerySet):
+    """
+    Status filters over the canonical codes only: plain equality/IN that the
+    (status, filed_date, id) index serves, instead of iexact or lists of
+    spellings.
+    """
+
+    def with_status(self, *statuses):
+        codes = {normalize_claim_status(status) for status in statuses} - {None}
+        return self.filter(status__in=codes) if codes else self.none()
+
+    def pending(self):
+        """Claims still waiting for a decision."""
+        return self.with_status(*Claim.PENDING_STATUSES)
+
+    def decided(self):
+        return self.with_status(*Claim.DECIDED_STATUSES)
+
+    def status_counts(self):
+        """{code: count} for every status, zero included, in one GROUP BY."""
+        counts = dict.fromkeys(Claim.STATUS_CODES, 0)
+        counts.update(self.order_by().values_list('status').annotate(count=models.Count('id')))
+        return counts
+
+
 class Claim(models.Model):
     """
     Model to handle policy claims submitted by policy holders (User).
@@ -81,6 +123,10 @@ class Claim(models.Model):
         ('APPROVED', 'Approved'),               # 3. Approved - If all are done then admin approved
         ('REJECTED', 'Rejected'),               # 4. Rejected If claim Rejected with comment.
     )
+    # Only these codes are stored; save() normalizes other spellings
+    STATUS_CODES = tuple(code for code, _ in CLAIM_STATUS_CHOICES)
+    PENDING_STATUSES = ('SUBMITTED', 'UNDER_REVIEW')
+    DECIDED_STATUSES = ('APPROVED', 'REJECTED')
 
     # Automatically generate claim ID format (e.g., CLM0001) - implementation varies.
     claim_id = models.CharField(max_length=10, unique=True, blank=True)
@@ -96,17 +142,110 @@ class Claim(models.Model):
     status = models.CharField(max_length=20, choices=CLAIM_STATUS_CHOICES, default='SUBMITTED')
     comment = models.TextField(blank=True, null=True, verbose_name="Admin Comment")  # Admin comment field
 
+    # Bumped whenever status or comment changes; versions the cached claim details.
+    # Bulk QuerySet.update() calls must bump both fields themselves.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Hospital or clinic that treated the claimant, when known (indexed for provider reports)
+    provider = models.ForeignKey('network_provider.NetworkProvider', on_delete=models.SET_NULL,
+                                 null=True, blank=True, related_name='claims')
+    # When the claim reached a decided status; bulk QuerySet.update() calls must set it themselves
+    decided_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ClaimQuerySet.as_manager()
+
+    # Fields whose change invalidates the cached details payload
+    VERSIONED_FIELDS = ('status', 'comment')
+
+    class Meta:
+        indexes = [
+            # Newest-first keyset pagination, optionally within one status
+            models.Index(fields=['filed_date', 'id'], name='policy_claim_filed_id_idx'),
+            models.Index(fields=['status', 'filed_date', 'id'], name='policy_claim_status_filed_idx'),
+            # Amount range filters in the admin claims browser
+            models.Index(fields=['claim_amount'], name='policy_claim_amount_idx'),
+            # Incremental analytics exports, in modification order
+            models.Index(fields=['updated_at', 'id'], name='policy_claim_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Claim {self.claim_id} for {self.user_policy.policy.name}"
 
-    # Example logic for generating custom ID (requires overriding save method)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_versioned = instance._versioned_values()
+        return instance
+
+    def owner(self):
+        """
+        {'user_id', 'username', 'policy_id', 'policy_name'} of the claim's user
+        policy, or None if it no longer exists. Looked up once per user policy
+        and kept on the instance, so every handler of one write shares it.
+        """
+        cached = getattr(self, '_owner', None)
+        if cached is not None and cached[0] == self.user_policy_id:
+            return cached[1]
+        user_policy = self.user_policy if Claim.user_policy.is_cached(self) else None
+        if (user_policy is not None and UserPolicy.user.is_cached(user_policy)
+                and UserPolicy.policy.is_cached(user_policy)):
+            owner = {'user_id': user_policy.user_id, 'username': user_policy.user.username,
+                     'policy_id': user_policy.policy_id, 'policy_name': user_policy.policy.name}
+        else:
+            owner = (UserPolicy.objects.filter(pk=self.user_policy_id)
+                     .values('user_id', 'policy_id', username=models.F('user__username'),
+                             policy_name=models.F('policy__name'))
+                     .first())
+        self._owner = (self.user_policy_id, owner)
+        return owner
+
+    def _versioned_values(self):
+        # Deferred fields are left out rather than loaded
+        deferred = self.get_deferred_fields()
+        return {name: getattr(self, name) for name in self.VERSIONED_FIELDS if name not in deferred}
+
     def save(self, *args, **kwargs):
         if not self.claim_id:
-            # Simple placeholder for auto-generation logic
-            last_claim = Claim.objects.all().order_by('id').last()
-            if last_claim:
-                new_id_int = int(last_claim.claim_id.replace('CLM', '')) + 1
-            else:
-                new_id_int = 1
-            self.claim_id = f'CLM{new_id_int:04d}'
-        super().save(*args, **kwargs)
\ No newline at end of file
+            # Allocated from the claim sequence, no lookup of the last claim
+            self.claim_id = CLAIM_IDS.next_id()
+
+        # Never store a display name or other spelling of the status
+        self.status = normalize_claim_status(self.status) or self.status
+
+        loaded = getattr(self, '_loaded_versioned', None)
+        if loaded is not None and any(self._versioned_values().get(name, value) != value
+                                      for name, value in loaded.items()):
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version', 'updated_at'}
+
+        # Turnaround runs from filing to the decision; reopening a claim clears it
+        decided = self.status in self.DECIDED_STATUSES
+        if decided != (self.decided_at is not None):
+            self.decided_at = timezone.now() if decided else None
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'decided_at'}
+
+        super().save(*args, **kwargs)
+        self._loaded_versioned = self._versioned_values()
+
+
+class IdSequence(models.Model):
+    """
+    Named counters behind human-readable IDs such as CLM0001 and TCKT001.
+    Values are reserved in blocks by SequenceAllocator (policy/sequences.py).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} (next: {self.next_value})"
+
+
+CLAIM_IDS = SequenceAllocator(
+    'policy.claim.claim_id', prefix='CLM', width=4,
+    seed=lambda: max_numeric_suffix(Claim.objects.all(), 'claim_id', 'CLM'),
+)
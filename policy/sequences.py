@@ -0,0 +1,104 @@
+# policy/sequences.py
+import os
+import re
+import threading
+
+from django.apps import apps
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F
+
+
+def max_numeric_suffix(queryset, field, prefix):
+    """
+    Return the highest number used after `prefix` in `field` (0 if none).
+    Only used once per sequence to seed it from rows created before the
+    sequence table existed, so it streams instead of loading everything.
+    """
+    pattern = re.compile(rf'^{re.escape(prefix)}(\d+)$')
+    highest = 0
+    for value in queryset.values_list(field, flat=True).iterator():
+        match = pattern.match(value or '')
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+class SequenceAllocator:
+    """
+    Hands out formatted IDs (e.g. CLM0001) from a named IdSequence row.
+
+    Outside a transaction a whole block of values is reserved with a single
+    UPDATE and served from process memory (hi/lo), so most inserts never
+    touch the sequence table and never read the target table. Inside a
+    transaction only the values actually needed are reserved, because a
+    rollback would undo the reservation and the cached remainder could be
+    handed out a second time.
+    """
+
+    def __init__(self, name, prefix, width, block_size=20, seed=None):
+        self.name = name
+        self.prefix = prefix
+        self.width = width
+        self.block_size = block_size
+        # Callable returning the last value already in use, for first-time setup
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._limit = 0
+
+    def format(self, value):
+        return f'{self.prefix}{value:0{self.width}d}'
+
+    def next_id(self):
+        return self.format(self.next_value())
+
+    def next_value(self):
+        using = router.db_for_write(self._model())
+        if connections[using].in_atomic_block:
+            return self.reserve(1, using=using)[0]
+
+        with self._lock:
+            # A forked worker must not reuse the block cached by its parent
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._next = self._limit = 0
+
+            if self._next >= self._limit:
+                block = self.reserve(self.block_size, using=using)
+                self._next, self._limit = block.start, block.stop
+
+            value = self._next
+            self._next += 1
+            return value
+
+    def reserve_ids(self, count):
+        """Reserve `count` consecutive IDs, e.g. for bulk_create()."""
+        return [self.format(value) for value in self.reserve(count)]
+
+    def reserve(self, count, using=None):
+        """Atomically reserve `count` consecutive values and return them as a range."""
+        model = self._model()
+        using = using or router.db_for_write(model)
+        rows = model.objects.using(using).filter(name=self.name)
+
+        with transaction.atomic(using=using):
+            if not rows.update(next_value=F('next_value') + count):
+                self._create_row(model, using)
+                rows.update(next_value=F('next_value') + count)
+            stop = rows.values_list('next_value', flat=True).get()
+
+        return range(stop - count, stop)
+
+    def _create_row(self, model, using):
+        start = (self.seed() if self.seed else 0) + 1
+        try:
+            with transaction.atomic(using=using):
+                model.objects.using(using).create(name=self.name, next_value=start)
+        except IntegrityError:
+            # Another process created the row first; its value wins
+            pass
+
+    @staticmethod
+    def _model():
+        return apps.get_model('policy', 'IdSequence')
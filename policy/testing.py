@@ -0,0 +1,20 @@
+# policy/testing.py
+from django.contrib.auth import get_user_model
+
+from .models import Policy, UserPolicy
+
+# Fixtures shared by the test suites that file, adjudicate and report on claims
+
+
+def create_policy(policy_id='POL1', name='Gold Care'):
+    return Policy.objects.create(policy_id=policy_id, name=name, description=name, premium=1200,
+                                 coverage_limit='5 Lakh', validity='1 year')
+
+
+def create_policy_holder(username='member', policy=None, is_staff=False, **holding):
+    """
+    A user (password 'secret') holding `policy`, a new Gold Care policy by
+    default. Returns the ACTIVE UserPolicy; `holding` overrides its fields.
+    """
+    user = get_user_model().objects.create_user(username, password='secret', is_staff=is_staff)
+    return UserPolicy.objects.create(user=user, policy=policy or create_policy(), **{'status': 'ACTIVE', **holding})
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from importlib import import_module
 
-# Create your tests here.
+from django.apps import apps
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from claims.models import ClaimStatusChange
+
+from .models import Claim, IdSequence
+from .sequences import SequenceAllocator
+from .testing import create_policy_holder
+
+
+class SequenceAllocatorTests(TransactionTestCase):
+    """Block reservation depends on transaction state, so these run outside a test transaction."""
+
+    def allocator(self, **kwargs):
+        return SequenceAllocator('tests.sequence', prefix='T', width=3, block_size=5, **kwargs)
+
+    def stored_next_value(self):
+        return IdSequence.objects.get(name='tests.sequence').next_value
+
+    def test_outside_a_transaction_a_block_is_reserved_and_served_from_memory(self):
+        ids = self.allocator()
+        self.assertEqual(ids.next_id(), 'T001')
+        self.assertEqual(self.stored_next_value(), 6)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([ids.next_id() for _ in range(4)], ['T002', 'T003', 'T004', 'T005'])
+        self.assertEqual(ids.next_id(), 'T006')
+        self.assertEqual(self.stored_next_value(), 11)
+
+    def test_inside_a_transaction_only_the_values_used_are_reserved(self):
+        ids = self.allocator()
+        with transaction.atomic():
+            self.assertEqual([ids.next_id(), ids.next_id()], ['T001', 'T002'])
+        self.assertEqual(self.stored_next_value(), 3)
+
+    def test_rolled_back_reservations_are_not_reused_from_memory(self):
+        ids = self.allocator()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(ids.next_id(), 'T001')
+            raise RuntimeError
+        # The rollback undid the reservation, so the value is handed out again
+        self.assertEqual(ids.next_id(), 'T001')
+
+    def test_concurrent_allocators_never_share_values(self):
+        first, second = self.allocator(), self.allocator()
+        issued = [first.next_id(), second.next_id(), first.next_id(), *second.reserve_ids(3)]
+        self.assertEqual(issued, ['T001', 'T006', 'T002', 'T011', 'T012', 'T013'])
+
+    def test_seed_continues_after_existing_ids(self):
+        ids = self.allocator(seed=lambda: 41)
+        self.assertEqual(ids.reserve_ids(2), ['T042', 'T043'])
+
+    def test_forked_worker_discards_the_parents_block(self):
+        ids = self.allocator()
+        ids.next_id()
+        ids._pid = -1  # as seen from a forked child
+        self.assertEqual(ids.next_id(), 'T006')
+
+
+class ClaimIdTests(TestCase):
+
+    def test_claim_ids_are_allocated_in_sequence(self):
+        user_policy = create_policy_holder()
+        claims = [Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=100) for _ in range(3)]
+        self.assertEqual([claim.claim_id for claim in claims], ['CLM0001', 'CLM0002', 'CLM0003'])
+
+
+class NormalizeStatusesMigrationTests(TestCase):
+    """policy/migrations/0007 rewrites legacy status spellings to the codes."""
+
+    def test_legacy_spellings_become_status_codes(self):
+        user_policy = create_policy_holder()
+        spellings = ['Submitted', ' under review ', 'APPROVED', 'Rejected', 'On hold']
+        claims = [Claim.objects.create(user_policy=user_policy, reason='Checkup', claim_amount=100)
+                  for _ in spellings]
+        for claim, spelling in zip(claims, spellings):
+            Claim.objects.filter(pk=claim.pk).update(status=spelling)
+        change = ClaimStatusChange.objects.create(claim=claims[0], from_status='Under Review', to_status='approved')
+
+        migration = import_module('policy.migrations.0007_normalize_claim_status')
+        with self.assertNumQueries(12):
+            # One UPDATE per status code and column
+            migration.normalize_statuses(apps, None)
+
+        statuses = dict(Claim.objects.values_list('pk', 'status'))
+        self.assertEqual([statuses[claim.pk] for claim in claims],
+                         ['SUBMITTED', 'UNDER_REVIEW', 'APPROVED', 'REJECTED', 'On hold'])
+        change.refresh_from_db()
+        self.assertEqual((change.from_status, change.to_status), ('UNDER_REVIEW', 'APPROVED'))